@@ -0,0 +1,49 @@
+"""Микробенчмарк: стоимость создания объекта с LoggingMixin и без него.
+
+Запуск:
+    python -m benchmarks.bench_logging_mixin --count 200000
+"""
+
+import argparse
+import logging
+import timeit
+from typing import Callable, Dict
+
+from src.logging_mixin import LoggingMixin
+from src.product import Product
+
+
+class LoggedProduct(LoggingMixin, Product):
+    __slots__ = ()
+
+
+class CountedProduct(LoggingMixin, Product):
+    __slots__ = ()
+    aggregate_creation = True
+
+
+def _cases() -> Dict[str, Callable[[], object]]:
+    return {
+        "Product": lambda: Product("Товар", "Описание", 100.0, 1),
+        "LoggingMixin, INFO выключен": lambda: LoggedProduct("Товар", "Описание", 100.0, 1),
+        "LoggingMixin, счетчики": lambda: CountedProduct("Товар", "Описание", 100.0, 1),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--count", type=int, default=200_000, help="Количество созданий на замер")
+    parser.add_argument("--repeat", type=int, default=5, help="Количество повторов (берется лучший)")
+    args = parser.parse_args()
+
+    logging.getLogger(LoggedProduct.__name__).setLevel(logging.WARNING)
+    baseline = None
+    print(f"{'Вариант':<30}{'нс/объект':>12}{'x Product':>12}")
+    for label, factory in _cases().items():
+        best = min(timeit.repeat(factory, number=args.count, repeat=args.repeat)) / args.count * 1e9
+        baseline = baseline or best
+        print(f"{label:<30}{best:>12.0f}{best / baseline:>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""Бенчмарк памяти: сколько байт занимает один продукт в каталоге.
+
+Запуск:
+    python -m benchmarks.bench_memory --count 1000000
+"""
+
+import argparse
+import gc
+import tracemalloc
+from decimal import Decimal
+from typing import Any, Callable, Dict, List
+
+from src.lawn_grass import LawnGrass
+from src.product import Product
+from src.smartphone import Smartphone
+
+COLORS = ["Черный", "Белый", "Серый", "Синий", "Зеленый"]
+COUNTRIES = ["Россия", "Китай", "Германия", "США"]
+
+
+class DictProduct:
+    """Эквивалент продукта с обычным __dict__ для сравнения"""
+
+    def __init__(self, name: str, description: str, price: float, quantity: int) -> None:
+        self.name = name
+        self.description = description
+        self._price = Decimal(str(price))
+        self._quantity = quantity
+        self._watchers = None
+
+
+def _factories() -> Dict[str, Callable[[int, str], Any]]:
+    return {
+        "dict (baseline)": lambda i, name: DictProduct(name, "Описание", 100.0 + i % 1000, i % 50),
+        "Product": lambda i, name: Product(name, "Описание", 100.0 + i % 1000, i % 50),
+        "Smartphone": lambda i, name: Smartphone(
+            name, "Описание", 100.0 + i % 1000, i % 50, 2.5, f"Model {i % 20}", 256, COLORS[i % len(COLORS)]
+        ),
+        "LawnGrass": lambda i, name: LawnGrass(
+            name, "Описание", 100.0 + i % 1000, i % 50, COUNTRIES[i % len(COUNTRIES)], 14, COLORS[i % len(COLORS)]
+        ),
+    }
+
+
+def measure(factory: Callable[[int, str], Any], count: int) -> float:
+    """Возвращает средний объем памяти на один объект (байт), без учета строк названий"""
+    names = [f"Товар {i}" for i in range(count)]
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    items: List[Any] = [factory(i, name) for i, name in enumerate(names)]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    # Список ссылок на объекты - это накладные расходы контейнера, а не продукта
+    list_overhead = 8 * len(items)
+    return (after - before - list_overhead) / count
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--count", type=int, default=1_000_000, help="Количество продуктов")
+    args = parser.parse_args()
+
+    print(f"{'Класс':<18}{'байт/продукт':>14}{'МБ на каталог':>16}")
+    for label, factory in _factories().items():
+        per_item = measure(factory, args.count)
+        print(f"{label:<18}{per_item:>14.1f}{per_item * args.count / 2**20:>16.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""Бенчмарк конкуренции: резерв и подтверждение корзин из нескольких потоков.
+
+Сравнивает движок с одной блокировкой (аналог глобального lock) и с полосами блокировок.
+На сборке CPython с GIL потоки не выполняют байткод параллельно, поэтому выигрыш
+полос виден в основном на free-threaded сборке; бенчмарк показывает, что полосы
+не добавляют накладных расходов под конкуренцией.
+
+Запуск:
+    python -m benchmarks.bench_reservations --threads 1 4 8 --carts 20000
+"""
+
+import argparse
+import random
+import threading
+import time
+
+from src.category import Category
+from src.exceptions import ReservationError
+from src.product import Product
+from src.reservations import ReservationEngine
+
+
+def _run(stripes: int, threads: int, carts: int, products_count: int, cart_size: int, seed: int) -> float:
+    """Время обработки carts корзин, поровну распределенных между потоками"""
+    products = [Product(f"Товар {i}", "Описание", 100.0, carts * cart_size) for i in range(products_count)]
+    categories = [Category(f"Категория {i}", "Описание", products[i::10]) for i in range(10)]
+    engine = ReservationEngine(stripes=stripes)
+    barrier = threading.Barrier(threads + 1)
+
+    def worker(index: int) -> None:
+        rng = random.Random(seed + index)
+        plan = [rng.sample(products, cart_size) for _ in range(carts // threads)]
+        barrier.wait()
+        for cart in plan:
+            try:
+                reservation = engine.reserve_many([(product, 1) for product in cart])
+            except ReservationError:
+                continue
+            engine.commit(reservation)
+
+    workers = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+    for thread in workers:
+        thread.start()
+    barrier.wait()
+    started = time.perf_counter()
+    for thread in workers:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    for category in categories:
+        category.check_aggregates()
+    return elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 2, 4, 8], help="Количество потоков")
+    parser.add_argument("--stripes", type=int, nargs="+", default=[1, 64], help="Количество блокировок")
+    parser.add_argument("--carts", type=int, default=20_000, help="Количество корзин на замер")
+    parser.add_argument("--products", type=int, default=1_000, help="Количество товаров")
+    parser.add_argument("--cart-size", type=int, default=3, help="Товаров в корзине")
+    parser.add_argument("--seed", type=int, default=0, help="Зерно генератора корзин")
+    args = parser.parse_args()
+
+    print(f"{'Потоков':>8}{'Блокировок':>12}{'корзин/с':>12}")
+    for threads in args.threads:
+        for stripes in args.stripes:
+            elapsed = _run(stripes, threads, args.carts, args.products, args.cart_size, args.seed)
+            print(f"{threads:>8}{stripes:>12}{args.carts / elapsed:>12.0f}")
+
+
+if __name__ == "__main__":
+    main()
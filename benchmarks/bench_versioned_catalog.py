@@ -0,0 +1,82 @@
+"""Бенчмарк чтения версионированного каталога во время публикации обновлений.
+
+Читатели в цикле берут текущую версию и считают среднюю цену случайной
+категории по ее предрассчитанным агрегатам; один писатель непрерывно
+публикует новые версии. Читатели не берут блокировок, поэтому пропускная
+способность не падает из-за писателя; на сборке CPython с GIL рост с числом
+потоков ограничен самим GIL и заметен на free-threaded сборке.
+
+Запуск:
+    python -m benchmarks.bench_versioned_catalog --threads 1 4 8 --reads 200000
+"""
+
+import argparse
+import random
+import threading
+import time
+
+from src.category import Category
+from src.product import Product
+from src.versioned_catalog import ProductRecord, VersionedCatalog
+
+
+def _run(threads: int, reads: int, categories_count: int, products_count: int, seed: int) -> float:
+    """Время выполнения reads чтений, поровну распределенных между потоками, при работающем писателе"""
+    categories = [
+        Category(
+            f"Категория {i}",
+            "Описание",
+            [Product(f"Товар {i}-{j}", "Описание", 100.0 + j, 10) for j in range(products_count)],
+        )
+        for i in range(categories_count)
+    ]
+    catalog = VersionedCatalog(categories)
+    names = [category.name for category in categories]
+    stop = threading.Event()
+    barrier = threading.Barrier(threads + 1)
+
+    def writer() -> None:
+        rng = random.Random(seed)
+        while not stop.is_set():
+            with catalog.edit() as draft:
+                draft.put_product(rng.choice(names), ProductRecord("Новинка", "Описание", rng.uniform(1, 1000), 1))
+
+    def reader(index: int) -> None:
+        rng = random.Random(seed + index + 1)
+        plan = [rng.choice(names) for _ in range(reads // threads)]
+        barrier.wait()
+        for name in plan:
+            catalog.current.categories[name].average_price
+
+    writer_thread = threading.Thread(target=writer)
+    workers = [threading.Thread(target=reader, args=(i,)) for i in range(threads)]
+    for thread in workers:
+        thread.start()
+    writer_thread.start()
+    barrier.wait()
+    started = time.perf_counter()
+    for thread in workers:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    stop.set()
+    writer_thread.join()
+    return elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 2, 4, 8], help="Количество потоков-читателей")
+    parser.add_argument("--reads", type=int, default=200_000, help="Количество чтений на замер")
+    parser.add_argument("--categories", type=int, default=20, help="Количество категорий")
+    parser.add_argument("--products", type=int, default=500, help="Товаров в категории")
+    parser.add_argument("--seed", type=int, default=0, help="Зерно генератора")
+    args = parser.parse_args()
+
+    print(f"{'Потоков':>8}{'чтений/с':>14}")
+    for threads in args.threads:
+        elapsed = _run(threads, args.reads, args.categories, args.products, args.seed)
+        print(f"{threads:>8}{args.reads / elapsed:>14.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""Генератор воспроизводимых синтетических каталогов для бенчмарков.
+
+Модуль не импортирует src: каталоги без тегов типа (по умолчанию) читаются
+любой версией загрузчика, в том числе исходной, и замеры можно сравнивать
+между любыми коммитами.
+"""
+
+import random
+from typing import Any, Dict, List
+
+COLORS = ["Черный", "Белый", "Серый", "Синий", "Зеленый"]
+COUNTRIES = ["Россия", "Китай", "Германия", "США"]
+MODELS = [f"Model {i}" for i in range(50)]
+
+# Ключ тега типа продукта (см. src.product_registry.TYPE_KEY)
+TYPE_KEY = "_type"
+
+
+def generate_products(count: int, seed: int = 0, typed: bool = False) -> List[Dict[str, Any]]:
+    """
+    Генерирует count словарей продуктов
+    :param count: Количество продуктов
+    :param seed: Зерно генератора
+    :param typed: Смесь Product, Smartphone и LawnGrass с тегами типа; иначе только базовые продукты
+    :return: Список словарей продуктов (названия и цены не зависят от typed)
+    """
+    rng = random.Random(seed)
+    products: List[Dict[str, Any]] = []
+    for i in range(count):
+        row: Dict[str, Any] = {
+            "name": f"Товар {i}",
+            "description": f"Описание товара {i}, {rng.choice(COLORS)} цвет",
+            "price": round(rng.uniform(100, 200_000), 2),
+            "quantity": rng.randint(0, 50),
+        }
+        kind = rng.random()
+        if kind < 0.3:
+            extra: Dict[str, Any] = {
+                TYPE_KEY: "smartphone",
+                "performance": round(rng.uniform(1.0, 3.5), 1),
+                "model": rng.choice(MODELS),
+                "memory": rng.choice([64, 128, 256, 512, 1024]),
+                "color": rng.choice(COLORS),
+            }
+        elif kind < 0.5:
+            extra = {
+                TYPE_KEY: "lawn_grass",
+                "country": rng.choice(COUNTRIES),
+                "germination_period": rng.randint(5, 30),
+                "color": rng.choice(COLORS),
+            }
+        else:
+            extra = {}
+        if typed:
+            row.update(extra)
+        products.append(row)
+    return products
+
+
+def generate_catalog(
+    product_count: int, category_size: int = 10_000, seed: int = 0, typed: bool = False
+) -> List[Dict[str, Any]]:
+    """Генерирует каталог в формате JSON-файла: список категорий по category_size продуктов"""
+    products = generate_products(product_count, seed, typed)
+    categories = []
+    for number, start in enumerate(range(0, product_count, category_size)):
+        end = start + category_size
+        categories.append(
+            {"name": f"Категория {number}", "description": "Синтетическая категория", "products": products[start:end]}
+        )
+    return categories
@@ -0,0 +1,195 @@
+"""Набор бенчмарков горячих путей: продукты, категории, загрузчик.
+
+Запуск:
+    python -m benchmarks.run --sizes 1000 10000 100000 --output results.json
+    python -m benchmarks.run --sizes 1000 10000 --compare results.json
+
+Результаты (время и пиковая память) сохраняются в JSON вместе с хешем коммита,
+чтобы сравнивать их между коммитами через --compare. Набор запускается и на
+исходном дереве: бенчмарки операций, которых в нем еще нет, пропускаются, а
+каталог по умолчанию не содержит тегов типа (--typed добавляет подклассы).
+"""
+
+import argparse
+import gc
+import json
+import logging
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from benchmarks.catalog_gen import generate_catalog
+from src.category import Category
+from src.loaders import JsonLoader, save_categories
+from src.product import Product
+
+# Бенчмарк получает подготовленные данные и возвращает функцию для замера
+Case = Callable[[Dict[str, Any]], Callable[[], Any]]
+
+
+class Unsupported(Exception):
+    """Проверяемой операции нет в этой версии кода"""
+
+
+def _require(owner: Any, attribute: str) -> None:
+    if not hasattr(owner, attribute):
+        raise Unsupported(f"{owner.__name__}.{attribute}")
+
+
+def _product_construction(ctx: Dict[str, Any]) -> Callable[[], Any]:
+    rows = [row for category in ctx["catalog"] for row in category["products"]]
+    return lambda: [Product(row["name"], row["description"], row["price"], row["quantity"]) for row in rows]
+
+
+def _category_from_dict(ctx: Dict[str, Any]) -> Callable[[], Any]:
+    return lambda: [Category.from_dict(data) for data in ctx["catalog"]]
+
+
+def _load_categories(ctx: Dict[str, Any]) -> Callable[[], Any]:
+    return lambda: JsonLoader.load_categories(ctx["json_path"])
+
+
+def _save_categories(ctx: Dict[str, Any]) -> Callable[[], Any]:
+    path = os.path.join(ctx["directory"], "saved.json")
+    return lambda: save_categories(path, ctx["categories"])
+
+
+def _get_average_price(ctx: Dict[str, Any]) -> Callable[[], Any]:
+    return lambda: [category.get_average_price() for category in ctx["categories"]]
+
+
+def _total_value(ctx: Dict[str, Any]) -> Callable[[], Any]:
+    _require(Category, "total_value")
+    return lambda: [category.total_value for category in ctx["categories"]]
+
+
+def _apply_discount(ctx: Dict[str, Any]) -> Callable[[], Any]:
+    _require(Category, "apply_discount")
+    return lambda: [category.apply_discount(0.01) for category in ctx["categories"]]
+
+
+CASES: Dict[str, Case] = {
+    "product_construction": _product_construction,
+    "category_from_dict": _category_from_dict,
+    "load_categories": _load_categories,
+    "save_categories": _save_categories,
+    "get_average_price": _get_average_price,
+    "total_value": _total_value,
+    "apply_discount": _apply_discount,
+}
+
+
+def _measure(func: Callable[[], Any], repeat: int, memory: bool) -> Tuple[float, Optional[int]]:
+    """Лучшее время из repeat запусков и пиковая память отдельного запуска"""
+    best = float("inf")
+    for _ in range(repeat):
+        gc.collect()
+        started = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - started)
+
+    peak = None
+    if memory:
+        gc.collect()
+        tracemalloc.start()
+        func()
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return best, peak
+
+
+def run(
+    sizes: List[int], cases: List[str], repeat: int, memory: bool, seed: int, typed: bool = False
+) -> List[Dict[str, Any]]:
+    """Запускает выбранные бенчмарки на каталогах заданных размеров"""
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        for size in sizes:
+            catalog = generate_catalog(size, seed=seed, typed=typed)
+            json_path = os.path.join(directory, f"catalog_{size}.json")
+            with open(json_path, "w", encoding="utf-8") as file:
+                json.dump(catalog, file, ensure_ascii=False, indent=2)
+            ctx = {
+                "catalog": catalog,
+                "json_path": json_path,
+                "directory": directory,
+                "categories": [Category.from_dict(data) for data in catalog],
+            }
+            for name in cases:
+                try:
+                    func = CASES[name](ctx)
+                except Unsupported as e:
+                    print(f"{name:<22}{size:>10}  пропущен: нет {e}", flush=True)
+                    continue
+                seconds, peak = _measure(func, repeat, memory)
+                results.append({"case": name, "size": size, "seconds": seconds, "peak_bytes": peak})
+                peak_text = f"{peak / 2**20:10.1f} МБ" if peak is not None else ""
+                print(f"{name:<22}{size:>10}{seconds:>12.4f} с{peak_text}", flush=True)
+    return results
+
+
+def compare(results: List[Dict[str, Any]], baseline_path: str, threshold: float) -> bool:
+    """Сравнивает результаты с сохраненными; возвращает False, если есть регрессии"""
+    with open(baseline_path, encoding="utf-8") as file:
+        baseline = {(r["case"], r["size"]): r for r in json.load(file)["results"]}
+
+    ok = True
+    print(f"\nСравнение с {baseline_path} (порог {threshold:.0%}):")
+    for result in results:
+        old = baseline.get((result["case"], result["size"]))
+        if old is None:
+            continue
+        ratio = result["seconds"] / old["seconds"] if old["seconds"] else float("inf")
+        regression = ratio > 1 + threshold
+        ok = ok and not regression
+        mark = "РЕГРЕССИЯ" if regression else ""
+        print(f"{result['case']:<22}{result['size']:>10}{ratio:>10.2f}x {mark}")
+    return ok
+
+
+def _commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000], help="Размеры каталогов")
+    parser.add_argument("--cases", nargs="+", choices=sorted(CASES), default=list(CASES), help="Бенчмарки")
+    parser.add_argument("--repeat", type=int, default=3, help="Количество повторов (берется лучшее время)")
+    parser.add_argument("--no-memory", action="store_true", help="Не замерять пиковую память")
+    parser.add_argument("--seed", type=int, default=0, help="Зерно генератора каталога")
+    parser.add_argument("--typed", action="store_true", help="Смесь подклассов продуктов с тегами типа")
+    parser.add_argument("--output", help="Файл для сохранения результатов в JSON")
+    parser.add_argument("--compare", help="Файл с результатами для сравнения")
+    parser.add_argument("--threshold", type=float, default=0.1, help="Допустимое замедление при сравнении")
+    args = parser.parse_args()
+
+    # Логи категорий не должны влиять на замеры (исходная Category сама выставляет уровень INFO)
+    logging.disable(logging.INFO)
+
+    results = run(args.sizes, args.cases, args.repeat, not args.no_memory, args.seed, args.typed)
+    report = {
+        "commit": _commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "seed": args.seed,
+        "typed": args.typed,
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(report, file, ensure_ascii=False, indent=2)
+    if args.compare and not compare(results, args.compare, args.threshold):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+import asyncio
+import time
+from concurrent.futures import Executor
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple, TypeVar
+
+from src.category import Category
+from src.exceptions import CatalogLoadError
+from src.loaders import JsonLoader, save_categories
+
+R = TypeVar("R")
+
+# Хук замера: (операция, путь, максимальная задержка event loop, время в исполнителе), секунды
+TimingHook = Callable[[str, str, float, float], None]
+
+# Период проверки задержки event loop при замере
+LAG_INTERVAL = 0.005
+
+
+def _run_timed(func: Callable[..., R], *args: Any) -> Tuple[R, float]:
+    """Выполняет функцию в исполнителе и возвращает результат вместе с временем выполнения"""
+    started = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - started
+
+
+class _LoopLagMonitor:
+    """
+    Замеряет задержку event loop: обратный вызов планируется через call_at
+    каждые interval секунд, и запаздывание его фактического запуска относительно
+    планового - время, на которое loop был занят (в том числе ожиданием GIL,
+    пока поток исполнителя разбирает JSON).
+    """
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, interval: float = LAG_INTERVAL) -> None:
+        self._loop = loop
+        self._interval = interval
+        self.max_lag = 0.0
+        self._expected = 0.0
+        self._handle: Optional[asyncio.TimerHandle] = None
+
+    def start(self) -> None:
+        self._schedule()
+
+    def _schedule(self) -> None:
+        self._expected = self._loop.time() + self._interval
+        self._handle = self._loop.call_at(self._expected, self._tick)
+
+    def _tick(self) -> None:
+        self.max_lag = max(self.max_lag, self._loop.time() - self._expected)
+        self._schedule()
+
+    def stop(self) -> float:
+        """Останавливает замер и возвращает максимальную задержку"""
+        if self._handle is not None:
+            self._handle.cancel()
+            # Проверка, которая должна была сработать, но еще не успела
+            self.max_lag = max(self.max_lag, self._loop.time() - self._expected)
+        return self.max_lag
+
+
+async def _offload(
+    operation: str,
+    file_path: str | Path,
+    executor: Optional[Executor],
+    timing_hook: Optional[TimingHook],
+    func: Callable[..., R],
+    *args: Any,
+) -> R:
+    """Переносит блокирующий вызов в исполнитель и сообщает хуку, насколько задерживался event loop"""
+    loop = asyncio.get_running_loop()
+    if timing_hook is None:
+        result, _ = await loop.run_in_executor(executor, _run_timed, func, *args)
+        return result
+    monitor = _LoopLagMonitor(loop)
+    monitor.start()
+    try:
+        result, executor_time = await loop.run_in_executor(executor, _run_timed, func, *args)
+    finally:
+        lag = monitor.stop()
+    timing_hook(operation, str(file_path), lag, executor_time)
+    return result
+
+
+async def load_categories_async(
+    file_path: str | Path, executor: Optional[Executor] = None, timing_hook: Optional[TimingHook] = None
+) -> List[Category]:
+    """
+    Асинхронно загружает категории из JSON файла.
+
+    Чтение и разбор выполняются в исполнителе (по умолчанию - исполнитель event loop),
+    поэтому event loop не блокируется на время загрузки.
+    :param file_path: Путь к JSON файлу
+    :param executor: Пул потоков или процессов для блокирующей работы
+    :param timing_hook: Функция, получающая максимальную задержку loop и время работы в исполнителе
+    :return: Список категорий
+    """
+    return await _offload("load", file_path, executor, timing_hook, JsonLoader.load_categories, file_path)
+
+
+async def save_categories_async(
+    file_path: str | Path,
+    categories: List[Category],
+    executor: Optional[Executor] = None,
+    timing_hook: Optional[TimingHook] = None,
+) -> None:
+    """
+    Асинхронно сохраняет категории в JSON файл.
+
+    Категории не должны изменяться, пока идет сохранение.
+    :param file_path: Путь к файлу
+    :param categories: Список категорий
+    :param executor: Пул потоков для блокирующей работы
+    :param timing_hook: Функция, получающая максимальную задержку loop и время работы в исполнителе
+    """
+    await _offload("save", file_path, executor, timing_hook, save_categories, file_path, categories)
+
+
+async def load_many_async(
+    paths: Iterable[str | Path],
+    limit: int = 4,
+    executor: Optional[Executor] = None,
+    timing_hook: Optional[TimingHook] = None,
+) -> List[Category]:
+    """
+    Асинхронно загружает несколько файлов, не более limit одновременно
+    :param paths: Пути к JSON файлам
+    :param limit: Максимальное число одновременных загрузок
+    :param executor: Пул потоков или процессов для блокирующей работы
+    :param timing_hook: Функция, получающая максимальную задержку loop и время работы в исполнителе
+    :return: Категории всех файлов в порядке путей
+    :raises CatalogLoadError: Со сводкой ошибок по всем файлам, которые не удалось загрузить
+    """
+    if limit < 1:
+        raise ValueError("Лимит одновременных загрузок должен быть положительным")
+    file_paths = [str(path) for path in paths]
+    semaphore = asyncio.Semaphore(limit)
+
+    async def load_one(file_path: str) -> List[Category]:
+        async with semaphore:
+            return await load_categories_async(file_path, executor, timing_hook)
+
+    results = await asyncio.gather(*(load_one(file_path) for file_path in file_paths), return_exceptions=True)
+
+    categories: List[Category] = []
+    errors: Dict[str, str] = {}
+    for file_path, result in zip(file_paths, results):
+        if isinstance(result, (OSError, ValueError)):
+            errors[file_path] = str(result)
+        elif isinstance(result, BaseException):
+            raise result
+        else:
+            categories.extend(result)
+    if errors:
+        raise CatalogLoadError(errors, categories)
+    return categories
@@ -0,0 +1,80 @@
+import os
+import stat
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+from typing import IO, Any, Iterator, Optional
+
+
+def _read_umask() -> Optional[int]:
+    """Umask процесса из /proc/self/status (Linux 4.7+) без его изменения; None, если строки нет"""
+    try:
+        with open("/proc/self/status", encoding="ascii") as status:
+            for line in status:
+                if line.startswith("Umask:"):
+                    return int(line.split()[1], 8)
+    except (OSError, ValueError):
+        pass
+    return None
+
+
+def _import_umask() -> int:
+    """Umask на момент импорта; os.umask читает значение только вместе с записью, поэтому вызывается один раз"""
+    umask = _read_umask()
+    if umask is None:
+        umask = os.umask(0o022)
+        os.umask(umask)
+    return umask
+
+
+_IMPORT_UMASK = _import_umask()
+
+
+def _new_file_mode() -> int:
+    """Права нового файла, как у open(): 0666 с учетом umask процесса (umask процесса не меняется)"""
+    umask = _read_umask()
+    return 0o666 & ~(_IMPORT_UMASK if umask is None else umask)
+
+
+@contextmanager
+def atomic_write(
+    file_path: str | Path, mode: str = "w", encoding: Optional[str] = None, buffering: int = -1
+) -> Iterator[IO[Any]]:
+    """
+    Открывает временный файл рядом с целевым и атомарно заменяет им целевой при выходе из блока.
+
+    Читатели (в том числе отобразившие старый файл через mmap) до замены видят
+    прежнее содержимое, а не частично записанный файл. Данные сбрасываются на диск
+    (fsync) до замены, а сама замена - после нее, поэтому сбой питания не оставляет
+    пустой или обрезанный файл. Права заменяемого файла сохраняются, новый файл
+    получает права с учетом umask. При ошибке временный файл удаляется, целевой не меняется.
+    :param file_path: Путь к целевому файлу
+    :param mode: "w" для текста или "wb" для байтов
+    :param encoding: Кодировка для текстового режима
+    :param buffering: Размер буфера записи
+    """
+    target = Path(file_path)
+    descriptor, temp_path = tempfile.mkstemp(prefix=f".{target.name}.", suffix=".tmp", dir=target.parent)
+    try:
+        with open(descriptor, mode, encoding=encoding, buffering=buffering) as file:
+            yield file
+            file.flush()
+            os.fsync(file.fileno())
+        # mkstemp создает файл с правами 0600
+        os.chmod(temp_path, stat.S_IMODE(os.stat(target).st_mode) if target.exists() else _new_file_mode())
+        os.replace(temp_path, target)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+    _fsync_directory(target.parent)
+
+
+def _fsync_directory(directory: Path) -> None:
+    """Сбрасывает на диск запись каталога, чтобы замена файла пережила сбой (только POSIX)"""
+    if not hasattr(os, "O_DIRECTORY"):
+        return
+    descriptor = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+    try:
+        os.fsync(descriptor)
+    finally:
+        os.close(descriptor)
@@ -1,5 +1,6 @@
 from abc import ABC, abstractmethod
-from typing import List, TypeVar, Generic
+from typing import Generic, List, TypeVar
+
 from src.product import Product
 
 T = TypeVar("T", bound=Product)
@@ -2,13 +2,16 @@ from abc import ABC, abstractmethod
 
 
 class BaseProduct(ABC):
+    # Хранилище атрибутов объявляют подклассы (см. Product.__slots__)
+    __slots__ = ()
+
     @abstractmethod
     def __init__(self, name: str, description: str, price: float, quantity: int):
         """Базовый абстрактный класс для всех продуктов"""
-        self.name = name
-        self.description = description
-        self.price = price
-        self.quantity = quantity
+        self.name = name  # type: ignore[misc]
+        self.description = description  # type: ignore[misc]
+        self.price = price  # type: ignore[misc]
+        self.quantity = quantity  # type: ignore[misc]
 
     @abstractmethod
     def __str__(self) -> str:
@@ -31,4 +34,4 @@ class BaseProduct(ABC):
         """Общий метод для применения скидки"""
         if discount <= 0 or discount > 1:
             raise ValueError("Скидка должна быть между 0 и 1")
-        self.price *= 1 - discount
+        self.price *= 1 - discount  # type: ignore[misc]
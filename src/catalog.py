@@ -0,0 +1,302 @@
+import heapq
+import threading
+from concurrent.futures import Executor
+from decimal import Decimal
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple, Type, TypeVar
+
+from src.base_container import BaseContainer
+from src.category import Category
+from src.lazy_category import LazyCategory
+from src.loaders import JsonLoader
+from src.product import Product, _to_decimal
+from src.product_registry import get_type_tag
+
+R = TypeVar("R")
+
+
+class Rollup(NamedTuple):
+    """Сводка по группе товаров; средняя цена - по товарам с положительным остатком, как в Category"""
+
+    product_count: int
+    total_value: float
+    average_price: float
+    quantity: int
+
+
+class _Totals:
+    """Накопленные суммы группы товаров, обновляемые за O(1)"""
+
+    __slots__ = ("count", "total_value", "positive_value", "positive_quantity")
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.total_value = Decimal(0)
+        self.positive_value = Decimal(0)
+        self.positive_quantity = 0
+
+    def account(self, price: Decimal, quantity: int, sign: int) -> None:
+        value = price * quantity
+        self.count += sign
+        self.total_value += sign * value
+        if quantity > 0:
+            self.positive_value += sign * value
+            self.positive_quantity += sign * quantity
+
+    def merge(self, other: "_Totals", sign: int = 1) -> None:
+        self.count += sign * other.count
+        self.total_value += sign * other.total_value
+        self.positive_value += sign * other.positive_value
+        self.positive_quantity += sign * other.positive_quantity
+
+    def rollup(self) -> Rollup:
+        quantity = self.positive_quantity
+        average = float(self.positive_value) / quantity if quantity else 0.0
+        return Rollup(self.count, float(self.total_value), average, quantity)
+
+
+# Колонки категории для подсчета сводок: теги типов, цены и количества
+Columns = Tuple[Sequence[str], Sequence[Any], Sequence[int]]
+
+
+def _category_columns(category: Category) -> Columns:
+    """
+    Колонки категории; ленивая категория отдает сырые записи без материализации.
+    В отличие от самой категории (подписчики, индексы) колонки компактно сериализуются для процессов
+    """
+    columns = category.raw_columns() if isinstance(category, LazyCategory) else None
+    if columns is not None:
+        return columns
+    products = category.products
+    return (
+        [get_type_tag(type(product)) for product in products],
+        [product._price for product in products],
+        [product.quantity for product in products],
+    )
+
+
+def _column_totals(columns: Columns) -> Dict[str, _Totals]:
+    """Суммы по тегам типов из колонок категории"""
+    tags, prices, quantities = columns
+    # Цены ленивых категорий - сырые float из записей, у обычных - уже Decimal
+    decimals = prices if isinstance(prices, list) else map(_to_decimal, prices)
+    totals: Dict[str, _Totals] = {}
+    for tag, price, quantity in zip(tags, decimals, quantities):
+        group = totals.get(tag) or totals.setdefault(tag, _Totals())
+        group.account(price, quantity, 1)
+    return totals
+
+
+def _type_totals(category: Category) -> Dict[str, _Totals]:
+    """Суммы категории по тегам типов"""
+    return _column_totals(_category_columns(category))
+
+
+class Catalog(BaseContainer[Product]):
+    """
+    Каталог из нескольких категорий со сводками по категориям, типам и всему каталогу.
+
+    Сводки по категориям берутся из накопленных агрегатов самих категорий,
+    сводки по типам товаров и общая сводка поддерживаются каталогом: он
+    подписан на события категорий (добавление, удаление, изменение цены и
+    количества товаров) и обновляет суммы за O(1) на событие.
+    """
+
+    def __init__(self, name: str, description: str = "", categories: Optional[Iterable[Category]] = None) -> None:
+        super().__init__(name, description)
+        self._categories: Dict[str, Category] = {}
+        self._types: Dict[str, _Totals] = {}
+        self._global = _Totals()
+        # События приходят из потоков, меняющих разные категории (например, ReservationEngine)
+        self._lock = threading.Lock()
+        # Кэш __str__: ((название, число категорий), строка); сбрасывается при изменении сводок
+        self._str_cache: Optional[Tuple[Any, str]] = None
+        for category in categories or ():
+            self.add_category(category)
+
+    @classmethod
+    def load(cls, name: str, paths: str | Path | Iterable[str | Path], max_workers: Optional[int] = None) -> "Catalog":
+        """Загружает каталог из JSON файлов (параллельно, см. JsonLoader.load_many)"""
+        return cls(name, categories=JsonLoader.load_many(paths, max_workers))
+
+    @property
+    def items(self) -> List[Product]:
+        """Все товары всех категорий"""
+        return [product for category in self._categories.values() for product in category.products]
+
+    @property
+    def categories(self) -> List[Category]:
+        return list(self._categories.values())
+
+    @property
+    def product_count(self) -> int:
+        return self._global.count
+
+    def add_category(self, category: Category) -> None:
+        """Добавляет категорию; названия категорий в каталоге уникальны"""
+        if category.name in self._categories:
+            raise ValueError(f"Категория '{category.name}' уже есть в каталоге")
+        self._merge(_type_totals(category), 1)
+        self._categories[category.name] = category
+        if category._watchers is None:
+            category._watchers = []
+        category._watchers.append(self)
+
+    def remove_category(self, name: str) -> Category:
+        """Удаляет категорию из каталога и возвращает ее"""
+        category = self.get_category(name)
+        del self._categories[name]
+        if category._watchers:
+            category._watchers.remove(self)
+        self._merge(_type_totals(category), -1)
+        return category
+
+    def get_category(self, name: str) -> Category:
+        try:
+            return self._categories[name]
+        except KeyError:
+            raise ValueError(f"Категория '{name}' не найдена в каталоге") from None
+
+    def _merge(self, totals: Dict[str, _Totals], sign: int) -> None:
+        with self._lock:
+            for tag, group in totals.items():
+                self._types.setdefault(tag, _Totals()).merge(group, sign)
+                self._global.merge(group, sign)
+            self._invalidate()
+
+    def _on_products_added(self, category: Category, products: List[Product]) -> None:
+        self._account(products, 1)
+
+    def _on_products_removed(self, category: Category, products: List[Product]) -> None:
+        self._account(products, -1)
+
+    def _account(self, products: List[Product], sign: int) -> None:
+        # Теги вычисляются до изменения сумм: ошибка не оставляет сводки учтенными наполовину
+        tags = [get_type_tag(type(product)) for product in products]
+        with self._lock:
+            for tag, product in zip(tags, products):
+                group = self._types.get(tag) or self._types.setdefault(tag, _Totals())
+                group.account(product._price, product.quantity, sign)
+                self._global.account(product._price, product.quantity, sign)
+            self._invalidate()
+
+    def _on_product_change(self, product: Product, old_price: Decimal, old_quantity: int) -> None:
+        tag = get_type_tag(type(product))
+        with self._lock:
+            group = self._types.get(tag) or self._types.setdefault(tag, _Totals())
+            for totals in (group, self._global):
+                totals.account(old_price, old_quantity, -1)
+                totals.account(product._price, product.quantity, 1)
+            self._invalidate()
+
+    def _on_products_repriced(self, category: Category, products: List[Product], old_prices: List[Decimal]) -> None:
+        tags = [get_type_tag(type(product)) for product in products]
+        with self._lock:
+            for tag, product, old_price in zip(tags, products, old_prices):
+                group = self._types.get(tag) or self._types.setdefault(tag, _Totals())
+                for totals in (group, self._global):
+                    totals.account(old_price, product.quantity, -1)
+                    totals.account(product._price, product.quantity, 1)
+            self._invalidate()
+
+    def _invalidate(self) -> None:
+        """Сбрасывает кэшированное строковое представление"""
+        self._str_cache = None
+
+    @property
+    def total_value(self) -> float:
+        """Общая стоимость всех товаров каталога, O(1)"""
+        return float(self._global.total_value)
+
+    def rollup(self) -> Rollup:
+        """Сводка по всему каталогу, O(1)"""
+        return self._global.rollup()
+
+    def category_rollups(self) -> Dict[str, Rollup]:
+        """Сводки по категориям из их накопленных агрегатов, O(число категорий)"""
+        rollups = {}
+        for name, category in self._categories.items():
+            total_value, positive_value, positive_quantity = category._totals()
+            average = positive_value / positive_quantity if positive_quantity else 0.0
+            rollups[name] = Rollup(category.product_count, total_value, average, positive_quantity)
+        return rollups
+
+    def type_rollups(self) -> Dict[str, Rollup]:
+        """Сводки по тегам типов товаров ("product", "smartphone", ...), O(число типов)"""
+        return {tag: totals.rollup() for tag, totals in self._types.items() if totals.count}
+
+    def aggregate(self, func: Callable[[Category], R], executor: Optional[Executor] = None) -> Dict[str, R]:
+        """
+        Параллельно применяет функцию к каждой категории.
+
+        Категории каталога не сериализуются (подписчики держат блокировки), поэтому
+        исполнитель должен работать в этом процессе (ThreadPoolExecutor); сводки по
+        типам в процессах пересчитывает rebuild_rollups.
+        :param func: Функция от категории
+        :param executor: Исполнитель; по умолчанию - последовательно в текущем потоке
+        :return: {название категории: результат}
+        """
+        categories = list(self._categories.values())
+        results = executor.map(func, categories) if executor is not None else map(func, categories)
+        return dict(zip(self._categories, results))
+
+    def rebuild_rollups(self, executor: Optional[Executor] = None) -> None:
+        """
+        Пересчитывает сводки по типам полным проходом, по категории на задачу исполнителя.
+
+        Исполнителю передаются только колонки категорий (теги, цены, количества),
+        поэтому подходит и ProcessPoolExecutor. Изменения товаров ждут конца
+        пересчета, а новые сводки заменяют старые одним присваиванием под блокировкой:
+        ни одно событие не теряется и не учитывается дважды, читатели не видят
+        частично собранных сумм.
+        """
+        with self._lock:
+            columns = [_category_columns(category) for category in self._categories.values()]
+            partial_totals = (
+                executor.map(_column_totals, columns) if executor is not None else map(_column_totals, columns)
+            )
+            types: Dict[str, _Totals] = {}
+            global_totals = _Totals()
+            for totals in partial_totals:
+                for tag, group in totals.items():
+                    types.setdefault(tag, _Totals()).merge(group)
+                    global_totals.merge(group)
+            self._types, self._global = types, global_totals
+            self._invalidate()
+
+    def find_by_name(self, name: str) -> List[Product]:
+        """Товары с точным названием во всех категориях"""
+        return [product for category in self._categories.values() for product in category.find_by_name(name)]
+
+    def products_of_type(self, product_type: Type[Product]) -> List[Product]:
+        """Товары заданного типа во всех категориях"""
+        return [
+            product for category in self._categories.values() for product in category.products_of_type(product_type)
+        ]
+
+    def products_in_price_range(
+        self, min_price: Optional[float] = None, max_price: Optional[float] = None
+    ) -> List[Product]:
+        """Товары всех категорий в диапазоне цен, по возрастанию цены (слияние отсортированных индексов)"""
+        ranges = [category.products_in_price_range(min_price, max_price) for category in self._categories.values()]
+        return list(heapq.merge(*ranges, key=_price_key))
+
+    def cheapest(self, count: int) -> List[Product]:
+        """count самых дешевых товаров каталога"""
+        ranges = [category.cheapest(count) for category in self._categories.values()]
+        return list(heapq.merge(*ranges, key=_price_key))[: max(count, 0)]
+
+    def __str__(self) -> str:
+        key = (self.name, len(self._categories))
+        cache = self._str_cache
+        if cache is None or cache[0] != key:
+            text = (
+                f"{self.name}, категорий: {len(self._categories)}, товаров: {self.product_count}, "
+                f"общая стоимость: {self.total_value:.2f} руб."
+            )
+            cache = self._str_cache = (key, text)
+        return cache[1]
+
+
+def _price_key(product: Product) -> Any:
+    return product._price
@@ -1,99 +1,517 @@
+import atexit
 import logging
-from typing import List, Optional, Type
+import queue
+import threading
+from decimal import Decimal
+from itertools import compress
+from logging.handlers import QueueHandler, QueueListener
+from operator import mul
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Type
 
 from mypy.reachability import TypeVar
 
-from src.exceptions import ZeroQuantityError
+from src.category_index import CategoryIndex
+from src.columnar import ColumnarStore
+from src.exceptions import AggregateMismatchError, ZeroQuantityError
+from src.metrics import increment, timed
 from src.product import Product
+from src.product_registry import products_from_dicts
+from src.search import SearchIndex
 
 T = TypeVar("T", bound=Product)
 
 
+class _LazyQueueHandler(QueueHandler):
+    """
+    Ставит записи в очередь для вывода в отдельном потоке.
+
+    Поток записи запускается при первой записи, а не при импорте модуля,
+    и останавливается (с выводом оставшихся записей) при завершении процесса.
+    """
+
+    def __init__(self, log_queue: "queue.SimpleQueue[logging.LogRecord]", target: logging.Handler) -> None:
+        super().__init__(log_queue)
+        self.target = target
+        self.listener: Optional[QueueListener] = None
+        self._start_lock = threading.Lock()
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        if self.listener is None:
+            self._start_listener()
+        super().enqueue(record)
+
+    def _start_listener(self) -> None:
+        with self._start_lock:
+            if self.listener is None:
+                listener = QueueListener(self.queue, self.target)
+                listener.start()
+                atexit.register(self.stop_listener)
+                self.listener = listener
+
+    def stop_listener(self) -> None:
+        """Выводит оставшиеся записи и останавливает поток записи"""
+        with self._start_lock:
+            if self.listener is not None:
+                self.listener.stop()
+                self.listener = None
+                atexit.unregister(self.stop_listener)
+
+
+def _setup_logger() -> logging.Logger:
+    """Настраивает логгер категорий один раз: запись в поток выполняется в отдельном потоке через очередь"""
+    logger = logging.getLogger("Category")
+    logger.setLevel(logging.INFO)
+    if not logger.handlers:
+        handler = logging.StreamHandler()
+        handler.setFormatter(logging.Formatter("%(name)s - %(message)s"))
+        logger.addHandler(_LazyQueueHandler(queue.SimpleQueue(), handler))
+    return logger
+
+
+_logger = _setup_logger()
+
+
 class Category:
-    def __init__(self, name: str, description: str, products: Optional[List[Product]] = None):
+    # Режим отладки: сверять накопленные агрегаты с полным пересчетом при каждом запросе
+    verify_aggregates: bool = False
+    # Доля вызовов add_product, для которых пишутся INFO-сообщения (ошибки пишутся всегда)
+    log_sample_rate: float = 1.0
+
+    def __init__(self, name: str, description: str, products: Optional[List[Product]] = None, columnar: bool = False):
         self.name = name
         self.description = description
-        self._products = products if products is not None else []
-        self.logger = logging.getLogger("Category")
-        self.logger.setLevel(logging.INFO)
-
-        # Добавляем обработчик, если его нет
-        if not self.logger.handlers:
-            handler = logging.StreamHandler()
-            handler.setFormatter(logging.Formatter("%(name)s - %(message)s"))
-            self.logger.addHandler(handler)
+        # Своя копия списка: изменения списка вызывающего не должны обходить агрегаты
+        self._products = list(products) if products is not None else []
+        # Колоночное хранилище для быстрых агрегатов по большим категориям
+        self._columns: Optional[ColumnarStore] = ColumnarStore(self._products) if columnar else None
+        # Накопленные агрегаты, обновляемые за O(1) при каждом изменении
+        self._total_value = Decimal(0)
+        self._positive_value = Decimal(0)
+        self._positive_quantity = 0
+        self._positive_count = 0
+        # Контейнеры над категорией (например, Catalog), получающие события об изменениях товаров
+        self._watchers: Optional[List[Any]] = None
+        # Текст render() вместе с названием категории, для которого он собран;
+        # сбрасывается при изменении состава, цен, количеств и атрибутов товаров
+        self._render_cache: Optional[Tuple[str, str]] = None
+        self._attach_many(self._products)
+        # Вторичные индексы строятся при первом поиске и далее поддерживаются add_product
+        self._index: Optional[CategoryIndex] = None
+        # Полнотекстовый индекс (может быть общим для нескольких категорий)
+        self._search: Optional[SearchIndex] = None
+        self.logger = _logger
+        self._log_counter = 0
 
     @classmethod
-    def from_dict(cls, data: dict) -> "Category":
+    def from_dict(cls, data: dict, columnar: bool = False) -> "Category":
         """Создает категорию из словаря"""
-        from src.product import Product  # Локальный импорт во избежание циклических зависимостей
-
         # Проверяем обязательные поля
         if "name" not in data or "description" not in data:
             raise ValueError("Отсутствуют обязательные поля 'name' или 'description'")
 
+        rows = data.get("products", [])
+        if not isinstance(rows, list) or not all(isinstance(row, dict) for row in rows):
+            raise ValueError("Поле 'products' должно быть списком объектов")
+
         # Обрабатываем продукты
-        products = []
-        if "products" in data:
-            for product_data in data["products"]:
-                try:
-                    products.append(
-                        Product(
-                            name=str(product_data["name"]),
-                            description=str(product_data["description"]),
-                            price=float(product_data["price"]),
-                            quantity=int(product_data["quantity"]),
-                        )
-                    )
-                except (KeyError, ValueError) as e:
-                    raise ValueError(f"Ошибка создания продукта: {str(e)}")
-
-        return cls(name=str(data["name"]), description=str(data["description"]), products=products)
+        try:
+            products = products_from_dicts(rows)
+        except ValueError as e:
+            raise ValueError(f"Ошибка создания продукта: {str(e)}")
+
+        return cls(name=str(data["name"]), description=str(data["description"]), products=products, columnar=columnar)
 
     @property
     def products(self) -> List[Product]:
-        return self._products
+        """Копия списка товаров; состав меняется только через add_product/remove_product"""
+        return list(self._products)
+
+    @property
+    def product_count(self) -> int:
+        """Количество товаров в категории"""
+        return len(self._products)
+
+    @property
+    def columnar(self) -> bool:
+        """Используется ли колоночное хранилище"""
+        return self._columns is not None
+
+    @property
+    def total_value(self) -> float:
+        """Общая стоимость всех товаров категории"""
+        if self.verify_aggregates:
+            self.check_aggregates()
+        return float(self._total_value)
+
+    def _attach(self, product: Product) -> None:
+        """Подписывается на изменения товара и учитывает его в агрегатах"""
+        if product._watchers is None:
+            product._watchers = []
+        product._watchers.append(self)
+        self._account(product._price, product.quantity, 1)
+
+    def _attach_many(self, products: List[Product]) -> None:
+        """Пакетный вариант _attach: агрегаты считаются одним проходом по колонкам"""
+        for product in products:
+            if product._watchers is None:
+                product._watchers = [self]
+            else:
+                product._watchers.append(self)
+        self._account_many(products, 1)
+
+    def _account_many(self, products: List[Product], sign: int) -> None:
+        """Пакетный вариант _account: вклад товаров считается одним проходом по колонкам"""
+        prices = [product._price for product in products]
+        quantities = [product.quantity for product in products]
+        values = list(map(mul, prices, quantities))
+        positive = [quantity > 0 for quantity in quantities]
+        self._render_cache = None
+        self._total_value += sign * sum(values, Decimal(0))
+        self._positive_value += sign * sum(compress(values, positive), Decimal(0))
+        self._positive_quantity += sign * sum(compress(quantities, positive))
+        self._positive_count += sign * sum(positive)
+
+    def _account(self, price: Decimal, quantity: int, sign: int) -> None:
+        """Добавляет (sign=1) или вычитает (sign=-1) вклад товара в агрегаты"""
+        self._render_cache = None
+        value = price * quantity
+        self._total_value += sign * value
+        if quantity > 0:
+            self._positive_value += sign * value
+            self._positive_quantity += sign * quantity
+            self._positive_count += sign
+
+    def _on_product_change(self, product: Product, old_price: Decimal, old_quantity: int) -> None:
+        """Обработчик изменения цены или количества товара"""
+        # Колонки первыми: недопустимое количество отклоняется до изменения агрегатов
+        if self._columns is not None:
+            self._columns.update(product)
+        self._account(old_price, old_quantity, -1)
+        self._account(product._price, product.quantity, 1)
+        if self._index is not None:
+            self._index.update_price(product, old_price)
+        for watcher in self._watchers or ():
+            watcher._on_product_change(product, old_price, old_quantity)
+
+    def _reprice(self, products: List[Product], prices: List[Decimal]) -> None:
+        """
+        Пакетно задает цены товарам категории (для PricingEngine).
+
+        Агрегаты пересчитываются двумя проходами по колонкам, индекс цен пересортировывается
+        один раз при запросе, каталог получает одно событие; остальные контейнеры товара
+        (другие категории, фасетный индекс) уведомляются как при обычной смене цены.
+        """
+        old_prices = [product._price for product in products]
+        self._account_many(products, -1)
+        if self._index is not None:
+            self._index.invalidate_order()
+        try:
+            for product, price, old_price in zip(products, prices, old_prices):
+                product._price = price
+                product._str_cache = None
+                if self._columns is not None:
+                    self._columns.update(product)
+                for watcher in product._watchers or ():
+                    if watcher is not self:
+                        watcher._on_product_change(product, old_price, product._quantity)
+        finally:
+            # Агрегаты и каталог отражают записанные цены, даже если уведомление прервалось ошибкой
+            self._account_many(products, 1)
+            for watcher in self._watchers or ():
+                watcher._on_products_repriced(self, products, old_prices)
+
+    def _on_product_text_change(self, product: Product) -> None:
+        """Обработчик изменения атрибутов товара без сеттеров (см. Product.notify_changed)"""
+        self._render_cache = None
+        if self._index is not None:
+            self._index.update_name(product)
+        if self._search is not None:
+            self._search.update(product)
+
+    def _totals(self) -> Tuple[float, float, int]:
+        """Общая стоимость, стоимость и количество товаров с положительным остатком"""
+        return float(self._total_value), float(self._positive_value), self._positive_quantity
+
+    def check_aggregates(self) -> None:
+        """
+        Сверяет накопленные агрегаты с полным пересчетом
+        :raises AggregateMismatchError: Если значения расходятся
+        """
+        positive = [p for p in self._products if p.quantity > 0]
+        expected: Dict[str, Decimal] = {
+            "total_value": sum((p._price * p.quantity for p in self._products), Decimal(0)),
+            "positive_value": sum((p._price * p.quantity for p in positive), Decimal(0)),
+            "positive_quantity": Decimal(sum(p.quantity for p in positive)),
+            "positive_count": Decimal(len(positive)),
+        }
+        for name, value in expected.items():
+            cached = getattr(self, f"_{name}")
+            # Допуск на округление в контексте Decimal при разном порядке суммирования
+            if abs(cached - value) > Decimal("1e-9") * max(Decimal(1), abs(value)):
+                raise AggregateMismatchError(f"Агрегат {name} категории '{self.name}': {cached} != {value}")
 
     def add_product(self, product: Product, allowed_types: Optional[List[Type[Product]]] = None) -> None:
         """Добавляет товар в категорию с проверкой типа"""
         if product is None:
             raise ValueError("Нельзя добавить None в качестве товара")
 
-        self.logger.info(f"Начало добавления товара: {product.name}")
+        log_info = self._sample_info()
+        if log_info:
+            self.logger.info("Начало добавления товара: %s", product.name)
 
         try:
-            if not isinstance(product, Product):
-                raise TypeError("Можно добавлять только объекты класса Product")
-
-            if product.quantity <= 0:
-                raise ZeroQuantityError("Товар с нулевым количеством не может быть добавлен")
-
-            if allowed_types and not any(isinstance(product, t) for t in allowed_types):
-                allowed_names = [t.__name__ for t in allowed_types]
-                raise TypeError(f"Разрешены только: {', '.join(allowed_names)}")
-
-            self._products.append(product)
-            self.logger.info(f"Товар '{product.name}' успешно добавлен")
+            with timed("category.add_product"):
+                self._validate(product, allowed_types)
+                self._insert(product)
+            if log_info:
+                self.logger.info("Товар '%s' успешно добавлен", product.name)
 
         except (ZeroQuantityError, TypeError) as e:
+            increment("category.add_product.errors")
             self.logger.error(str(e))
             raise
         finally:
-            self.logger.info("Обработка добавления товара завершена")
+            if log_info:
+                self.logger.info("Обработка добавления товара завершена")
+
+    def add_products(self, products: Iterable[Product], allowed_types: Optional[List[Type[Product]]] = None) -> int:
+        """
+        Добавляет пачку товаров: вся пачка проверяется до изменения категории,
+        в лог пишется одна итоговая запись
+        :param products: Товары
+        :param allowed_types: Разрешенные типы товаров
+        :return: Количество добавленных товаров
+        :raises ValueError, TypeError, ZeroQuantityError: Если хотя бы один товар не прошел проверку
+        """
+        batch = list(products)
+        for position, product in enumerate(batch):
+            try:
+                if product is None:
+                    raise ValueError("Нельзя добавить None в качестве товара")
+                self._validate(product, allowed_types)
+            except (ValueError, TypeError) as e:
+                self.logger.error("Товар #%d: %s", position, e)
+                raise type(e)(f"Товар #{position}: {e}") from e
+
+        self._insert_many(batch)
+        self.logger.info("Добавлено товаров в категорию '%s': %d", self.name, len(batch))
+        return len(batch)
+
+    def _insert(self, product: Product) -> None:
+        """Добавляет товар без проверок и логирования, обновляя агрегаты, колонки и индексы"""
+        # Колонки первыми: товар с недопустимым количеством не попадает в категорию
+        if self._columns is not None:
+            self._columns.append(product)
+        self._products.append(product)
+        self._attach(product)
+        if self._index is not None:
+            self._index.add(product)
+        if self._search is not None:
+            self._search.add(product)
+        for watcher in self._watchers or ():
+            watcher._on_products_added(self, [product])
+
+    def _insert_many(self, products: List[Product]) -> None:
+        """Пакетный вариант _insert: агрегаты считаются одним проходом, контейнеры получают одно событие"""
+        if not products:
+            return
+        if self._columns is not None:
+            self._columns.append_many(products)
+        self._products.extend(products)
+        self._attach_many(products)
+        for product in products:
+            if self._search is not None:
+                self._search.add(product)
+        if self._index is not None:
+            self._index.add_many(products)
+        for watcher in self._watchers or ():
+            watcher._on_products_added(self, products)
+
+    @staticmethod
+    def _validate(product: Product, allowed_types: Optional[List[Type[Product]]]) -> None:
+        """Проверяет, что товар можно добавить в категорию"""
+        if not isinstance(product, Product):
+            raise TypeError("Можно добавлять только объекты класса Product")
+
+        if product.quantity <= 0:
+            raise ZeroQuantityError("Товар с нулевым количеством не может быть добавлен")
+
+        if allowed_types and not any(isinstance(product, t) for t in allowed_types):
+            allowed_names = [t.__name__ for t in allowed_types]
+            raise TypeError(f"Разрешены только: {', '.join(allowed_names)}")
+
+    def _sample_info(self) -> bool:
+        """Решает, писать ли INFO-сообщения для текущего вызова (с учетом log_sample_rate)"""
+        if self.log_sample_rate <= 0 or not self.logger.isEnabledFor(logging.INFO):
+            return False
+        self._log_counter += 1
+        if self._log_counter * self.log_sample_rate < 1:
+            return False
+        self._log_counter = 0
+        return True
+
+    def remove_product(self, product: Product) -> None:
+        """Удаляет товар из категории"""
+        self._products.remove(product)
+        if product._watchers:
+            product._watchers.remove(self)
+        self._account(product._price, product.quantity, -1)
+        if self._columns is not None:
+            self._columns.remove(product)
+        if self._index is not None:
+            self._index.remove(product)
+        if self._search is not None:
+            self._search.remove(product)
+        for watcher in self._watchers or ():
+            watcher._on_products_removed(self, [product])
+
+    def remove_products(self, products: Iterable[Product]) -> None:
+        """
+        Удаляет пачку товаров: список товаров фильтруется одним проходом, колонки,
+        индекс цен и агрегаты пересчитываются один раз, а не на каждый товар
+        :raises ValueError: Если какого-то товара нет в категории (категория не меняется)
+        """
+        ids = {id(product) for product in products}
+        if not ids:
+            return
+        kept: List[Product] = []
+        removed: List[Product] = []
+        for product in self._products:
+            (removed if id(product) in ids else kept).append(product)
+        if len(removed) != len(ids):
+            raise ValueError("Товар не найден в категории")
+
+        self._products[:] = kept
+        for product in removed:
+            if product._watchers:
+                product._watchers.remove(self)
+        self._account_many(removed, -1)
+        if self._columns is not None:
+            self._columns = ColumnarStore(kept)
+        if self._index is not None:
+            self._index.remove_many(removed)
+        if self._search is not None:
+            for product in removed:
+                self._search.remove(product)
+        for watcher in self._watchers or ():
+            watcher._on_products_removed(self, removed)
 
     def get_average_price(self) -> float:
         """Рассчитывает среднюю цену товаров"""
-        if not self._products:
-            self.logger.info("Категория пуста, средняя цена: 0")
-            return 0.0
-
-        valid_products = [p for p in self._products if p.quantity > 0]
-        if not valid_products:
-            self.logger.info("Нет товаров с положительным количеством, средняя цена: 0")
-            return 0.0
-
-        total_price = sum(p.price * p.quantity for p in valid_products)
-        total_quantity = sum(p.quantity for p in valid_products)
-        average = total_price / total_quantity
-        self.logger.info(f"Средняя цена: {average:.2f}")
-        return average
+        with timed("category.get_average_price"):
+            if self.verify_aggregates:
+                self.check_aggregates()
+
+            if not self._products:
+                self.logger.info("Категория пуста, средняя цена: 0")
+                return 0.0
+
+            if not self._positive_count:
+                self.logger.info("Нет товаров с положительным количеством, средняя цена: 0")
+                return 0.0
+
+            average = float(self._positive_value) / self._positive_quantity
+            self.logger.info("Средняя цена: %.2f", average)
+            return average
+
+    def apply_discount(self, discount: float) -> None:
+        """
+        Применяет скидку ко всем товарам категории
+
+        Args:
+            discount: Размер скидки (от 0 до 1)
+        """
+        if not 0 < discount <= 1:
+            raise ValueError("Скидка должна быть между 0 и 1")
+        with timed("category.apply_discount"):
+            if self._index is not None:
+                self._index.invalidate_order()
+            for product in self._products:
+                product.apply_discount(discount)
+
+    def filter_products(
+        self,
+        min_price: Optional[float] = None,
+        max_price: Optional[float] = None,
+        product_type: Optional[Type[Product]] = None,
+    ) -> List[Product]:
+        """Возвращает товары в диапазоне цен и (опционально) заданного типа"""
+        if self._columns is not None:
+            return [self._products[row] for row in self._columns.select(min_price, max_price, product_type)]
+        return [
+            p
+            for p in self._products
+            if (min_price is None or p.price >= min_price)
+            and (max_price is None or p.price <= max_price)
+            and (product_type is None or type(p) is product_type)
+        ]
+
+    def render(self) -> str:
+        """
+        Текст категории для страниц каталога: заголовок и строки всех товаров.
+
+        Собирается одним join из кэшированных строк товаров и кэшируется целиком
+        до изменения состава, цен, количеств или названия категории. Атрибуты
+        товаров без сеттеров (название, характеристики) отслеживаются через
+        Product.notify_changed().
+        """
+        cache = self._render_cache
+        if cache is None or cache[0] != self.name:
+            products = self.products
+            header = f"{self.name}, количество продуктов: {len(products)} шт."
+            cache = self._render_cache = (self.name, "\n".join([header, *map(str, products)]))
+        return cache[1]
+
+    def invalidate_render(self) -> None:
+        """Сбрасывает кэш render()"""
+        self._render_cache = None
+
+    @property
+    def index(self) -> CategoryIndex:
+        """Вторичные индексы категории (строятся при первом обращении)"""
+        if self._index is None:
+            self._index = CategoryIndex(self._products)
+        return self._index
+
+    @property
+    def has_index(self) -> bool:
+        """Построены ли вторичные индексы (без их построения)"""
+        return self._index is not None
+
+    def invalidate_index(self) -> None:
+        """Сбрасывает вторичные индексы (перестроятся при следующем поиске), например после переименования товаров"""
+        self._index = None
+
+    @property
+    def search_index(self) -> Optional[SearchIndex]:
+        """Полнотекстовый индекс, обновляемый при добавлении и удалении товаров"""
+        return self._search
+
+    def set_search_index(self, index: Optional[SearchIndex]) -> None:
+        """Подключает полнотекстовый индекс и добавляет в него товары категории (None - отключает)"""
+        if index is not None:
+            for product in self.products:
+                index.add(product)
+        self._search = index
+
+    def find_by_name(self, name: str) -> List[Product]:
+        """Находит товары по точному названию (после изменения product.name вызовите product.notify_changed())"""
+        return self.index.by_name(name)
+
+    def products_in_price_range(
+        self, min_price: Optional[float] = None, max_price: Optional[float] = None
+    ) -> List[Product]:
+        """Возвращает товары в диапазоне цен, отсортированные по возрастанию цены"""
+        return self.index.price_range(min_price, max_price)
+
+    def cheapest(self, count: int) -> List[Product]:
+        """Возвращает count самых дешевых товаров"""
+        return self.index.cheapest(count)
+
+    def most_expensive(self, count: int) -> List[Product]:
+        """Возвращает count самых дорогих товаров"""
+        return self.index.most_expensive(count)
+
+    def products_of_type(self, product_type: Type[Product]) -> List[Product]:
+        """Возвращает товары заданного типа (Product, Smartphone, LawnGrass)"""
+        return self.index.by_type(product_type)
@@ -0,0 +1,139 @@
+from bisect import bisect_left, bisect_right, insort
+from decimal import Decimal
+from operator import attrgetter
+from typing import Dict, Iterable, List, Optional, Type
+
+from src.product import Product
+
+_price = attrgetter("_price")
+
+
+class CategoryIndex:
+    """
+    Вторичные индексы товаров категории: по названию, цене и типу.
+
+    Индекс цен - список товаров, отсортированный по цене. Одиночные добавления,
+    удаления и изменения цен поддерживают порядок через bisect: O(log n) поиск и
+    сдвиг хвоста списка, без пересортировки. Пакетные операции (add_many,
+    invalidate_order перед массовой переоценкой) только помечают список
+    устаревшим: он пересортировывается при следующем запросе, а почти
+    упорядоченный список Timsort сортирует за время, близкое к линейному.
+
+    Переименование товара индекс названий получает через Product.notify_changed
+    (update_name); без уведомления индекс можно перестроить через Category.invalidate_index.
+    """
+
+    def __init__(self, products: Iterable[Product] = ()) -> None:
+        products = list(products)
+        self._by_name: Dict[str, Dict[int, Product]] = {}
+        self._by_type: Dict[Type[Product], Dict[int, Product]] = {}
+        for product in products:
+            self._by_name.setdefault(product.name, {})[id(product)] = product
+            self._by_type.setdefault(type(product), {})[id(product)] = product
+        # Товары по возрастанию цены; при _dirty порядок нужно восстановить перед запросом
+        self._by_price: List[Product] = sorted(products, key=_price)
+        self._dirty = False
+
+    def add(self, product: Product) -> None:
+        """Добавляет товар во все индексы"""
+        self._by_name.setdefault(product.name, {})[id(product)] = product
+        self._by_type.setdefault(type(product), {})[id(product)] = product
+        if self._dirty:
+            self._by_price.append(product)
+        else:
+            insort(self._by_price, product, key=_price)
+
+    def add_many(self, products: List[Product]) -> None:
+        """Добавляет пачку товаров; порядок по цене восстанавливается одной сортировкой при запросе"""
+        for product in products:
+            self._by_name.setdefault(product.name, {})[id(product)] = product
+            self._by_type.setdefault(type(product), {})[id(product)] = product
+        if products:
+            self._by_price.extend(products)
+            self._dirty = True
+
+    def remove(self, product: Product) -> None:
+        """Удаляет товар из всех индексов"""
+        self._discard(self._by_name, product.name, product)
+        self._discard(self._by_type, type(product), product)
+        by_price = self._by_price
+        position = 0 if self._dirty else bisect_left(by_price, product._price, key=_price)
+        while by_price[position] is not product:
+            position += 1
+        del by_price[position]
+
+    def remove_many(self, products: List[Product]) -> None:
+        """Удаляет пачку товаров; индекс цен фильтруется одним проходом с сохранением порядка"""
+        for product in products:
+            self._discard(self._by_name, product.name, product)
+            self._discard(self._by_type, type(product), product)
+        ids = {id(product) for product in products}
+        self._by_price = [product for product in self._by_price if id(product) not in ids]
+
+    def update_price(self, product: Product, old_price: Decimal) -> None:
+        """Переставляет товар на место по новой цене: поиск по старой цене и вставка, O(log n + сдвиг)"""
+        if old_price == product._price or self._dirty:
+            return
+        by_price = self._by_price
+        # Сам товар уже с новой ценой; при поиске он должен сравниваться по старой, иначе bisect может его проскочить
+        position = bisect_left(by_price, old_price, key=lambda other: old_price if other is product else other._price)
+        while by_price[position] is not product:
+            position += 1
+        del by_price[position]
+        insort(by_price, product, key=_price)
+
+    def invalidate_order(self) -> None:
+        """Помечает индекс цен устаревшим перед массовой переоценкой: одна сортировка вместо вставки на товар"""
+        self._dirty = True
+
+    def update_name(self, product: Product) -> None:
+        """Переносит товар под новое название; старое ищется перебором названий, O(1) без переименования"""
+        if id(product) in self._by_name.get(product.name, {}):
+            return
+        for name, bucket in self._by_name.items():
+            if id(product) in bucket:
+                self._discard(self._by_name, name, product)
+                break
+        self._by_name.setdefault(product.name, {})[id(product)] = product
+
+    def by_name(self, name: str) -> List[Product]:
+        """Товары с точным совпадением названия, O(1)"""
+        return list(self._by_name.get(name, {}).values())
+
+    def by_type(self, product_type: Type[Product]) -> List[Product]:
+        """Товары заданного типа (без подклассов), O(1)"""
+        return list(self._by_type.get(product_type, {}).values())
+
+    def price_range(self, min_price: Optional[float] = None, max_price: Optional[float] = None) -> List[Product]:
+        """Товары с ценой в диапазоне [min_price, max_price], по возрастанию цены, O(log n + k)"""
+        by_price = self._sorted()
+        start = 0 if min_price is None else bisect_left(by_price, min_price, key=_price)
+        end = len(by_price) if max_price is None else bisect_right(by_price, max_price, key=_price)
+        return by_price[start:end]
+
+    def cheapest(self, count: int) -> List[Product]:
+        """count самых дешевых товаров"""
+        return self._sorted()[: max(count, 0)]
+
+    def most_expensive(self, count: int) -> List[Product]:
+        """count самых дорогих товаров, от дорогих к дешевым"""
+        if count <= 0:
+            return []
+        by_price = self._sorted()
+        start = max(len(by_price) - count, 0)
+        return by_price[start:][::-1]
+
+    def _sorted(self) -> List[Product]:
+        if self._dirty:
+            # Сортировка устойчива: товары с равной ценой сохраняют взаимный порядок
+            self._by_price.sort(key=_price)
+            self._dirty = False
+        return self._by_price
+
+    @staticmethod
+    def _discard(index: Dict, key: object, product: Product) -> None:
+        bucket = index.get(key)
+        if bucket is not None:
+            bucket.pop(id(product), None)
+            if not bucket:
+                del index[key]
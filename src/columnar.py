@@ -0,0 +1,113 @@
+from array import array
+from itertools import compress, repeat
+from operator import and_, eq, ge, le
+from typing import Dict, Iterable, List, Optional, Type
+
+from src.lawn_grass import LawnGrass
+from src.product import Product
+from src.smartphone import Smartphone
+
+TYPE_CODES: Dict[Type[Product], int] = {Product: 0, Smartphone: 1, LawnGrass: 2}
+
+
+def type_code(product_type: Type[Product]) -> int:
+    """Возвращает код класса продукта; новым классам код назначается при первом обращении"""
+    code = TYPE_CODES.get(product_type)
+    if code is None:
+        code = TYPE_CODES.setdefault(product_type, len(TYPE_CODES))
+    return code
+
+
+def column_quantity(product: Product) -> int:
+    """
+    Количество продукта для колонки array("q").
+
+    Не целое значение (в том числе 2.0) - ValueError с названием товара вместо
+    TypeError массива: агрегаты категории тоже считаются только по целым количествам.
+    """
+    quantity = product.quantity
+    if not isinstance(quantity, int):
+        raise ValueError(f"Количество товара '{product.name}' должно быть целым числом: {quantity!r}")
+    return quantity
+
+
+class ColumnarStore:
+    """
+    Колоночное хранилище цен, количеств и типов продуктов категории.
+
+    Колонки служат фильтрам (select); агрегаты категории ведет сама Category.
+    Количества проверяются до изменения колонок: при ошибке строки не меняются.
+    """
+
+    def __init__(self, products: Optional[Iterable[Product]] = None) -> None:
+        self.prices: array = array("d")
+        self.quantities: array = array("q")
+        self.type_codes: array = array("H")
+        # Номер строки по товару; ключ - сам объект, а не id(), чтобы id удаленного товара не совпал с новым
+        self._rows: Dict[Product, int] = {}
+        if products is not None:
+            self.append_many(list(products))
+
+    def __len__(self) -> int:
+        return len(self.prices)
+
+    def append(self, product: Product) -> None:
+        """Добавляет строку для продукта"""
+        quantity = column_quantity(product)
+        self._rows[product] = len(self.prices)
+        self.prices.append(product.price)
+        self.quantities.append(quantity)
+        self.type_codes.append(type_code(type(product)))
+
+    def append_many(self, products: List[Product]) -> None:
+        """Добавляет строки пачкой; количества проверяются все до первой записи"""
+        quantities = [column_quantity(product) for product in products]
+        start = len(self.prices)
+        self._rows.update(zip(products, range(start, start + len(products))))
+        self.prices.extend([product.price for product in products])
+        self.quantities.extend(quantities)
+        self.type_codes.extend([type_code(type(product)) for product in products])
+
+    def update(self, product: Product) -> None:
+        """Обновляет цену и количество продукта"""
+        quantity = column_quantity(product)
+        row = self._rows[product]
+        self.prices[row] = product.price
+        self.quantities[row] = quantity
+
+    def remove(self, product: Product) -> None:
+        """Удаляет строку продукта со сдвигом последующих строк"""
+        row = self._rows.pop(product)
+        del self.prices[row]
+        del self.quantities[row]
+        del self.type_codes[row]
+        for key, other in self._rows.items():
+            if other > row:
+                self._rows[key] = other - 1
+
+    def select(
+        self,
+        min_price: Optional[float] = None,
+        max_price: Optional[float] = None,
+        product_type: Optional[Type[Product]] = None,
+    ) -> List[int]:
+        """
+        Возвращает номера строк, удовлетворяющих фильтру.
+
+        Условия считаются целиком по колонкам через map с функциями operator,
+        без байткода Python на каждую строку; тип сравнивается точно, без подклассов.
+        """
+        conditions = []
+        if min_price is not None:
+            conditions.append(map(ge, self.prices, repeat(min_price)))
+        if max_price is not None:
+            conditions.append(map(le, self.prices, repeat(max_price)))
+        if product_type is not None:
+            conditions.append(map(eq, self.type_codes, repeat(type_code(product_type))))
+        rows = range(len(self.prices))
+        if not conditions:
+            return list(rows)
+        mask = conditions[0]
+        for condition in conditions[1:]:
+            mask = map(and_, mask, condition)
+        return list(compress(rows, mask))
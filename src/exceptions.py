@@ -1,6 +1,32 @@
+from typing import Any, Dict, List, Optional
+
+
 class ZeroQuantityError(ValueError):
     """Исключение для случая добавления товара с нулевым количеством"""
 
     def __init__(self, message: str = "Товар с нулевым количеством не может быть добавлен"):
         self.message = message
         super().__init__(message)
+
+
+class AggregateMismatchError(RuntimeError):
+    """Исключение при расхождении накопленных агрегатов категории с полным пересчетом"""
+
+
+class CatalogLoadError(ValueError):
+    """Исключение со сводкой ошибок загрузки нескольких файлов каталога"""
+
+    def __init__(self, errors: Dict[str, str], categories: Optional[List[Any]] = None):
+        self.errors = errors
+        # Категории из файлов, загруженных без ошибок
+        self.categories = categories if categories is not None else []
+        details = "\n".join(f"{path}: {message}" for path, message in errors.items())
+        super().__init__(f"Не удалось загрузить файлов: {len(errors)}\n{details}")
+
+
+class SnapshotError(ValueError):
+    """Исключение при неверном формате бинарного снимка каталога"""
+
+
+class ReservationError(ValueError):
+    """Исключение при невозможности зарезервировать, подтвердить или отменить резерв товара"""
@@ -0,0 +1,309 @@
+from bisect import bisect_left, bisect_right, insort
+from collections import Counter
+from decimal import Decimal
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Tuple, Type
+
+from src.product import Product, interned_str
+from src.product_registry import PRODUCT_TYPES, get_type_tag
+
+# Атрибут с тегом типа продукта ("product", "smartphone", "lawn_grass")
+TYPE_ATTRIBUTE = "type"
+
+# Удаленные документы остаются пустыми битами до перенумерации, которая выполняется,
+# когда их больше, чем живых (и больше этого порога)
+COMPACT_MIN_REMOVED = 64
+
+# Конвертеры полей _row_fields, значения которых индексируются как категории (битовые карты)
+_CATEGORICAL_CONVERTERS = (str, interned_str)
+
+
+class Range(NamedTuple):
+    """Условие на числовой атрибут: min <= значение <= max (None - без границы)"""
+
+    min: Optional[float] = None
+    max: Optional[float] = None
+
+
+class FacetIndex:
+    """
+    Индекс атрибутов товаров для фасетного поиска.
+
+    Строковые атрибуты (цвет, модель, страна, тег типа) хранятся как битовые
+    карты - целые числа, где бит с номером документа установлен у товаров с
+    этим значением. Числовые атрибуты (цена, количество, память, ...) хранятся
+    отсортированными списками пар (значение, документ), диапазон находится
+    через bisect. Условия объединяются побитовым AND, число совпадений - bit_count.
+
+    Индекс подписывается на изменения цены и количества товаров, как категория.
+    """
+
+    def __init__(self, products: Iterable[Product] = ()) -> None:
+        self._documents: List[Optional[Product]] = []
+        self._doc_ids: Dict[int, int] = {}
+        self._alive = 0
+        self._bitmaps: Dict[str, Dict[Any, int]] = {}
+        self._sorted: Dict[str, List[Tuple[Any, int]]] = {}
+        self._values: Dict[str, Dict[int, Any]] = {}
+        self.add_many(products)
+
+    def __len__(self) -> int:
+        return len(self._doc_ids)
+
+    def add(self, product: Product) -> None:
+        """Добавляет товар в индекс (повторное добавление того же объекта игнорируется)"""
+        if id(product) in self._doc_ids:
+            return
+        doc = len(self._documents)
+        self._documents.append(product)
+        self._doc_ids[id(product)] = doc
+        self._alive |= 1 << doc
+        for attribute, value, numeric in _attributes(product):
+            self._put(attribute, value, numeric, doc)
+        if product._watchers is None:
+            product._watchers = []
+        product._watchers.append(self)
+
+    def add_many(self, products: Iterable[Product]) -> None:
+        """
+        Пакетно добавляет товары. Номера документов по каждому значению
+        собираются в списки, и битовая карта значения строится один раз,
+        а числовые списки сортируются один раз - вместо сдвигов и insort на каждый товар
+        """
+        added = self._index_many(products)
+        for product in added:
+            if product._watchers is None:
+                product._watchers = []
+            product._watchers.append(self)
+
+    def _index_many(self, products: Iterable[Product]) -> List[Product]:
+        """Индексирует новые товары без подписки на изменения; возвращает добавленные"""
+        added: List[Product] = []
+        first = len(self._documents)
+        docs_by_value: Dict[str, Dict[Any, List[int]]] = {}
+        for product in products:
+            if id(product) in self._doc_ids:
+                continue
+            doc = len(self._documents)
+            self._documents.append(product)
+            self._doc_ids[id(product)] = doc
+            added.append(product)
+            for attribute, value, numeric in _attributes(product):
+                self._values.setdefault(attribute, {})[doc] = value
+                if numeric:
+                    self._sorted.setdefault(attribute, []).append((value, doc))
+                else:
+                    docs_by_value.setdefault(attribute, {}).setdefault(value, []).append(doc)
+        if not added:
+            return added
+
+        size = len(self._documents)
+        self._alive |= _bitmap(range(first, size), size)
+        for attribute, by_value in docs_by_value.items():
+            bitmaps = self._bitmaps.setdefault(attribute, {})
+            for value, docs in by_value.items():
+                bitmaps[value] = bitmaps.get(value, 0) | _bitmap(docs, size)
+        for entries in self._sorted.values():
+            # Добавленные записи - хвост после уже отсортированной части, Timsort сливает их за O(n log k)
+            entries.sort()
+        return added
+
+    def remove(self, product: Product) -> None:
+        """Удаляет товар из индекса"""
+        doc = self._doc_ids.pop(id(product), None)
+        if doc is None:
+            return
+        for attribute, value, numeric in _attributes(product):
+            self._drop(attribute, value, numeric, doc)
+        self._alive &= ~(1 << doc)
+        self._documents[doc] = None
+        if product._watchers:
+            product._watchers.remove(self)
+        removed = len(self._documents) - len(self._doc_ids)
+        if removed > COMPACT_MIN_REMOVED and removed > len(self._doc_ids):
+            self._compact()
+
+    def _compact(self) -> None:
+        """Перестраивает индекс по живым товарам с номерами подряд; порядок товаров и подписки сохраняются"""
+        products = [product for product in self._documents if product is not None]
+        self._documents = []
+        self._doc_ids = {}
+        self._alive = 0
+        self._bitmaps = {}
+        self._sorted = {}
+        self._values = {}
+        self._index_many(products)
+
+    def _on_product_change(self, product: Product, old_price: Decimal, old_quantity: int) -> None:
+        """Обработчик изменения цены или количества товара"""
+        doc = self._doc_ids[id(product)]
+        for attribute, old, new in (
+            ("price", old_price, product._price),
+            ("quantity", old_quantity, product.quantity),
+        ):
+            if old != new:
+                self._drop(attribute, old, True, doc)
+                self._put(attribute, new, True, doc)
+
+    def _on_product_text_change(self, product: Product) -> None:
+        """Обработчик изменения атрибутов товара без сеттеров (цвет, модель, ...)"""
+        doc = self._doc_ids[id(product)]
+        for attribute, value, numeric in _attributes(product):
+            old = self._values[attribute][doc]
+            if old != value:
+                self._drop(attribute, old, numeric, doc)
+                self._put(attribute, value, numeric, doc)
+
+    def _put(self, attribute: str, value: Any, numeric: bool, doc: int) -> None:
+        self._values.setdefault(attribute, {})[doc] = value
+        if numeric:
+            insort(self._sorted.setdefault(attribute, []), (value, doc))
+        else:
+            bitmaps = self._bitmaps.setdefault(attribute, {})
+            bitmaps[value] = bitmaps.get(value, 0) | (1 << doc)
+
+    def _drop(self, attribute: str, value: Any, numeric: bool, doc: int) -> None:
+        del self._values[attribute][doc]
+        if numeric:
+            entries = self._sorted[attribute]
+            del entries[bisect_left(entries, (value, doc))]
+        else:
+            bitmaps = self._bitmaps[attribute]
+            bitmap = bitmaps[value] & ~(1 << doc)
+            if bitmap:
+                bitmaps[value] = bitmap
+            else:
+                del bitmaps[value]
+
+    def query(self, **predicates: Any) -> List[Product]:
+        """
+        Товары, удовлетворяющие всем условиям, в порядке добавления в индекс.
+
+        Условие задается по имени атрибута: значение - точное совпадение,
+        список/множество - любое из значений, Range - диапазон числового атрибута.
+        Пример: query(type="smartphone", memory=Range(min=256), price=Range(max=100000))
+        :raises ValueError: Для неизвестного атрибута
+        """
+        return [self._document(doc) for doc in _docs(self.match(**predicates))]
+
+    def count(self, **predicates: Any) -> int:
+        """Количество товаров, удовлетворяющих условиям"""
+        return self.match(**predicates).bit_count()
+
+    def match(self, **predicates: Any) -> int:
+        """Битовая карта товаров, удовлетворяющих всем условиям"""
+        mask = self._alive
+        for attribute, condition in predicates.items():
+            mask &= self._condition_mask(attribute, condition)
+            if not mask:
+                break
+        return mask
+
+    def facets(self, attributes: Iterable[str], **predicates: Any) -> Dict[str, Dict[Any, int]]:
+        """
+        Количество товаров по значениям атрибутов среди результатов запроса.
+
+        Для каждого атрибута учитываются все условия, кроме условия на сам
+        атрибут: так страница категории показывает, сколько товаров будет
+        найдено при выборе другого значения фасета.
+        :param attributes: Атрибуты, для которых нужны счетчики
+        :param predicates: Условия запроса, как в query
+        :return: {атрибут: {значение: количество}}, значения по убыванию количества
+        """
+        masks = {attribute: self._condition_mask(attribute, condition) for attribute, condition in predicates.items()}
+        result: Dict[str, Dict[Any, int]] = {}
+        for attribute in attributes:
+            self._check(attribute)
+            mask = self._alive
+            for other, other_mask in masks.items():
+                if other != attribute:
+                    mask &= other_mask
+            counts: Dict[Any, int] = {}
+            if attribute in self._bitmaps:
+                for value, bitmap in self._bitmaps[attribute].items():
+                    count = (bitmap & mask).bit_count()
+                    if count:
+                        counts[value] = count
+            else:
+                values = self._values.get(attribute, {})
+                counts = Counter(values[doc] for doc in _docs(mask) if doc in values)
+            result[attribute] = dict(sorted(counts.items(), key=lambda item: -item[1]))
+        return result
+
+    def _condition_mask(self, attribute: str, condition: Any) -> int:
+        self._check(attribute)
+        if attribute not in self._sorted and attribute not in self._bitmaps:
+            return 0
+        if attribute in self._sorted:
+            if isinstance(condition, Range):
+                return self._range_mask(attribute, condition.min, condition.max)
+            if isinstance(condition, (list, tuple, set, frozenset)):
+                mask = 0
+                for value in condition:
+                    mask |= self._range_mask(attribute, value, value)
+                return mask
+            return self._range_mask(attribute, condition, condition)
+
+        if isinstance(condition, Range):
+            raise ValueError(f"Атрибут '{attribute}' не числовой")
+        bitmaps = self._bitmaps.get(attribute, {})
+        if isinstance(condition, (list, tuple, set, frozenset)):
+            mask = 0
+            for value in condition:
+                mask |= bitmaps.get(value, 0)
+            return mask
+        return bitmaps.get(condition, 0)
+
+    def _range_mask(self, attribute: str, low: Optional[float], high: Optional[float]) -> int:
+        """Битовая карта документов с low <= значение <= high, O(log n + k)"""
+        entries = self._sorted[attribute]
+        start = 0 if low is None else bisect_left(entries, (low,))
+        end = len(entries) if high is None else bisect_right(entries, (high, len(self._documents)))
+        return _bitmap((entries[position][1] for position in range(start, end)), len(self._documents))
+
+    @staticmethod
+    def _check(attribute: str) -> None:
+        if attribute != TYPE_ATTRIBUTE and all(
+            attribute != key for product_class in PRODUCT_TYPES.values() for key, _, _ in _schema(product_class)
+        ):
+            raise ValueError(f"Неизвестный атрибут: {attribute}")
+
+    def _document(self, doc: int) -> Product:
+        product = self._documents[doc]
+        assert product is not None
+        return product
+
+
+# Описание индексируемых атрибутов по классам: (имя, атрибут объекта, числовой ли)
+_SCHEMAS: Dict[Type[Product], List[Tuple[str, str, bool]]] = {}
+
+
+def _schema(product_class: Type[Product]) -> List[Tuple[str, str, bool]]:
+    schema = _SCHEMAS.get(product_class)
+    if schema is None:
+        schema = [("price", "_price", True)]
+        for key, attr, convert, _ in product_class._row_fields:
+            if key not in ("name", "description"):
+                schema.append((key, attr, convert not in _CATEGORICAL_CONVERTERS))
+        _SCHEMAS[product_class] = schema
+    return schema
+
+
+def _attributes(product: Product) -> List[Tuple[str, Any, bool]]:
+    """Индексируемые значения товара: (атрибут, значение, числовой ли)"""
+    values = [(TYPE_ATTRIBUTE, get_type_tag(type(product)), False)]
+    values.extend((key, getattr(product, attr), numeric) for key, attr, numeric in _schema(type(product)))
+    return values
+
+
+def _bitmap(docs: Iterable[int], size: int) -> int:
+    """Битовая карта из номеров документов, собранная за один проход"""
+    bits = bytearray((size + 7) // 8)
+    for doc in docs:
+        bits[doc >> 3] |= 1 << (doc & 7)
+    return int.from_bytes(bits, "little")
+
+
+def _docs(mask: int) -> List[int]:
+    """Номера установленных битов по возрастанию"""
+    bits = bin(mask)[:1:-1]
+    return [position for position, bit in enumerate(bits) if bit == "1"]
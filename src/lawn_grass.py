@@ -1,11 +1,23 @@
-from typing import Any, Dict
+import sys
+from operator import attrgetter
+from typing import Any, Callable, Dict, Tuple
 
-from src.product import Product
+from src.product import Product, RowField, interned_str
 
 
 class LawnGrass(Product):
     """Класс для газонной травы, наследующий от Product"""
 
+    __slots__ = ("country", "germination_period", "color")
+
+    _row_fields: Tuple[RowField, ...] = Product._row_fields + (
+        ("country", "country", interned_str, ""),
+        ("germination_period", "germination_period", int, 0),
+        ("color", "color", interned_str, ""),
+    )
+
+    _render_key: Callable[[Any], Any] = attrgetter("name", "country", "color", "germination_period")
+
     def __init__(
         self,
         name: str,
@@ -31,19 +43,19 @@ class LawnGrass(Product):
             kwargs: Дополнительные параметры
         """
         super().__init__(name=name, description=description, price=price, quantity=quantity, **kwargs)
-        self.country = country
+        # Страна и цвет повторяются у тысяч товаров - храним одну копию строки
+        self.country = sys.intern(country)
         self.germination_period = germination_period
-        self.color = color
+        self.color = sys.intern(color)
 
     @property
     def additional_info(self) -> str:
         """Дополнительная информация о газонной траве"""
         return f"Страна: {self.country}, Цвет: {self.color}, " f"Срок прорастания: {self.germination_period} дней"
 
-    def __str__(self) -> str:
+    def _render(self) -> str:
         """Строковое представление газонной травы"""
-        base_info = super().__str__()
-        return f"{base_info}\n{self.additional_info}"
+        return f"{super()._render()}\n{self.additional_info}"
 
     @classmethod
     def create_product(cls, data: Dict[str, Any]) -> "LawnGrass":
@@ -0,0 +1,201 @@
+import threading
+from array import array
+from operator import methodcaller, mul
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Type
+
+from src.category import Category
+from src.category_index import CategoryIndex
+from src.product import Product
+from src.product_registry import get_product_type, products_from_dicts, row_type_tags
+
+_row_values = methodcaller("values")
+
+
+class LazyCategory(Category):
+    """
+    Категория, которая хранит исходные записи товаров и создает объекты Product
+    только при первом обращении к товарам.
+
+    Название, описание, количество товаров и агрегаты (средняя цена, общая
+    стоимость) доступны без создания объектов - по колонкам цен и количеств.
+    Записи хранятся компактно: значения - кортежами, ключи - одним общим кортежем
+    на каждый набор полей, цены и количества - массивами. Цены, количества и теги
+    типов проверяются при создании категории, остальные поля - при материализации.
+    """
+
+    def __init__(
+        self, name: str, description: str, rows: Optional[List[Dict[str, Any]]] = None, columnar: bool = False
+    ):
+        super().__init__(name, description, columnar=columnar)
+        rows = rows if rows is not None else []
+        prices, quantities, tags = self._check_rows(rows)
+        layouts: Dict[Tuple[str, ...], Tuple[str, ...]] = {}
+        self._row_keys: Optional[List[Tuple[str, ...]]] = [layouts.setdefault(key, key) for key in map(tuple, rows)]
+        self._row_values: Optional[List[Tuple[Any, ...]]] = list(map(tuple, map(_row_values, rows)))
+        self._row_tags: Optional[List[str]] = tags
+        self._row_prices: Optional["array[float]"] = prices
+        self._row_quantities: Optional["array[int]"] = quantities
+        self._raw_totals: Optional[Tuple[float, float, int]] = None
+        # Материализация из нескольких потоков: объекты создает только первый
+        self._materialize_lock = threading.Lock()
+
+    @staticmethod
+    def _check_rows(rows: List[Dict[str, Any]]) -> Tuple["array[float]", "array[int]", List[str]]:
+        """
+        Проверяет поля, по которым агрегаты считаются без материализации
+        :return: Цены, количества и теги типов записей
+        :raises ValueError: С номером первой некорректной строки
+        """
+        try:
+            prices = array("d", [float(row["price"]) for row in rows])
+            quantities = array("q", [int(row["quantity"]) for row in rows])
+            tags = row_type_tags(rows)
+        except (AttributeError, KeyError, OverflowError, TypeError, ValueError):
+            for index, row in enumerate(rows):
+                try:
+                    array("d", [float(row["price"])])
+                    array("q", [int(row["quantity"])])
+                    row_type_tags([row])
+                except (AttributeError, KeyError, OverflowError, TypeError, ValueError) as e:
+                    raise ValueError(f"Ошибка в строке {index}: {str(e)}") from e
+            raise
+        if prices and min(prices) <= 0:
+            index = next(i for i, price in enumerate(prices) if price <= 0)
+            raise ValueError(f"Ошибка в строке {index}: Цена должна быть положительной")
+        for tag in set(tags):
+            try:
+                get_product_type(tag)
+            except ValueError as e:
+                raise ValueError(f"Ошибка в строке {tags.index(tag)}: {str(e)}") from None
+        return prices, quantities, tags
+
+    @classmethod
+    def from_dict(cls, data: dict, columnar: bool = False) -> "LazyCategory":
+        """Создает ленивую категорию из словаря; остальные поля записей проверяются при материализации"""
+        if "name" not in data or "description" not in data:
+            raise ValueError("Отсутствуют обязательные поля 'name' или 'description'")
+        rows = data.get("products", [])
+        if not isinstance(rows, list) or not all(isinstance(row, dict) for row in rows):
+            raise ValueError("Поле 'products' должно быть списком объектов")
+        return cls(str(data["name"]), str(data["description"]), rows, columnar=columnar)
+
+    @property
+    def materialized(self) -> bool:
+        """Созданы ли объекты товаров"""
+        return self._row_values is None
+
+    def raw_columns(self) -> Optional[Tuple[List[str], "array[float]", "array[int]"]]:
+        """Теги типов, цены и количества еще не материализованных записей (None после материализации)"""
+        if self._row_tags is None or self._row_prices is None or self._row_quantities is None:
+            return None
+        return self._row_tags, self._row_prices, self._row_quantities
+
+    def materialize(self) -> None:
+        """
+        Создает объекты товаров из исходных записей (один раз) и освобождает записи.
+
+        Безопасна при одновременном вызове из нескольких потоков: остальные ждут
+        первого и получают уже созданные товары. Записи освобождаются последними,
+        поэтому materialized становится True, только когда товары и агрегаты готовы.
+        """
+        if self._row_values is None:
+            return
+        with self._materialize_lock:
+            if self._row_values is None or self._row_keys is None:
+                return
+            try:
+                products = products_from_dicts(list(map(dict, map(zip, self._row_keys, self._row_values))))
+            except ValueError as e:
+                raise ValueError(f"Ошибка создания продукта: {str(e)}")
+            self._products.extend(products)
+            self._attach_many(products)
+            if self._columns is not None:
+                self._columns.append_many(products)
+            self._row_tags = None
+            self._row_prices = self._row_quantities = None
+            self._raw_totals = None
+            self._row_keys = self._row_values = None
+
+    def _totals(self) -> Tuple[float, float, int]:
+        """Общая стоимость, стоимость и количество товаров с положительным остатком по сырым записям"""
+        if self._row_prices is None or self._row_quantities is None:
+            return super()._totals()
+        if self._raw_totals is None:
+            quantities = self._row_quantities
+            values = list(map(mul, self._row_prices, quantities))
+            positive = [quantity > 0 for quantity in quantities]
+            self._raw_totals = (
+                sum(values),
+                sum(value for value, keep in zip(values, positive) if keep),
+                sum(quantity for quantity, keep in zip(quantities, positive) if keep),
+            )
+        return self._raw_totals
+
+    @property
+    def products(self) -> List[Product]:
+        self.materialize()
+        return list(self._products)
+
+    @property
+    def product_count(self) -> int:
+        if self._row_values is not None:
+            return len(self._row_values)
+        return len(self._products)
+
+    @property
+    def total_value(self) -> float:
+        if self._row_values is not None:
+            return self._totals()[0]
+        return super().total_value
+
+    def get_average_price(self) -> float:
+        if self._row_values is None:
+            return super().get_average_price()
+        if not self._row_values:
+            self.logger.info("Категория пуста, средняя цена: 0")
+            return 0.0
+        _, positive_value, positive_quantity = self._totals()
+        if not positive_quantity:
+            self.logger.info("Нет товаров с положительным количеством, средняя цена: 0")
+            return 0.0
+        average = positive_value / positive_quantity
+        self.logger.info("Средняя цена: %.2f", average)
+        return average
+
+    def check_aggregates(self) -> None:
+        self.materialize()
+        super().check_aggregates()
+
+    def add_product(self, product: Product, allowed_types: Optional[List[Type[Product]]] = None) -> None:
+        self.materialize()
+        super().add_product(product, allowed_types)
+
+    def add_products(self, products: Iterable[Product], allowed_types: Optional[List[Type[Product]]] = None) -> int:
+        self.materialize()
+        return super().add_products(products, allowed_types)
+
+    def remove_product(self, product: Product) -> None:
+        self.materialize()
+        super().remove_product(product)
+
+    def remove_products(self, products: Iterable[Product]) -> None:
+        self.materialize()
+        super().remove_products(products)
+
+    def apply_discount(self, discount: float) -> None:
+        self.materialize()
+        super().apply_discount(discount)
+
+    def filter_products(
+        self,
+        min_price: Optional[float] = None,
+        max_price: Optional[float] = None,
+        product_type: Optional[Type[Product]] = None,
+    ) -> List[Product]:
+        self.materialize()
+        return super().filter_products(min_price, max_price, product_type)
+
+    @property
+    def index(self) -> CategoryIndex:
+        self.materialize()
+        return super().index
@@ -1,73 +1,557 @@
+import codecs
+import glob
 import json
+import os
+from concurrent.futures import Future, ProcessPoolExecutor
+from functools import partial
 from pathlib import Path
-from typing import List
+from typing import IO, Any, Dict, Iterable, Iterator, List, Optional, TextIO, Tuple
+from src.atomic_file import atomic_write
 from src.category import Category
+from src.exceptions import CatalogLoadError
+from src.lazy_category import LazyCategory
+from src.metrics import increment, timed
+from src.product import Product
+from src.product_registry import product_from_dict, product_to_dict
+
+_CHUNK_SIZE = 64 * 1024
+_WHITESPACE = " \t\n\r"
+
+# Размер начала файла, по которому определяется кодировка
+_SNIFF_SIZE = 64 * 1024
+# Кодировка старых фидов поставщиков, если файл не в UTF-8
+FALLBACK_ENCODING = "cp1251"
+# BOM UTF-32 начинается с BOM UTF-16 LE, поэтому проверяется первым
+_BOMS = (
+    (codecs.BOM_UTF32_LE, "utf-32"),
+    (codecs.BOM_UTF32_BE, "utf-32"),
+    (codecs.BOM_UTF8, "utf-8-sig"),
+    (codecs.BOM_UTF16_LE, "utf-16"),
+    (codecs.BOM_UTF16_BE, "utf-16"),
+)
+# Версия файла для кэша кодировок: время изменения (нс) и размер
+FileVersion = Tuple[int, int]
+# Кодировки, определенные при прошлых загрузках: путь -> (версия файла, кодировка).
+# Запись действует только для той же версии - измененный файл определяется заново
+_encoding_cache: Dict[str, Tuple[FileVersion, str]] = {}
+
+
+def detect_encoding(prefix: bytes) -> str:
+    """
+    Определяет кодировку по началу файла: по BOM, иначе проверкой на UTF-8
+    :param prefix: Первые байты файла (многобайтовый символ на конце может быть обрезан)
+    :return: Имя кодировки для decode
+    """
+    for bom, encoding in _BOMS:
+        if prefix.startswith(bom):
+            return encoding
+    try:
+        codecs.getincrementaldecoder("utf-8")().decode(prefix, final=False)
+    except UnicodeDecodeError:
+        return FALLBACK_ENCODING
+    return "utf-8"
+
+
+def clear_encoding_cache(file_path: Optional[str | Path] = None) -> None:
+    """Забывает кодировку файла (или всех файлов)"""
+    if file_path is None:
+        _encoding_cache.clear()
+    else:
+        _encoding_cache.pop(str(file_path), None)
+
+
+def file_version(stat: os.stat_result) -> FileVersion:
+    """Версия файла для кэша кодировок"""
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _cached_encoding(file_path: str, version: Optional[FileVersion]) -> Optional[str]:
+    entry = _encoding_cache.get(file_path)
+    if entry is None or version is None or entry[0] != version:
+        return None
+    return entry[1]
+
+
+def _remember_encoding(file_path: str, version: Optional[FileVersion], encoding: str) -> None:
+    if version is not None:
+        _encoding_cache[file_path] = (version, encoding)
+
+
+def decode_catalog(
+    content: bytes, file_path: str, encoding: Optional[str] = None, version: Optional[FileVersion] = None
+) -> str:
+    """
+    Декодирует содержимое файла каталога одним проходом.
+
+    Кодировка берется из параметра, из кэша прошлых загрузок этой версии файла
+    или определяется по началу файла. Если начало файла оказалось в UTF-8, а
+    дальше встретились другие байты, файл декодируется как cp1251. Заданная
+    кодировка не заменяется другой: если файл в ней не декодируется - это ошибка.
+    :param content: Содержимое файла
+    :param file_path: Путь к файлу (ключ кэша кодировок)
+    :param encoding: Известная кодировка файла
+    :param version: Версия файла (file_version); без нее кэш кодировок не используется
+    :return: Текст файла
+    :raises ValueError: Если файл не декодируется в заданной кодировке
+    """
+    if encoding is not None:
+        try:
+            text = str(content, encoding)
+        except UnicodeDecodeError as e:
+            raise ValueError(f"Файл {file_path} не в кодировке {encoding}: {str(e)}")
+        _remember_encoding(file_path, version, encoding)
+        return text
+
+    cached = _cached_encoding(file_path, version)
+    if cached is not None:
+        try:
+            return str(content, cached)
+        except UnicodeDecodeError:
+            pass
+
+    detected = detect_encoding(content[:_SNIFF_SIZE])
+    try:
+        text = str(content, detected)
+    except UnicodeDecodeError:
+        if detected != "utf-8":
+            raise ValueError(f"Не удалось определить кодировку файла {file_path}")
+        detected = FALLBACK_ENCODING
+        text = str(content, detected)
+    _remember_encoding(file_path, version, detected)
+    return text
 
 
 class JsonLoader:
     @staticmethod
-    def load_categories(file_path: str | Path) -> List[Category]:
+    def load_categories(file_path: str | Path, lazy: bool = False, encoding: Optional[str] = None) -> List[Category]:
         """
         Загружает категории из JSON файла
         :param file_path: Путь к JSON файлу
+        :param lazy: Создавать LazyCategory - товары создаются при первом обращении
+        :param encoding: Кодировка файла; по умолчанию определяется по BOM или началу файла
         :return: Список категорий
         :raises FileNotFoundError: Если файл не найден
         :raises json.JSONDecodeError: При ошибке парсинга JSON
         :raises ValueError: При неверной структуре данных
         """
-        try:
-            with open(file_path, "r", encoding="utf-8") as file:
-                data = file.read()
-                return JsonLoader._parse_data(data, str(file_path))
-        except UnicodeDecodeError:
-            with open(file_path, "r", encoding="cp1251") as file:
-                data = file.read()
-                return JsonLoader._parse_data(data, str(file_path))
+        # Файл читается одним read() в буфер размера файла; декодирование - отдельная фаза
+        with timed("loader.read"):
+            with open(file_path, "rb") as file:
+                stat = os.fstat(file.fileno())
+                content = file.read()
+        with timed("loader.decode"):
+            data = decode_catalog(content, str(file_path), encoding, file_version(stat))
+        increment("loader.files")
+        increment("loader.bytes", stat.st_size)
+        return JsonLoader._parse_data(data, str(file_path), lazy)
+
+    @staticmethod
+    def load_many(
+        paths: str | Path | Iterable[str | Path],
+        max_workers: Optional[int] = None,
+        lazy: bool = False,
+        encoding: Optional[str] = None,
+    ) -> List[Category]:
+        """
+        Загружает категории из нескольких JSON файлов, параллельно в пуле процессов.
+
+        Родительский процесс получает категории из процессов через pickle, и
+        распаковка стоит почти столько же, сколько разбор JSON (для 50 тыс.
+        товаров - 0.17 с против 0.16 с прямой загрузки). Поэтому пул ускоряет
+        загрузку только при нескольких ядрах и файлах, где разбор и проверка
+        дороже передачи результата; с ленивыми категориями (lazy=True) передаются
+        только сырые записи. При одном ядре, одном файле или max_workers=1 файлы
+        загружаются в текущем процессе.
+        :param paths: Список путей или glob-шаблон (например, "feeds/*.json")
+        :param max_workers: Количество процессов (по умолчанию - число ядер)
+        :param lazy: Создавать LazyCategory (см. load_categories)
+        :param encoding: Кодировка файлов; по умолчанию определяется для каждого файла
+        :return: Категории всех файлов в порядке путей (для шаблона - в отсортированном порядке)
+        :raises FileNotFoundError: Если шаблону не соответствует ни один файл
+        :raises CatalogLoadError: Со сводкой ошибок по всем файлам, которые не удалось загрузить
+        """
+        file_paths = JsonLoader._expand_paths(paths)
+        load = partial(JsonLoader.load_categories, lazy=lazy, encoding=encoding)
+        results: Dict[str, List[Category]] = {}
+        errors: Dict[str, str] = {}
+
+        cpu_count = os.cpu_count() or 1
+        workers = min(max_workers or cpu_count, cpu_count, len(file_paths))
+        if workers <= 1:
+            for file_path in file_paths:
+                try:
+                    results[file_path] = load(file_path)
+                except (OSError, ValueError) as e:
+                    errors[file_path] = str(e)
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                futures: Dict[str, Future] = {file_path: executor.submit(load, file_path) for file_path in file_paths}
+                for file_path, future in futures.items():
+                    try:
+                        results[file_path] = future.result()
+                    except (OSError, ValueError) as e:
+                        errors[file_path] = str(e)
+
+        categories = [category for file_path in file_paths if file_path in results for category in results[file_path]]
+        if errors:
+            raise CatalogLoadError(errors, categories)
+        return categories
+
+    @staticmethod
+    def _expand_paths(paths: str | Path | Iterable[str | Path]) -> List[str]:
+        """Разворачивает glob-шаблон или список путей в список строк"""
+        if isinstance(paths, (str, Path)):
+            pattern = str(paths)
+            if any(char in pattern for char in "*?["):
+                matches = sorted(glob.glob(pattern, recursive=True))
+                if not matches:
+                    raise FileNotFoundError(f"Нет файлов по шаблону {pattern}")
+                return matches
+            return [pattern]
+        return [str(path) for path in paths]
 
     @staticmethod
-    def _parse_data(json_str: str, file_path: str) -> List[Category]:
+    def _parse_data(json_str: str, file_path: str, lazy: bool = False) -> List[Category]:
         """Внутренний метод для парсинга JSON строки"""
+        from_dict = LazyCategory.from_dict if lazy else Category.from_dict
         try:
-            data = json.loads(json_str)
+            with timed("loader.parse"):
+                data = json.loads(json_str)
             if not isinstance(data, list):
                 raise ValueError(f"Файл {file_path} должен содержать список категорий")
 
             categories = []
-            for item in data:
-                try:
-                    categories.append(Category.from_dict(item))
-                except ValueError as e:
-                    raise ValueError(f"Ошибка в данных из {file_path}: {str(e)}")
+            with timed("loader.construct"):
+                for item in data:
+                    try:
+                        if not isinstance(item, dict):
+                            raise ValueError("Категория должна быть объектом")
+                        categories.append(from_dict(item))
+                    except (AttributeError, KeyError, TypeError, ValueError) as e:
+                        # Неверные типы значений (например, "products": 5) - ошибка данных файла, а не кода
+                        raise ValueError(f"Ошибка в данных из {file_path}: {str(e)}")
 
             return categories
 
         except json.JSONDecodeError as e:
             raise ValueError(f"Ошибка JSON в файле {file_path}: {str(e)}")
 
+    @staticmethod
+    def iter_categories(
+        file_path: str | Path, chunk_size: int = _CHUNK_SIZE, encoding: Optional[str] = None
+    ) -> Iterator[Category]:
+        """
+        Потоково загружает категории из JSON файла, по одной за раз.
 
-def save_categories(file_path: str | Path, categories: List[Category]) -> None:
+        Файл читается блоками по ``chunk_size`` символов и разбирается по
+        одному товару, поэтому в памяти одновременно находятся только текущий
+        блок и разбираемая категория, а не весь каталог.
+        :param file_path: Путь к JSON файлу
+        :param chunk_size: Размер читаемого блока
+        :param encoding: Кодировка файла; по умолчанию определяется по BOM или проверкой файла на UTF-8
+        :return: Итератор категорий
+        :raises FileNotFoundError: Если файл не найден
+        :raises ValueError: При ошибке JSON или неверной структуре данных
+        """
+        for fields, rows in JsonLoader._iter_stream(file_path, chunk_size, encoding):
+            fields["products"] = list(rows)
+            try:
+                yield Category.from_dict(fields)
+            except ValueError as e:
+                raise ValueError(f"Ошибка в данных из {file_path}: {str(e)}")
+
+    @staticmethod
+    def iter_products(
+        file_path: str | Path, chunk_size: int = _CHUNK_SIZE, encoding: Optional[str] = None
+    ) -> Iterator[Tuple[Category, Product]]:
+        """
+        Потоково загружает пары (категория, продукт) из JSON файла.
+
+        Товары создаются по одному и в категорию не добавляются: категория в
+        парах содержит только название и описание, поэтому память не растет с
+        размером категории. Если в файле поле "products" идет раньше названия
+        или описания, строки товаров категории накапливаются до конца объекта.
+        :param file_path: Путь к JSON файлу
+        :param chunk_size: Размер читаемого блока
+        :param encoding: Кодировка файла; по умолчанию определяется по BOM или проверкой файла на UTF-8
+        :return: Итератор пар (категория, продукт)
+        :raises ValueError: При ошибке JSON или неверных данных, с путем к файлу и номером строки
+        """
+        for fields, rows in JsonLoader._iter_stream(file_path, chunk_size, encoding):
+            category: Optional[Category] = None
+            pending: List[Dict[str, Any]] = []
+            for index, row in enumerate(rows):
+                if category is None and "name" in fields and "description" in fields:
+                    category = JsonLoader._category_header(fields, file_path)
+                if category is None:
+                    pending.append(row)
+                else:
+                    yield category, JsonLoader._stream_product(row, index, file_path)
+            if category is None:
+                category = JsonLoader._category_header(fields, file_path)
+                for index, row in enumerate(pending):
+                    yield category, JsonLoader._stream_product(row, index, file_path)
+
+    @staticmethod
+    def _category_header(fields: Dict[str, Any], file_path: str | Path) -> Category:
+        """Пустая категория с названием и описанием из разобранных полей объекта"""
+        if "name" not in fields or "description" not in fields:
+            raise ValueError(f"Ошибка в данных из {file_path}: Отсутствуют обязательные поля 'name' или 'description'")
+        return Category(str(fields["name"]), str(fields["description"]))
+
+    @staticmethod
+    def _stream_product(row: Any, index: int, file_path: str | Path) -> Product:
+        try:
+            if not isinstance(row, dict):
+                raise ValueError("продукт должен быть объектом")
+            return product_from_dict(row)
+        except (KeyError, TypeError, ValueError) as e:
+            raise ValueError(f"Ошибка в данных из {file_path}: Ошибка в строке {index}: {str(e)}") from e
+
+    @staticmethod
+    def _iter_stream(
+        file_path: str | Path, chunk_size: int, encoding: Optional[str]
+    ) -> Iterator[Tuple[Dict[str, Any], Iterator[Any]]]:
+        """
+        Инкрементально разбирает массив категорий.
+
+        Для каждой категории выдает пару (поля, строки товаров): строки
+        разбираются по одной по мере чтения итератора, а поля кроме "products"
+        дописываются в словарь по мере разбора объекта - полностью он заполнен
+        после исчерпания строк.
+        """
+        path = str(file_path)
+        version = file_version(os.stat(path))
+        if encoding is None:
+            encoding = _cached_encoding(path, version) or _detect_file_encoding(path)
+        # Заданная или определенная кодировка не меняется посреди выдачи: ошибка декодирования - ValueError
+        with open(file_path, "r", encoding=encoding) as file:
+            stream = _JsonStream(file, path, chunk_size)
+            if stream.peek() != "[":
+                raise ValueError(f"Файл {path} должен содержать список категорий")
+            stream.pos += 1
+            if stream.peek() == "]":
+                stream.pos += 1
+            else:
+                while True:
+                    stream.expect("{", "категория должна быть объектом")
+                    fields: Dict[str, Any] = {}
+                    rows = _iter_object(stream, fields)
+                    yield fields, rows
+                    # Дочитываем строки, которые не запросил потребитель
+                    for _ in rows:
+                        pass
+                    if stream.expect(",]", "ожидалась ',' или ']'") == "]":
+                        break
+            if stream.peek():
+                raise stream.error("лишние данные после списка категорий")
+        _remember_encoding(path, version, encoding)
+
+
+class _JsonStream:
+    """
+    Текстовый поток JSON, разбираемый по значениям.
+
+    В буфере хранится только неразобранный хвост и прочитанный блок, поэтому
+    каждое значение (товар, название категории) декодируется заново не более
+    чем один раз на блок, а не с начала всей категории. Для сообщений об ошибках
+    запоминаются смещение, номер и начало строки отброшенного текста - позиции
+    совпадают с ошибками json.loads для всего файла.
+    """
+
+    def __init__(self, file: TextIO, file_path: str, chunk_size: int) -> None:
+        self._file = file
+        self.file_path = file_path
+        self._chunk_size = chunk_size
+        self._decoder = json.JSONDecoder()
+        self.buffer = ""
+        self.pos = 0
+        self.eof = False
+        # Смещение начала буфера в файле (в символах), номер его строки и смещение начала этой строки
+        self._offset = 0
+        self._line = 1
+        self._line_start = 0
+
+    def error(self, message: str, pos: Optional[int] = None) -> ValueError:
+        """Ошибка с позицией в файле (по умолчанию - текущей) в формате json.JSONDecodeError"""
+        pos = self.pos if pos is None else pos
+        last_newline = self.buffer.rfind("\n", 0, pos)
+        line_start = self._offset + last_newline + 1 if last_newline >= 0 else self._line_start
+        char = self._offset + pos
+        line = self._line + self.buffer.count("\n", 0, pos)
+        column = char - line_start + 1
+        return ValueError(
+            f"Ошибка JSON в файле {self.file_path}: {message}: line {line} column {column} (char {char})"
+        )
+
+    def _fill(self) -> bool:
+        if self.eof:
+            return False
+        try:
+            chunk = self._file.read(self._chunk_size)
+        except UnicodeDecodeError:
+            raise ValueError(f"Файл {self.file_path} не в кодировке {self._file.encoding}") from None
+        if not chunk:
+            self.eof = True
+            return False
+        pos = self.pos
+        last_newline = self.buffer.rfind("\n", 0, pos)
+        if last_newline >= 0:
+            self._line += self.buffer.count("\n", 0, pos)
+            self._line_start = self._offset + last_newline + 1
+        self._offset += pos
+        self.buffer = self.buffer[pos:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self) -> str:
+        """Следующий значимый символ (пустая строка в конце файла)"""
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buffer) or not self._fill():
+                return self.buffer[self.pos] if self.pos < len(self.buffer) else ""
+
+    def expect(self, chars: str, message: str) -> str:
+        """Пропускает один из ожидаемых символов и возвращает его"""
+        char = self.peek()
+        if not char:
+            raise self.error("неожиданный конец файла")
+        if char not in chars:
+            raise self.error(message)
+        self.pos += 1
+        return char
+
+    def value(self) -> Any:
+        """
+        Декодирует очередное значение целиком, дочитывая блоки, только пока значение
+        обрезано концом буфера; ошибка в середине буфера сообщается сразу, без чтения остатка файла
+        """
+        if not self.peek():
+            raise self.error("неожиданный конец файла")
+        while True:
+            try:
+                item, end = self._decoder.raw_decode(self.buffer, self.pos)
+                # Число на границе блока могло быть прочитано не полностью
+                if end < len(self.buffer) or self.eof:
+                    self.pos = end
+                    return item
+            except json.JSONDecodeError as e:
+                if self.eof or not _truncated(e, len(self.buffer)):
+                    raise self.error(e.msg, e.pos)
+            self._fill()
+
+
+# Самый длинный обрезанный фрагмент, на котором json сообщает ошибку до конца буфера: \uXXXX\uXXXX
+_MAX_TRUNCATED_TAIL = 12
+
+
+def _truncated(error: json.JSONDecodeError, size: int) -> bool:
+    """
+    Может ли ошибка означать, что значение обрезано концом буфера: ошибка у самого
+    конца (литерал, число, escape) или незакрытая строка - иначе данные неверны
+    """
+    return size - error.pos <= _MAX_TRUNCATED_TAIL or error.msg.startswith("Unterminated string")
+
+
+def _iter_object(stream: _JsonStream, fields: Dict[str, Any]) -> Iterator[Any]:
+    """Разбирает объект категории: выдает элементы массива "products", остальные поля пишет в fields"""
+    if stream.peek() == "}":
+        stream.pos += 1
+        return
+    while True:
+        if stream.peek() != '"':
+            raise stream.error("ожидалось имя поля")
+        key = stream.value()
+        stream.expect(":", "ожидалось ':'")
+        if key == "products":
+            if stream.peek() != "[":
+                raise ValueError(f"Ошибка в данных из {stream.file_path}: поле 'products' должно быть списком")
+            stream.pos += 1
+            if stream.peek() == "]":
+                stream.pos += 1
+            else:
+                while True:
+                    yield stream.value()
+                    if stream.expect(",]", "ожидалась ',' или ']'") == "]":
+                        break
+        else:
+            fields[key] = stream.value()
+        if stream.expect(",}", "ожидалась ',' или '}'") == "}":
+            return
+
+
+def _detect_file_encoding(file_path: str) -> str:
+    """
+    Кодировка файла для потокового чтения: по BOM, иначе проверкой всего файла
+    на UTF-8 блоками - чтобы не переключать кодировку посреди выдачи категорий
+    """
+    with open(file_path, "rb") as file:
+        chunk = file.read(_SNIFF_SIZE)
+        encoding = detect_encoding(chunk)
+        if encoding != "utf-8":
+            return encoding
+        decoder = codecs.getincrementaldecoder("utf-8")()
+        try:
+            while chunk:
+                decoder.decode(chunk)
+                chunk = file.read(_SNIFF_SIZE)
+            decoder.decode(b"", final=True)
+        except UnicodeDecodeError:
+            return FALLBACK_ENCODING
+    return "utf-8"
+
+
+def save_categories(
+    file_path: str | Path, categories: Iterable[Category], compact: bool = False, buffer_size: int = 1024 * 1024
+) -> None:
     """Save categories to JSON file
 
+    Categories and products are serialized one by one straight to a buffered
+    temporary file next to the target, which is fsynced and then atomically
+    replaces it, so memory use does not grow with the catalog and readers never
+    see a partial file. The target keeps its permissions; a new file gets the
+    default mode under the process umask.
+
     Args:
         file_path: Path to save file
-        categories: List of categories to save
+        categories: Categories to save (any iterable, e.g. JsonLoader.iter_categories)
+        compact: Write without indentation and spaces
+        buffer_size: Write buffer size in bytes
     """
-    data = [
-        {
-            "name": cat.name,
-            "description": cat.description,
-            "products": [
-                {
-                    "name": prod.name,
-                    "description": prod.description,
-                    "price": prod.price,
-                    "quantity": prod.quantity,
-                }
-                for prod in cat.products  # Используем публичное свойство products
-            ],
-        }
-        for cat in categories
-    ]
-
-    with open(file_path, "w", encoding="utf-8") as file:
-        json.dump(data, file, ensure_ascii=False, indent=2)
+    with atomic_write(file_path, "w", encoding="utf-8", buffering=buffer_size) as file:
+        _write_categories(file, categories, compact)
+
+
+def _write_categories(file: IO[str], categories: Iterable[Category], compact: bool) -> None:
+    """Пишет категории в файл по одному продукту; без compact формат совпадает с json.dump(indent=2)"""
+    if compact:
+        dumps = partial(json.dumps, ensure_ascii=False, separators=(",", ":"))
+        file.write("[")
+        for index, category in enumerate(categories):
+            header = dumps({"name": category.name, "description": category.description})
+            file.write(("," if index else "") + header[:-1] + ',"products":[')
+            file.write(",".join(dumps(product_to_dict(product)) for product in category.products))
+            file.write("]}")
+        file.write("]")
+        return
+
+    dumps = partial(json.dumps, ensure_ascii=False, indent=2)
+    # Поля продукта - скаляры, поэтому отступы json.dump(indent=2) дает разделитель
+    # элементов с переводом строки; без indent кодирует C-ускоренный кодировщик
+    encode_product = json.JSONEncoder(ensure_ascii=False, separators=(",\n        ", ": ")).encode
+    has_categories = False
+    file.write("[")
+    for category in categories:
+        file.write(",\n  {\n" if has_categories else "\n  {\n")
+        has_categories = True
+        file.write(f'    "name": {dumps(category.name)},\n')
+        file.write(f'    "description": {dumps(category.description)},\n')
+        file.write('    "products": [')
+        has_products = False
+        for product in category.products:
+            file.write(",\n      " if has_products else "\n      ")
+            has_products = True
+            file.write("{\n        " + encode_product(product_to_dict(product))[1:-1] + "\n      }")
+        file.write("\n    ]\n  }" if has_products else "]\n  }")
+    file.write("\n]" if has_categories else "]")
@@ -1,13 +1,40 @@
 import logging
-from typing import Any, Tuple, Dict
+from collections import Counter
+from typing import Any, Dict, Tuple
+
+
+class _LazyArgs:
+    """Defers building the argument repr until a handler actually formats the record"""
+
+    __slots__ = ("args", "kwargs")
+
+    def __init__(self, args: Tuple[Any, ...], kwargs: Dict[str, Any]) -> None:
+        self.args = args
+        self.kwargs = kwargs
+
+    def __str__(self) -> str:
+        args_repr = [repr(arg) for arg in self.args]
+        kwargs_repr = [f"{k}={repr(v)}" for k, v in self.kwargs.items()]
+        return ", ".join(args_repr + kwargs_repr)
 
 
 class LoggingMixin:
-    """Mixin class for logging object creation"""
+    """Mixin class for logging object creation
+
+    The logger is looked up once per class, constructor arguments are not kept on
+    the instance and their repr is only built if the record is emitted. With
+    ``aggregate_creation = True`` the mixin only counts created objects per class;
+    call ``flush_creation_counts`` to log the totals.
+    """
+
+    # Slot-friendly: the mixin adds no per-instance storage of its own
+    __slots__ = ()
 
-    _init_args: Tuple[Any, ...]
-    _init_kwargs: Dict[str, Any]
-    _logger: logging.Logger
+    # Count creations per class instead of logging one line per object
+    aggregate_creation: bool = False
+
+    _loggers: Dict[type, logging.Logger] = {}
+    _creation_counts: Counter = Counter()
 
     def __init__(self, *args: Any, **kwargs: Any) -> None:
         """Initialize object with logging
@@ -17,23 +44,37 @@ class LoggingMixin:
             **kwargs: Keyword arguments
         """
         super().__init__(*args, **kwargs)  # type: ignore[call-arg]
-        self._setup_logging()
-        self._log_creation()
-
-    def _setup_logging(self) -> None:
-        """Configure logging settings"""
-        logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
-        self._logger = logging.getLogger(self.__class__.__name__)
-
-    def _log_creation(self) -> None:
-        """Log object creation with parameters"""
-        args_repr = [repr(arg) for arg in getattr(self, "_init_args", ())]
-        kwargs_repr = [f"{k}={repr(v)}" for k, v in getattr(self, "_init_kwargs", {}).items()]
-        self._logger.info(f"Created {self.__class__.__name__} with args: {', '.join(args_repr + kwargs_repr)}")
-
-    def __new__(cls, *args: Any, **kwargs: Any) -> Any:
-        """Create new instance and store init arguments"""
-        instance = super().__new__(cls)
-        instance._init_args = args
-        instance._init_kwargs = kwargs
-        return instance
+        cls = type(self)
+        if cls.aggregate_creation:
+            LoggingMixin._creation_counts[cls.__name__] += 1
+            return
+        logger = LoggingMixin._loggers.get(cls) or cls._setup_logging()
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("Created %s with args: %s", cls.__name__, _LazyArgs(args, kwargs))
+
+    @classmethod
+    def _setup_logging(cls) -> logging.Logger:
+        """Look up and cache the logger for the class (once per class)"""
+        if not logging.getLogger().handlers:
+            logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+        logger = LoggingMixin._loggers[cls] = logging.getLogger(cls.__name__)
+        return logger
+
+    @staticmethod
+    def creation_counts() -> Dict[str, int]:
+        """Return the number of objects created per class in aggregate mode"""
+        return dict(LoggingMixin._creation_counts)
+
+    @staticmethod
+    def flush_creation_counts() -> Dict[str, int]:
+        """Log the aggregated creation counters and reset them
+
+        Returns:
+            The counters that were logged
+        """
+        counts = LoggingMixin.creation_counts()
+        LoggingMixin._creation_counts.clear()
+        logger = logging.getLogger(LoggingMixin.__name__)
+        for name, count in sorted(counts.items()):
+            logger.info("Created %d %s objects", count, name)
+        return counts
@@ -0,0 +1,247 @@
+"""Инструментирование горячих путей: счетчики, гистограммы задержек и экспорт.
+
+По умолчанию выключено: timed() возвращает общий пустой контекстный менеджер,
+а increment()/observe() сразу возвращаются, поэтому накладные расходы
+сводятся к вызову функции и проверке флага.
+
+    metrics.enable()
+    categories = JsonLoader.load_categories("data/products.json")
+    print(metrics.snapshot()["histograms"]["loader.parse"])
+"""
+
+import cProfile
+import logging
+import pstats
+import random
+import threading
+import time
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from contextlib import AbstractContextManager
+from typing import Any, Callable, Dict, List, Optional
+
+# Верхние границы корзин гистограммы в секундах: от 1 мкс до ~16 с, шаг x2
+BUCKETS: List[float] = [1e-6 * 2**power for power in range(25)]
+
+# Хук профилировщика: получает имя операции и возвращает контекст, в котором она выполняется
+ProfilerHook = Callable[[str], AbstractContextManager]
+
+_enabled = False
+_lock = threading.Lock()
+_counters: Dict[str, int] = {}
+_histograms: Dict[str, "Histogram"] = {}
+_exporters: List["MetricsExporter"] = []
+_profiler: Optional[ProfilerHook] = None
+_profile_sample_rate = 0.0
+
+
+class Histogram:
+    """Гистограмма задержек с фиксированными корзинами"""
+
+    __slots__ = ("count", "total", "min", "max", "buckets")
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.total = 0.0
+        self.min = float("inf")
+        self.max = 0.0
+        # Последняя корзина - для значений больше BUCKETS[-1]
+        self.buckets = [0] * (len(BUCKETS) + 1)
+
+    def observe(self, seconds: float) -> None:
+        self.count += 1
+        self.total += seconds
+        if seconds < self.min:
+            self.min = seconds
+        if seconds > self.max:
+            self.max = seconds
+        self.buckets[bisect_left(BUCKETS, seconds)] += 1
+
+    def percentile(self, fraction: float) -> float:
+        """Оценка перцентиля сверху - граница корзины, в которую он попадает"""
+        if not self.count:
+            return 0.0
+        rank = fraction * self.count
+        seen = 0
+        for bound, count in zip(BUCKETS, self.buckets):
+            seen += count
+            if seen >= rank:
+                return min(bound, self.max)
+        return self.max
+
+    def to_dict(self) -> Dict[str, float]:
+        return {
+            "count": self.count,
+            "sum": self.total,
+            "min": self.min if self.count else 0.0,
+            "max": self.max,
+            "mean": self.total / self.count if self.count else 0.0,
+            "p50": self.percentile(0.5),
+            "p95": self.percentile(0.95),
+            "p99": self.percentile(0.99),
+        }
+
+
+class MetricsExporter(ABC):
+    """Интерфейс экспорта метрик во внешнюю систему"""
+
+    @abstractmethod
+    def export(self, snapshot: Dict[str, Any]) -> None:
+        """Принимает снимок в формате snapshot()"""
+
+
+class LoggingExporter(MetricsExporter):
+    """Пишет метрики в лог, по строке на счетчик и гистограмму"""
+
+    def __init__(self, logger: Optional[logging.Logger] = None) -> None:
+        self.logger = logger or logging.getLogger("metrics")
+
+    def export(self, snapshot: Dict[str, Any]) -> None:
+        for name, value in sorted(snapshot["counters"].items()):
+            self.logger.info("%s = %d", name, value)
+        for name, histogram in sorted(snapshot["histograms"].items()):
+            self.logger.info(
+                "%s: count=%d mean=%.6fs p95=%.6fs max=%.6fs",
+                name,
+                histogram["count"],
+                histogram["mean"],
+                histogram["p95"],
+                histogram["max"],
+            )
+
+
+class CProfileHook:
+    """Хук профилировщика на cProfile: накапливает статистику отдельно по каждой операции"""
+
+    def __init__(self) -> None:
+        self.profiles: Dict[str, cProfile.Profile] = {}
+
+    def __call__(self, name: str) -> cProfile.Profile:
+        profile = self.profiles.get(name)
+        if profile is None:
+            profile = self.profiles[name] = cProfile.Profile()
+        return profile
+
+    def stats(self, name: str) -> pstats.Stats:
+        """Статистика операции для печати (print_stats) или сохранения (dump_stats)"""
+        return pstats.Stats(self.profiles[name])
+
+
+class _NoopTimer:
+    __slots__ = ()
+
+    def __enter__(self) -> None:
+        return None
+
+    def __exit__(self, *exc_info: Any) -> None:
+        return None
+
+
+_NOOP = _NoopTimer()
+
+
+class _Timer:
+    __slots__ = ("name", "started", "profile")
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.profile: Optional[AbstractContextManager] = None
+
+    def __enter__(self) -> None:
+        if _profiler is not None and random.random() < _profile_sample_rate:
+            profile = _profiler(self.name)
+            try:
+                profile.__enter__()
+                self.profile = profile
+            except ValueError:
+                # Профилировщик уже активен (вложенная операция или другой поток) - замер без профиля
+                pass
+        self.started = time.perf_counter()
+
+    def __exit__(self, *exc_info: Any) -> None:
+        elapsed = time.perf_counter() - self.started
+        if self.profile is not None:
+            self.profile.__exit__(*exc_info)
+        observe(self.name, elapsed)
+
+
+def enable(profiler: Optional[ProfilerHook] = None, profile_sample_rate: float = 0.01) -> None:
+    """
+    Включает сбор метрик
+    :param profiler: Хук профилировщика (например, CProfileHook()), вызывается для части замеров
+    :param profile_sample_rate: Доля замеров timed(), выполняемых под профилировщиком
+    """
+    global _enabled, _profiler, _profile_sample_rate
+    _profiler = profiler
+    _profile_sample_rate = profile_sample_rate
+    _enabled = True
+
+
+def disable() -> None:
+    """Выключает сбор метрик (накопленные значения сохраняются)"""
+    global _enabled, _profiler
+    _enabled = False
+    _profiler = None
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+def timed(name: str) -> AbstractContextManager:
+    """Контекстный менеджер, записывающий время выполнения блока в гистограмму name"""
+    if not _enabled:
+        return _NOOP
+    return _Timer(name)
+
+
+def increment(name: str, value: int = 1) -> None:
+    """Увеличивает счетчик"""
+    if not _enabled:
+        return
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + value
+
+
+def observe(name: str, seconds: float) -> None:
+    """Добавляет значение в гистограмму"""
+    if not _enabled:
+        return
+    with _lock:
+        histogram = _histograms.get(name)
+        if histogram is None:
+            histogram = _histograms[name] = Histogram()
+        histogram.observe(seconds)
+
+
+def snapshot() -> Dict[str, Any]:
+    """Текущие значения: {"counters": {имя: значение}, "histograms": {имя: {count, sum, ..., p99}}}"""
+    with _lock:
+        return {
+            "counters": dict(_counters),
+            "histograms": {name: histogram.to_dict() for name, histogram in _histograms.items()},
+        }
+
+
+def reset() -> None:
+    """Сбрасывает все накопленные значения"""
+    with _lock:
+        _counters.clear()
+        _histograms.clear()
+
+
+def add_exporter(exporter: MetricsExporter) -> None:
+    """Регистрирует экспортер для export()"""
+    _exporters.append(exporter)
+
+
+def remove_exporter(exporter: MetricsExporter) -> None:
+    _exporters.remove(exporter)
+
+
+def export() -> Dict[str, Any]:
+    """Передает текущий снимок всем экспортерам и возвращает его"""
+    current = snapshot()
+    for exporter in _exporters:
+        exporter.export(current)
+    return current
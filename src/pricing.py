@@ -0,0 +1,157 @@
+from abc import ABC, abstractmethod
+from decimal import Decimal
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple, Type
+
+from src.category import Category
+from src.product import Product
+
+
+class PriceChange(NamedTuple):
+    """Изменение цены одного товара"""
+
+    category: Category
+    product: Product
+    old_price: Decimal
+    new_price: Decimal
+
+
+class DiscountRule(ABC):
+    """Правило скидки: выбирает товары и задает размер скидки"""
+
+    def __init__(self, discount: float) -> None:
+        if not 0 < discount < 1:
+            raise ValueError("Скидка должна быть между 0 и 1")
+        self.discount = discount
+        # Множитель цены считается один раз на правило, а не на каждый товар
+        self.factor = Decimal("1") - Decimal(str(discount))
+
+    def select(self, category: Category) -> Iterable[Product]:
+        """Товары категории, к которым применяется правило"""
+        return (product for product in category.products if self.matches(category, product))
+
+    @abstractmethod
+    def matches(self, category: Category, product: Product) -> bool:
+        """Проверяет, применяется ли правило к товару"""
+        pass
+
+
+class CategoryDiscount(DiscountRule):
+    """Скидка на все товары категории с заданным названием"""
+
+    def __init__(self, category_name: str, discount: float) -> None:
+        super().__init__(discount)
+        self.category_name = category_name
+
+    def select(self, category: Category) -> Iterable[Product]:
+        return category.products if category.name == self.category_name else ()
+
+    def matches(self, category: Category, product: Product) -> bool:
+        return category.name == self.category_name
+
+
+class TypeDiscount(DiscountRule):
+    """Скидка на товары заданного типа (Product, Smartphone, LawnGrass)"""
+
+    def __init__(self, product_type: Type[Product], discount: float) -> None:
+        super().__init__(discount)
+        self.product_type = product_type
+
+    def select(self, category: Category) -> Iterable[Product]:
+        # Индекс строится за O(n log n) - выгоден, только если уже есть; иначе один линейный проход
+        if category.has_index:
+            return category.products_of_type(self.product_type)
+        return category.filter_products(product_type=self.product_type)
+
+    def matches(self, category: Category, product: Product) -> bool:
+        return type(product) is self.product_type
+
+
+class PriceBandDiscount(DiscountRule):
+    """Скидка на товары с ценой в диапазоне [min_price, max_price]"""
+
+    def __init__(self, discount: float, min_price: Optional[float] = None, max_price: Optional[float] = None) -> None:
+        super().__init__(discount)
+        self.min_price = min_price
+        self.max_price = max_price
+
+    def select(self, category: Category) -> Iterable[Product]:
+        if category.has_index:
+            return category.products_in_price_range(self.min_price, self.max_price)
+        return category.filter_products(self.min_price, self.max_price)
+
+    def matches(self, category: Category, product: Product) -> bool:
+        price = product.price
+        return (self.min_price is None or price >= self.min_price) and (
+            self.max_price is None or price <= self.max_price
+        )
+
+
+def _write_prices(changes: List[PriceChange], new: bool) -> None:
+    """Записывает новые (или старые) цены пачками по категориям: агрегаты, колонки и индекс - раз на категорию"""
+    groups: Dict[int, Tuple[Category, List[Product], List[Decimal]]] = {}
+    for change in changes:
+        _, products, prices = groups.setdefault(id(change.category), (change.category, [], []))
+        products.append(change.product)
+        prices.append(change.new_price if new else change.old_price)
+    for category, products, prices in groups.values():
+        category._reprice(products, prices)
+
+
+class PricingTransaction:
+    """Примененный набор изменений цен, который можно откатить"""
+
+    def __init__(self, changes: List[PriceChange]) -> None:
+        self.changes = changes
+        self.rolled_back = False
+
+    def rollback(self) -> None:
+        """Возвращает старые цены всем измененным товарам"""
+        if self.rolled_back:
+            return
+        _write_prices(self.changes, new=False)
+        self.rolled_back = True
+
+
+class PricingEngine:
+    """
+    Пакетное применение правил скидок к каталогу.
+
+    Для каждого товара действует первое по порядку правило, подходящее ему
+    в любой из категорий; товар, входящий в несколько категорий, уценивается один раз.
+    """
+
+    def __init__(self, rules: List[DiscountRule]) -> None:
+        self.rules = rules
+
+    def preview(self, categories: Iterable[Category]) -> List[PriceChange]:
+        """Рассчитывает изменения цен без применения (dry-run)"""
+        categories = list(categories)
+        # Правило для товара выбирается по всему каталогу сразу, а не по первой встреченной категории
+        resolved: Dict[int, Tuple[DiscountRule, Category]] = {}
+        for rule in self.rules:
+            for category in categories:
+                for product in rule.select(category):
+                    resolved.setdefault(id(product), (rule, category))
+
+        changes: List[PriceChange] = []
+        for category in categories:
+            for product in category.products:
+                match = resolved.pop(id(product), None)
+                if match is not None:
+                    rule, rule_category = match
+                    changes.append(PriceChange(rule_category, product, product._price, product._price * rule.factor))
+        return changes
+
+    def apply(self, categories: Iterable[Category]) -> PricingTransaction:
+        """
+        Применяет скидки атомарно: при ошибке уже измененные цены возвращаются
+        :return: Транзакция, которую можно откатить
+        """
+        changes = self.preview(categories)
+        try:
+            _write_prices(changes, new=True)
+        except Exception:
+            # Откат неизмененным товарам ставит ту же цену и ничего не меняет
+            PricingTransaction(changes).rollback()
+            raise
+        return PricingTransaction(changes)
@@ -1,12 +1,49 @@
+import sys
+from collections import deque
 from decimal import Decimal
-from typing import Any, Dict
+from functools import lru_cache
+from itertools import repeat
+from operator import attrgetter
+from typing import Any, Callable, Dict, Iterable, List, Optional, Self, Sequence, Tuple
 
 from src.base_product import BaseProduct
 
+# Признак обязательного поля в описании строки данных
+REQUIRED = object()
+
+# (ключ в словаре, атрибут объекта, конвертер, значение по умолчанию или REQUIRED)
+RowField = Tuple[str, str, Callable[[Any], Any], Any]
+
+
+def interned_str(value: Any) -> str:
+    """Приводит значение к строке и интернирует ее (для часто повторяющихся значений)"""
+    return sys.intern(str(value))
+
+
+@lru_cache(maxsize=65536, typed=True)
+def _to_decimal(value: float) -> Decimal:
+    """Переводит цену в Decimal; одинаковые цены разделяют один неизменяемый объект"""
+    return Decimal(str(value))
+
 
 class Product(BaseProduct):
     """Конкретная реализация продукта"""
 
+    __slots__ = ("name", "description", "_price", "_quantity", "_watchers", "_str_cache")
+
+    _price: Decimal
+    _quantity: int
+
+    # Поля строки данных кроме цены - используются при пакетном создании
+    _row_fields: Tuple[RowField, ...] = (
+        ("name", "name", str, REQUIRED),
+        ("description", "description", str, REQUIRED),
+        ("quantity", "_quantity", int, REQUIRED),
+    )
+
+    # Атрибуты (кроме цены и количества), от которых зависит строковое представление
+    _render_key: Callable[[Any], Any] = attrgetter("name")
+
     def __init__(self, name: str, description: str, price: float, quantity: int, **kwargs: Any) -> None:
         """
         Инициализация продукта
@@ -16,11 +53,11 @@ class Product(BaseProduct):
         :param quantity: Количество продукта (неотрицательное)
         :param kwargs: Дополнительные параметры
         """
+        # Контейнеры, которые нужно уведомлять об изменении цены и количества
+        self._watchers: Optional[List[Any]] = None
+        # Кэш __str__: (значения _render_key, строка); сбрасывается при изменении цены и количества
+        self._str_cache: Optional[Tuple[Any, str]] = None
         super().__init__(name, description, price, quantity)
-        self.name = name
-        self.description = description
-        self.price = price
-        self.quantity = quantity
 
     @property
     def price(self) -> float:
@@ -32,10 +69,54 @@ class Product(BaseProduct):
         """Устанавливает цену продукта"""
         if value <= 0:
             raise ValueError("Цена должна быть положительной")
-        self._price = Decimal(str(value))
+        self._str_cache = None
+        if self._watchers:
+            old_price = self._price
+            self._price = _to_decimal(value)
+            self._notify(old_price, self._quantity)
+        else:
+            self._price = _to_decimal(value)
+
+    @property
+    def quantity(self) -> int:
+        """Возвращает количество продукта"""
+        return self._quantity
+
+    @quantity.setter
+    def quantity(self, value: int) -> None:
+        """Устанавливает количество продукта"""
+        self._str_cache = None
+        if self._watchers:
+            old_quantity = self._quantity
+            self._quantity = value
+            self._notify(self._price, old_quantity)
+        else:
+            self._quantity = value
+
+    def _notify(self, old_price: Decimal, old_quantity: int) -> None:
+        """Сообщает контейнерам об изменении цены или количества"""
+        for watcher in self._watchers or ():
+            watcher._on_product_change(self, old_price, old_quantity)
+
+    def notify_changed(self) -> None:
+        """
+        Сообщает контейнерам об изменении атрибутов без сеттеров (название, описание,
+        характеристики): категории обновляют render() и индексы, фасетный индекс - значения
+        """
+        self._str_cache = None
+        for watcher in self._watchers or ():
+            watcher._on_product_text_change(self)
 
     def __str__(self) -> str:
-        """Строковое представление продукта"""
+        """Строковое представление продукта (кэшируется до изменения цены, количества или атрибутов)"""
+        key = type(self)._render_key(self)
+        cache = self._str_cache
+        if cache is None or cache[0] != key:
+            cache = self._str_cache = (key, self._render())
+        return cache[1]
+
+    def _render(self) -> str:
+        """Строит строковое представление; подклассы дополняют его и _render_key"""
         return f"{self.name}, {self.price} руб. Остаток: {self.quantity} шт."
 
     @property
@@ -53,6 +134,72 @@ class Product(BaseProduct):
             quantity=int(data["quantity"]),
         )
 
+    @classmethod
+    def create_many(cls, rows: Iterable[Dict[str, Any]], row_numbers: Optional[Sequence[int]] = None) -> List[Self]:
+        """
+        Пакетно создает продукты из списка словарей.
+
+        Конвертация и проверка выполняются по колонкам для всей пачки сразу,
+        объекты создаются без повторных вызовов сеттеров.
+        :param rows: Словари с данными продуктов
+        :param row_numbers: Номера строк для сообщений об ошибках (по умолчанию - позиции в rows)
+        :return: Список продуктов в порядке строк
+        :raises ValueError: При ошибке в данных, с номером строки
+        """
+        rows = rows if isinstance(rows, list) else list(rows)
+        fields = cls._row_fields
+        try:
+            raw_prices = [float(row["price"]) for row in rows]
+            columns = [
+                (
+                    [convert(row[key]) for row in rows]
+                    if default is REQUIRED
+                    else [convert(row.get(key, default)) for row in rows]
+                )
+                for key, _, convert, default in fields
+            ]
+        except (KeyError, TypeError, ValueError):
+            cls._raise_row_error(rows, row_numbers)
+            raise
+        return cls.from_columns(raw_prices, columns, row_numbers)
+
+    @classmethod
+    def from_columns(
+        cls, prices: Sequence[float], columns: Sequence[Sequence[Any]], row_numbers: Optional[Sequence[int]] = None
+    ) -> List[Self]:
+        """
+        Создает продукты из уже сконвертированных колонок.
+
+        Объекты заполняются через дескрипторы слотов, без __init__ и сеттеров.
+        :param prices: Цены
+        :param columns: Значения остальных полей, по колонке на каждое поле из _row_fields
+        :param row_numbers: Номера строк для сообщений об ошибках (по умолчанию - позиции в prices)
+        :return: Список продуктов
+        :raises ValueError: Если цена не положительна, с номером строки
+        """
+        if len(prices) and min(prices) <= 0:
+            index = next(i for i, price in enumerate(prices) if price <= 0)
+            number = row_numbers[index] if row_numbers is not None else index
+            raise ValueError(f"Ошибка в строке {number}: Цена должна быть положительной")
+
+        products = [cls.__new__(cls) for _ in range(len(prices))]
+        attrs = ["_watchers", "_str_cache", "_price"] + [attr for _, attr, _, _ in cls._row_fields]
+        for attr, values in zip(attrs, [repeat(None), repeat(None), map(_to_decimal, prices), *columns]):
+            deque(map(getattr(cls, attr).__set__, products, values), maxlen=0)
+        return products
+
+    @classmethod
+    def _raise_row_error(cls, rows: List[Dict[str, Any]], row_numbers: Optional[Sequence[int]] = None) -> None:
+        """Находит первую некорректную строку и выбрасывает ValueError с ее номером"""
+        for index, row in enumerate(rows):
+            try:
+                float(row["price"])
+                for key, _, convert, default in cls._row_fields:
+                    convert(row[key] if default is REQUIRED else row.get(key, default))
+            except (KeyError, TypeError, ValueError) as e:
+                number = row_numbers[index] if row_numbers is not None else index
+                raise ValueError(f"Ошибка в строке {number}: {str(e)}") from e
+
     def apply_discount(self, discount: float) -> None:
         """
         Применяет скидку к цене продукта
@@ -62,4 +209,12 @@ class Product(BaseProduct):
         """
         if not 0 < discount <= 1:
             raise ValueError("Скидка должна быть между 0 и 1")
-        self._price = self._price * (Decimal("1") - Decimal(str(discount)))
+        self.set_decimal_price(self._price * (Decimal("1") - Decimal(str(discount))))
+
+    def set_decimal_price(self, value: Decimal) -> None:
+        """Устанавливает точную цену в Decimal без проверки (для пакетных операций) и уведомляет контейнеры"""
+        old_price = self._price
+        self._price = value
+        self._str_cache = None
+        if self._watchers:
+            self._notify(old_price, self._quantity)
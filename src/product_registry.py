@@ -0,0 +1,143 @@
+from operator import attrgetter, methodcaller
+from typing import Any, Callable, Dict, Iterable, List, Type, TypeVar
+
+from src.lawn_grass import LawnGrass
+from src.product import Product
+from src.smartphone import Smartphone
+
+P = TypeVar("P", bound=Product)
+
+# Ключ с тегом типа в словаре продукта; без него продукт считается базовым.
+# Ключ с префиксом не пересекается с полем "type" во фидах поставщиков
+TYPE_KEY = "_type"
+# Ключ тега в файлах прежнего формата: учитывается, только если значение - зарегистрированный тег
+LEGACY_TYPE_KEY = "type"
+DEFAULT_TYPE = "product"
+
+_get_tag = methodcaller("get", TYPE_KEY)
+_get_legacy_tag = methodcaller("get", LEGACY_TYPE_KEY)
+
+PRODUCT_TYPES: Dict[str, Type[Product]] = {}
+_TYPE_TAGS: Dict[Type[Product], str] = {}
+_SERIALIZERS: Dict[Type[Product], Callable[[Product], Dict[str, Any]]] = {}
+
+
+def register_product_type(tag: str, product_class: Type[P]) -> Type[P]:
+    """
+    Регистрирует класс продукта под тегом типа
+    :param tag: Тег типа в JSON ("smartphone", "lawn_grass", ...)
+    :param product_class: Класс продукта
+    :return: Тот же класс
+    """
+    PRODUCT_TYPES[tag] = product_class
+    _TYPE_TAGS[product_class] = tag
+    _SERIALIZERS.pop(product_class, None)
+    return product_class
+
+
+def get_product_type(tag: str) -> Type[Product]:
+    """Возвращает класс продукта по тегу типа"""
+    try:
+        return PRODUCT_TYPES[tag]
+    except KeyError:
+        raise ValueError(f"Неизвестный тип продукта: {tag}") from None
+
+
+def get_type_tag(product_class: Type[Product]) -> str:
+    """Возвращает тег типа для класса продукта или его ближайшего зарегистрированного предка"""
+    tag = _TYPE_TAGS.get(product_class)
+    if tag is None:
+        tag = next((_TYPE_TAGS[base] for base in product_class.__mro__ if base in _TYPE_TAGS), None)
+        if tag is None:
+            raise ValueError(f"Тип продукта не зарегистрирован: {product_class.__name__}")
+        _TYPE_TAGS[product_class] = tag
+    return tag
+
+
+def row_type_tag(row: Dict[str, Any]) -> str:
+    """
+    Тег типа строки данных.
+
+    Поле "type" прежнего формата считается тегом, только если это зарегистрированный
+    тег; иначе это обычное поле фида, и продукт загружается как базовый.
+    """
+    tag = row.get(TYPE_KEY)
+    if tag is None:
+        legacy = row.get(LEGACY_TYPE_KEY)
+        tag = legacy if isinstance(legacy, str) and legacy in PRODUCT_TYPES else DEFAULT_TYPE
+    return str(tag)
+
+
+def row_type_tags(rows: List[Dict[str, Any]]) -> List[str]:
+    """Теги типа для списка строк данных (см. row_type_tag); теги читаются на уровне C"""
+    tags = list(map(_get_tag, rows))
+    # Построчный разбор нужен только для файлов прежнего формата
+    if any(map(_get_legacy_tag, rows)):
+        return [row_type_tag(row) if tag is None else str(tag) for tag, row in zip(tags, rows)]
+    if None in tags:
+        return [DEFAULT_TYPE if tag is None else str(tag) for tag in tags]
+    return list(map(str, tags))
+
+
+def product_from_dict(data: Dict[str, Any]) -> Product:
+    """Создает продукт нужного класса по тегу типа"""
+    return get_product_type(row_type_tag(data)).create_product(data)
+
+
+def products_from_dicts(rows: Iterable[Dict[str, Any]]) -> List[Product]:
+    """
+    Пакетно создает продукты разных типов с сохранением порядка строк
+    :param rows: Словари с данными продуктов
+    :return: Список продуктов
+    :raises ValueError: При ошибке в данных, с номером строки
+    """
+    rows = rows if isinstance(rows, list) else list(rows)
+    tags = row_type_tags(rows)
+    unique = set(tags)
+    if len(unique) == 1:
+        (tag,) = unique
+        return get_product_type(tag).create_many(rows)
+
+    groups: Dict[str, List[int]] = {}
+    for index, tag in enumerate(tags):
+        groups.setdefault(tag, []).append(index)
+
+    products: List[Any] = [None] * len(rows)
+    for tag, indexes in groups.items():
+        # Номера строк группы передаются, чтобы ошибка указывала на строку исходного списка
+        created = get_product_type(tag).create_many([rows[index] for index in indexes], indexes)
+        for index, product in zip(indexes, created):
+            products[index] = product
+    return products
+
+
+def product_to_dict(product: Product) -> Dict[str, Any]:
+    """Сериализует продукт в словарь с тегом типа (тег базового продукта не пишется)"""
+    serializer = _SERIALIZERS.get(type(product))
+    if serializer is None:
+        serializer = _SERIALIZERS[type(product)] = _compile_serializer(type(product))
+    return serializer(product)
+
+
+def _compile_serializer(product_class: Type[Product]) -> Callable[[Product], Dict[str, Any]]:
+    """Готовит функцию сериализации для класса по его описанию полей _row_fields"""
+    tag = get_type_tag(product_class)
+
+    # Порядок ключей: name, description, price, quantity, затем поля подкласса
+    fields = product_class._row_fields
+    getter = attrgetter(*(attr for _, attr, _, _ in fields))
+    keys = [key for key, _, _, _ in fields[:2]] + ["price"] + [key for key, _, _, _ in fields[2:]]
+    extra = {TYPE_KEY: tag} if tag != DEFAULT_TYPE else {}
+
+    def serialize(product: Product) -> Dict[str, Any]:
+        name, description, *rest = getter(product)
+        record = dict(zip(keys, (name, description, float(product._price), *rest)))
+        record.update(extra)
+        return record
+
+    return serialize
+
+
+register_product_type(DEFAULT_TYPE, Product)
+register_product_type("smartphone", Smartphone)
+register_product_type("lawn_grass", LawnGrass)
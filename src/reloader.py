@@ -0,0 +1,299 @@
+import hashlib
+import json
+import os
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from src.category import Category
+from src.exceptions import CatalogLoadError
+from src.loaders import decode_catalog, file_version
+from src.product import Product
+from src.product_registry import products_from_dicts
+
+# Ключ товара при сравнении: название и номер среди товаров с тем же названием
+ProductKey = Tuple[str, int]
+
+
+class FileSignature(NamedTuple):
+    """Признаки версии файла: хэш содержимого считается, только если изменились время или размер"""
+
+    mtime_ns: int
+    size: int
+    digest: str
+
+
+@dataclass
+class CategoryChanges:
+    """Изменения товаров одной категории"""
+
+    inserted: List[str] = field(default_factory=list)
+    updated: List[str] = field(default_factory=list)
+    deleted: List[str] = field(default_factory=list)
+
+    def __bool__(self) -> bool:
+        return bool(self.inserted or self.updated or self.deleted)
+
+
+@dataclass
+class ChangeReport:
+    """Отчет о перезагрузке: какие файлы изменились и что поменялось в категориях"""
+
+    changed_files: List[str] = field(default_factory=list)
+    unchanged_files: List[str] = field(default_factory=list)
+    added_categories: List[str] = field(default_factory=list)
+    removed_categories: List[str] = field(default_factory=list)
+    categories: Dict[str, CategoryChanges] = field(default_factory=dict)
+    # Файлы, которые не удалось прочитать или применить: их категории остались прежними
+    errors: Dict[str, str] = field(default_factory=dict)
+
+    @property
+    def empty(self) -> bool:
+        """Ничего не изменилось"""
+        return not (self.added_categories or self.removed_categories or self.categories)
+
+    def __str__(self) -> str:
+        inserted = sum(len(changes.inserted) for changes in self.categories.values())
+        updated = sum(len(changes.updated) for changes in self.categories.values())
+        deleted = sum(len(changes.deleted) for changes in self.categories.values())
+        return (
+            f"Изменено файлов: {len(self.changed_files)}, "
+            f"категорий добавлено: {len(self.added_categories)}, удалено: {len(self.removed_categories)}, "
+            f"товаров добавлено: {inserted}, обновлено: {updated}, удалено: {deleted}, "
+            f"ошибок: {len(self.errors)}"
+        )
+
+
+def _row_hash(row: Dict[str, Any]) -> int:
+    """Хэш записи товара для сравнения с прошлой загрузкой (сами записи не хранятся)"""
+    try:
+        return hash(tuple(row.items()))
+    except TypeError:
+        # Вложенные списки и объекты не хэшируются - сравнивается их JSON представление
+        return hash(json.dumps(row, sort_keys=True, ensure_ascii=False))
+
+
+class _TrackedCategory:
+    """
+    Категория вместе с хэшами записей товаров, из которых она была синхронизирована
+    в последний раз; сами записи после синхронизации не хранятся
+    """
+
+    __slots__ = ("category", "description", "rows")
+
+    def __init__(self, category: Category, description: str, rows: Dict[ProductKey, Tuple[int, Product]]):
+        self.category = category
+        self.description = description
+        self.rows = rows
+
+
+class CatalogReloader:
+    """
+    Инкрементальная перезагрузка каталога из JSON файлов.
+
+    Первая загрузка создает категории как обычно. При перезагрузке файл
+    перечитывается, только если изменились время изменения или размер, и
+    разбирается, только если изменился хэш содержимого. Записи товаров
+    сравниваются с записями прошлой загрузки по названию: создаются объекты
+    только для новых и измененных записей, а изменения применяются к
+    существующим категориям на месте (add/remove и сеттеры), поэтому индексы,
+    колонки, агрегаты и ссылки на объекты сохраняются.
+
+    Товары с неизменившимися записями не трогаются - изменения, сделанные в
+    памяти (например, скидки), у них сохраняются. Файл с ошибкой не мешает
+    перезагрузке остальных: его категории остаются прежними, ошибка попадает в
+    отчет, и файл перечитывается при следующей перезагрузке.
+    """
+
+    def __init__(self, paths: Iterable[str | Path]) -> None:
+        self.paths = [str(path) for path in paths]
+        self._signatures: Dict[str, FileSignature] = {}
+        self._files: Dict[str, Dict[str, _TrackedCategory]] = {}
+
+    @property
+    def categories(self) -> List[Category]:
+        """Текущие категории всех файлов в порядке путей"""
+        return [tracked.category for path in self.paths for tracked in self._files.get(path, {}).values()]
+
+    def load(self) -> List[Category]:
+        """
+        Полная загрузка всех файлов; повторный вызов равносилен reload
+        :raises CatalogLoadError: Со сводкой ошибок, если какие-то файлы не удалось загрузить
+        """
+        report = self.reload()
+        if report.errors:
+            raise CatalogLoadError(report.errors, self.categories)
+        return self.categories
+
+    def reload(self) -> ChangeReport:
+        """
+        Применяет изменения файлов к загруженным категориям.
+
+        Ошибки чтения, JSON и данных собираются по файлам в report.errors;
+        категории такого файла остаются прежними.
+        :return: Отчет об изменениях
+        """
+        report = ChangeReport()
+        for path in self.paths:
+            try:
+                changed = self._read_if_changed(path)
+                if changed is None:
+                    report.unchanged_files.append(path)
+                    continue
+                data, signature = changed
+                self._apply(path, data, report)
+            except (OSError, ValueError) as e:
+                report.errors[path] = str(e)
+                continue
+            # Подпись запоминается только после успешного применения - иначе исправленный
+            # обратно файл с той же подписью никогда не перечитался бы
+            self._signatures[path] = signature
+            report.changed_files.append(path)
+        return report
+
+    def _read_if_changed(self, path: str) -> Optional[Tuple[List[Dict[str, Any]], FileSignature]]:
+        """Разобранные данные файла и его подпись или None, если файл не изменился с прошлой загрузки"""
+        stat = os.stat(path)
+        previous = self._signatures.get(path)
+        if previous is not None and (previous.mtime_ns, previous.size) == (stat.st_mtime_ns, stat.st_size):
+            return None
+
+        with open(path, "rb") as file:
+            content = file.read()
+        digest = hashlib.sha256(content).hexdigest()
+        signature = FileSignature(stat.st_mtime_ns, stat.st_size, digest)
+        if previous is not None and previous.digest == digest:
+            self._signatures[path] = signature
+            return None
+        return self._parse(content, path, stat), signature
+
+    @staticmethod
+    def _parse(content: bytes, path: str, stat: os.stat_result) -> List[Dict[str, Any]]:
+        text = decode_catalog(content, path, version=file_version(stat))
+        try:
+            data = json.loads(text)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Ошибка JSON в файле {path}: {str(e)}")
+        if not isinstance(data, list):
+            raise ValueError(f"Файл {path} должен содержать список категорий")
+        names = set()
+        for item in data:
+            if not isinstance(item, dict):
+                raise ValueError(f"Ошибка в данных из {path}: Категория должна быть объектом")
+            if "name" not in item or "description" not in item:
+                raise ValueError(f"Ошибка в данных из {path}: Отсутствуют обязательные поля 'name' или 'description'")
+            name = str(item["name"])
+            if name in names:
+                # Категории файла сопоставляются по названию - дубликат молча заменил бы первую
+                raise ValueError(f"Ошибка в данных из {path}: Категория '{name}' встречается в файле дважды")
+            names.add(name)
+            if not isinstance(item.get("products", []), list):
+                raise ValueError(f"Ошибка в данных из {path}: Поле 'products' должно быть списком объектов")
+        return data
+
+    def _apply(self, path: str, data: List[Dict[str, Any]], report: ChangeReport) -> None:
+        """Синхронизирует категории файла с новыми данными"""
+        old = self._files.get(path, {})
+        # Сначала создаются все новые объекты: при ошибке в данных категории не меняются
+        try:
+            plans = [(item, self._plan(old.get(str(item["name"])), item)) for item in data]
+        except ValueError as e:
+            raise ValueError(f"Ошибка в данных из {path}: {str(e)}")
+
+        current: Dict[str, _TrackedCategory] = {}
+        for item, (tracked, rows, products) in plans:
+            name = str(item["name"])
+            if tracked is None:
+                category = Category(name, str(item["description"]), [product for _, product in rows.values()])
+                current[name] = _TrackedCategory(category, category.description, rows)
+                if path in self._files:
+                    report.added_categories.append(name)
+                continue
+            changes = self._sync(tracked, item, rows, products)
+            if changes:
+                report.categories[name] = changes
+            current[name] = tracked
+        report.removed_categories.extend(name for name in old if name not in current)
+        self._files[path] = current
+
+    @staticmethod
+    def _keyed(rows: List[Dict[str, Any]]) -> Dict[ProductKey, Dict[str, Any]]:
+        counts: Dict[str, int] = {}
+        keyed = {}
+        for row in rows:
+            name = str(row["name"])
+            number = counts[name] = counts.get(name, -1) + 1
+            keyed[(name, number)] = row
+        return keyed
+
+    def _plan(
+        self, tracked: Optional[_TrackedCategory], item: Dict[str, Any]
+    ) -> Tuple[Optional[_TrackedCategory], Dict[ProductKey, Tuple[int, Product]], Dict[ProductKey, Product]]:
+        """Создает объекты для новых и измененных записей категории"""
+        try:
+            rows = self._keyed(item.get("products", []))
+            hashes = {key: _row_hash(row) for key, row in rows.items()}
+            known = tracked.rows if tracked is not None else {}
+            changed = [key for key, digest in hashes.items() if key not in known or known[key][0] != digest]
+            created = dict(zip(changed, products_from_dicts([rows[key] for key in changed])))
+        except (AttributeError, KeyError, TypeError, ValueError) as e:
+            raise ValueError(f"Ошибка создания продукта: {str(e)}")
+        synced = {key: (digest, created[key] if key in created else known[key][1]) for key, digest in hashes.items()}
+        return tracked, synced, created
+
+    @staticmethod
+    def _sync(
+        tracked: _TrackedCategory,
+        item: Dict[str, Any],
+        rows: Dict[ProductKey, Tuple[int, Product]],
+        created: Dict[ProductKey, Product],
+    ) -> CategoryChanges:
+        """Применяет вставки, обновления и удаления к категории на месте"""
+        category = tracked.category
+        changes = CategoryChanges()
+        category.description = str(item["description"])
+
+        # Удаления и вставки применяются пачками: список товаров, колонки и индексы
+        # категории перестраиваются один раз, а не на каждый товар
+        removed: List[Product] = []
+        inserted: List[Product] = []
+        for key, (_, product) in tracked.rows.items():
+            if key not in rows:
+                removed.append(product)
+                changes.deleted.append(key[0])
+
+        for key, new in created.items():
+            previous = tracked.rows.get(key)
+            if previous is None:
+                inserted.append(new)
+                changes.inserted.append(key[0])
+            elif type(previous[1]) is not type(new):
+                # Сменился тип товара - объект заменяется
+                removed.append(previous[1])
+                inserted.append(new)
+                changes.updated.append(key[0])
+            else:
+                _update_product(previous[1], new)
+                rows[key] = (rows[key][0], previous[1])
+                changes.updated.append(key[0])
+
+        category.remove_products(removed)
+        category._insert_many(inserted)
+        tracked.description = category.description
+        tracked.rows = rows
+        return changes
+
+
+def _update_product(product: Product, source: Product) -> None:
+    """
+    Переносит значения полей из source; цена и количество меняются через уведомляющие
+    сеттеры, об остальных полях контейнеры узнают из notify_changed
+    """
+    if product._price != source._price:
+        product.set_decimal_price(source._price)
+    if product.quantity != source.quantity:
+        product.quantity = source.quantity
+    for _, attr, _, _ in type(product)._row_fields:
+        if attr not in ("name", "_quantity"):
+            setattr(product, attr, getattr(source, attr))
+    product.notify_changed()
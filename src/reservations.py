@@ -0,0 +1,231 @@
+import heapq
+import itertools
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from src.exceptions import ReservationError
+from src.product import Product
+
+# Состояния резерва
+ACTIVE = "active"
+COMMITTED = "committed"
+RELEASED = "released"
+EXPIRED = "expired"
+
+
+class Reservation:
+    """Резерв товаров под один заказ; изменяется только движком резервирования"""
+
+    __slots__ = ("id", "items", "expires_at", "state", "_stripes")
+
+    def __init__(
+        self, reservation_id: int, items: Tuple[Tuple[Product, int], ...], expires_at: float, stripes: List[int]
+    ):
+        self.id = reservation_id
+        self.items = items
+        self.expires_at = expires_at
+        self.state = ACTIVE
+        # Номера блокировок товаров резерва по возрастанию - порядок захвата
+        self._stripes = stripes
+
+    def __repr__(self) -> str:
+        return f"Reservation(id={self.id}, items={len(self.items)}, state={self.state})"
+
+
+class ReservationEngine:
+    """
+    Потокобезопасное резервирование остатков товаров.
+
+    Вместо одной глобальной блокировки используются полосы (striped locks):
+    товар закреплен за одной из ``stripes`` блокировок, поэтому операции с
+    разными товарами почти всегда выполняются параллельно. Резерв нескольких
+    товаров захватывает нужные полосы по возрастанию номера, что исключает
+    взаимную блокировку. Изменение количества при подтверждении дополнительно
+    защищается полосой категории, так как категории обновляют агрегаты в
+    обработчике изменения товара.
+
+    Резерв не меняет Product.quantity: доступно ``quantity - зарезервировано``.
+    Количество уменьшается только при commit. Резервы, не подтвержденные за
+    ``ttl`` секунд, освобождаются вызовом expire().
+    """
+
+    def __init__(self, stripes: int = 64, ttl: float = 900.0, clock: Callable[[], float] = time.monotonic) -> None:
+        if stripes < 1:
+            raise ValueError("Количество блокировок должно быть положительным")
+        if ttl <= 0:
+            raise ValueError("Время жизни резерва должно быть положительным")
+        self.ttl = ttl
+        self._clock = clock
+        self._locks = [threading.Lock() for _ in range(stripes)]
+        self._container_locks = [threading.Lock() for _ in range(stripes)]
+        # Зарезервированное количество по id товара, отдельный словарь на каждую полосу
+        self._reserved: List[Dict[int, int]] = [{} for _ in range(stripes)]
+        self._ids = itertools.count(1)
+        # Очередь сроков истечения. Подтвержденные и отмененные резервы из нее не удаляются
+        # сразу (это O(n)), а пропускаются: в очереди важны только id из _live
+        self._expiry: List[Tuple[float, int, Reservation]] = []
+        self._live: Set[int] = set()
+        self._expiry_lock = threading.Lock()
+
+    def _stripe(self, obj: object) -> int:
+        # Младшие биты id совпадают из-за выравнивания объектов
+        return (id(obj) >> 4) % len(self._locks)
+
+    def available(self, product: Product) -> int:
+        """Количество товара, доступное для резервирования"""
+        stripe = self._stripe(product)
+        with self._locks[stripe]:
+            return product.quantity - self._reserved[stripe].get(id(product), 0)
+
+    def reserved(self, product: Product) -> int:
+        """Количество товара в активных резервах"""
+        stripe = self._stripe(product)
+        with self._locks[stripe]:
+            return self._reserved[stripe].get(id(product), 0)
+
+    def reserve(self, product: Product, quantity: int, ttl: Optional[float] = None) -> Reservation:
+        """
+        Резервирует товар
+        :param product: Товар
+        :param quantity: Количество (положительное)
+        :param ttl: Время жизни резерва в секундах (по умолчанию - ttl движка; 0 - истекает сразу)
+        :return: Резерв
+        :raises ReservationError: Если доступного количества не хватает
+        """
+        return self.reserve_many([(product, quantity)], ttl)
+
+    def reserve_many(self, items: Iterable[Tuple[Product, int]], ttl: Optional[float] = None) -> Reservation:
+        """
+        Атомарно резервирует несколько товаров (корзину): резервируются все или ни один
+        :param items: Пары (товар, количество); повторяющиеся товары суммируются
+        :param ttl: Время жизни резерва в секундах (по умолчанию - ttl движка; 0 - истекает сразу)
+        :return: Резерв
+        :raises ReservationError: Если какого-либо товара не хватает
+        """
+        if ttl is not None and ttl < 0:
+            raise ValueError("Время жизни резерва не может быть отрицательным")
+        quantities: Dict[int, Tuple[Product, int]] = {}
+        for product, quantity in items:
+            if quantity <= 0:
+                raise ValueError("Количество для резервирования должно быть положительным")
+            previous = quantities.get(id(product))
+            quantities[id(product)] = (product, quantity + (previous[1] if previous else 0))
+        if not quantities:
+            raise ValueError("Нет товаров для резервирования")
+
+        merged = tuple(quantities.values())
+        stripes = sorted({self._stripe(product) for product, _ in merged})
+        self._acquire(stripes)
+        try:
+            for product, quantity in merged:
+                stripe = self._stripe(product)
+                free = product.quantity - self._reserved[stripe].get(id(product), 0)
+                if quantity > free:
+                    raise ReservationError(
+                        f"Недостаточно товара '{product.name}': запрошено {quantity}, доступно {free}"
+                    )
+            for product, quantity in merged:
+                reserved = self._reserved[self._stripe(product)]
+                reserved[id(product)] = reserved.get(id(product), 0) + quantity
+        finally:
+            self._release_locks(stripes)
+
+        reservation = Reservation(next(self._ids), merged, self._clock() + (self.ttl if ttl is None else ttl), stripes)
+        with self._expiry_lock:
+            heapq.heappush(self._expiry, (reservation.expires_at, reservation.id, reservation))
+            self._live.add(reservation.id)
+        return reservation
+
+    def commit(self, reservation: Reservation) -> None:
+        """
+        Подтверждает резерв: уменьшает количество товаров на зарезервированное
+        :raises ReservationError: Если резерв уже подтвержден, отменен или истек
+        """
+        self._acquire(reservation._stripes)
+        try:
+            self._finish(reservation, COMMITTED)
+            for product, quantity in reservation.items:
+                self._write_quantity(product, product.quantity - quantity)
+        finally:
+            self._release_locks(reservation._stripes)
+        self._forget(reservation)
+
+    def release(self, reservation: Reservation) -> None:
+        """
+        Отменяет резерв, возвращая количество в доступное
+        :raises ReservationError: Если резерв уже подтвержден, отменен или истек
+        """
+        self._acquire(reservation._stripes)
+        try:
+            self._finish(reservation, RELEASED)
+        finally:
+            self._release_locks(reservation._stripes)
+        self._forget(reservation)
+
+    def expire(self) -> int:
+        """
+        Освобождает резервы с истекшим временем жизни
+        :return: Количество освобожденных резервов
+        """
+        now = self._clock()
+        expired = []
+        with self._expiry_lock:
+            while self._expiry and self._expiry[0][0] <= now:
+                reservation = heapq.heappop(self._expiry)[2]
+                if reservation.id in self._live:
+                    self._live.discard(reservation.id)
+                    expired.append(reservation)
+
+        count = 0
+        for reservation in expired:
+            self._acquire(reservation._stripes)
+            try:
+                if reservation.state == ACTIVE:
+                    self._finish(reservation, EXPIRED)
+                    count += 1
+            finally:
+                self._release_locks(reservation._stripes)
+        return count
+
+    def _forget(self, reservation: Reservation) -> None:
+        """Убирает завершенный резерв из живых; очередь сжимается, когда в ней в основном завершенные"""
+        with self._expiry_lock:
+            self._live.discard(reservation.id)
+            if len(self._expiry) > 2 * len(self._live) + 64:
+                self._expiry = [entry for entry in self._expiry if entry[1] in self._live]
+                heapq.heapify(self._expiry)
+
+    def _finish(self, reservation: Reservation, state: str) -> None:
+        """Переводит резерв в конечное состояние и снимает его количества; полосы уже захвачены"""
+        if reservation.state != ACTIVE:
+            raise ReservationError(f"Резерв {reservation.id} уже завершен: {reservation.state}")
+        if state == COMMITTED and reservation.expires_at <= self._clock():
+            raise ReservationError(f"Резерв {reservation.id} истек")
+        for product, quantity in reservation.items:
+            reserved = self._reserved[self._stripe(product)]
+            left = reserved[id(product)] - quantity
+            if left:
+                reserved[id(product)] = left
+            else:
+                del reserved[id(product)]
+        reservation.state = state
+
+    def _write_quantity(self, product: Product, quantity: int) -> None:
+        """Меняет количество товара под блокировками категорий, которые его отслеживают"""
+        stripes = sorted({self._stripe(watcher) for watcher in product._watchers or ()})
+        for stripe in stripes:
+            self._container_locks[stripe].acquire()
+        try:
+            product.quantity = quantity
+        finally:
+            for stripe in reversed(stripes):
+                self._container_locks[stripe].release()
+
+    def _acquire(self, stripes: List[int]) -> None:
+        for stripe in stripes:
+            self._locks[stripe].acquire()
+
+    def _release_locks(self, stripes: List[int]) -> None:
+        for stripe in reversed(stripes):
+            self._locks[stripe].release()
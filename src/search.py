@@ -0,0 +1,259 @@
+import hashlib
+import heapq
+import json
+import math
+import re
+from bisect import bisect_left
+from collections import Counter
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional, Tuple
+
+from src.atomic_file import atomic_write
+from src.product import Product
+
+if TYPE_CHECKING:
+    from src.category import Category
+
+FORMAT_VERSION = 2
+
+# Вес совпадения в названии относительно совпадения в описании
+NAME_WEIGHT = 2
+# Удаленные документы остаются пустыми местами до сжатия нумерации, которое
+# выполняется, когда их больше, чем живых (и больше этого порога)
+COMPACT_MIN_REMOVED = 64
+
+_TOKEN_RE = re.compile(r"\w+")
+
+
+def tokenize(text: str) -> List[str]:
+    """Разбивает текст на слова с учетом Unicode, приводит к одному регистру и заменяет "ё" на "е" """
+    return _TOKEN_RE.findall(text.casefold().replace("ё", "е"))
+
+
+class SearchIndex:
+    """
+    Инвертированный индекс по названиям и описаниям товаров.
+
+    Для каждого слова хранится словарь {номер документа: вес}, где вес -
+    число вхождений с учетом NAME_WEIGHT. Результаты ранжируются по TF-IDF,
+    префиксные запросы используют отсортированный словарь слов и bisect.
+    Один индекс может обслуживать несколько категорий (Category.set_search_index).
+    """
+
+    def __init__(self, products: Iterable[Product] = ()) -> None:
+        self._postings: Dict[str, Dict[int, int]] = {}
+        self._documents: List[Optional[Product]] = []
+        self._terms: List[Optional[Counter]] = []
+        self._doc_ids: Dict[int, int] = {}
+        # Отсортированный словарь для префиксных запросов, перестраивается при появлении новых слов
+        self._vocabulary: Optional[List[str]] = None
+        for product in products:
+            self.add(product)
+
+    def __len__(self) -> int:
+        return len(self._doc_ids)
+
+    def __contains__(self, product: object) -> bool:
+        return id(product) in self._doc_ids
+
+    def add(self, product: Product) -> None:
+        """Индексирует товар (повторное добавление того же объекта игнорируется)"""
+        if id(product) in self._doc_ids:
+            return
+        doc = len(self._documents)
+        terms = Counter(tokenize(product.description))
+        for token in tokenize(product.name):
+            terms[token] += NAME_WEIGHT
+        self._documents.append(product)
+        self._terms.append(terms)
+        self._doc_ids[id(product)] = doc
+        for token, weight in terms.items():
+            postings = self._postings.get(token)
+            if postings is None:
+                postings = self._postings[token] = {}
+                self._vocabulary = None
+            postings[doc] = weight
+
+    def remove(self, product: Product) -> None:
+        """Удаляет товар из индекса"""
+        doc = self._doc_ids.pop(id(product), None)
+        if doc is None:
+            return
+        for token in self._terms[doc] or ():
+            postings = self._postings[token]
+            del postings[doc]
+            if not postings:
+                del self._postings[token]
+                self._vocabulary = None
+        self._documents[doc] = None
+        self._terms[doc] = None
+        removed = len(self._documents) - len(self._doc_ids)
+        if removed > COMPACT_MIN_REMOVED and removed > len(self._doc_ids):
+            self._compact()
+
+    def _compact(self) -> None:
+        """Перенумеровывает документы подряд, убирая места удаленных; порядок документов сохраняется"""
+        numbers: Dict[int, int] = {}
+        documents: List[Optional[Product]] = []
+        terms: List[Optional[Counter]] = []
+        for doc, product in enumerate(self._documents):
+            if product is not None:
+                numbers[doc] = len(documents)
+                documents.append(product)
+                terms.append(self._terms[doc])
+        self._postings = {
+            term: {numbers[doc]: weight for doc, weight in postings.items()}
+            for term, postings in self._postings.items()
+        }
+        self._documents = documents
+        self._terms = terms
+        self._doc_ids = {id(product): doc for doc, product in enumerate(documents)}
+
+    def update(self, product: Product) -> None:
+        """Переиндексирует товар после изменения названия или описания"""
+        self.remove(product)
+        self.add(product)
+
+    def search(self, query: str, limit: Optional[int] = 10, prefix: bool = True) -> List[Product]:
+        """
+        Ищет товары, содержащие все слова запроса
+        :param query: Текст запроса
+        :param limit: Максимальное число результатов (None - все)
+        :param prefix: Последнее слово запроса может быть началом слова (поиск по мере ввода)
+        :return: Товары по убыванию релевантности
+        """
+        return [product for product, _ in self.search_scored(query, limit, prefix)]
+
+    def search_scored(self, query: str, limit: Optional[int] = 10, prefix: bool = True) -> List[Tuple[Product, float]]:
+        """То же, что search, но с оценкой релевантности"""
+        tokens = tokenize(query)
+        if not tokens or (limit is not None and limit <= 0):
+            return []
+        total = len(self._doc_ids)
+        scores: Optional[Dict[int, float]] = None
+        for position, token in enumerate(tokens):
+            expanded = self._expand(token) if prefix and position == len(tokens) - 1 else [token]
+            token_scores: Dict[int, float] = {}
+            for term in expanded:
+                postings = self._postings.get(term, {})
+                idf = math.log(1 + total / len(postings)) if postings else 0.0
+                for doc, weight in postings.items():
+                    score = (1 + math.log(weight)) * idf
+                    if score > token_scores.get(doc, 0.0):
+                        token_scores[doc] = score
+            if scores is None:
+                scores = token_scores
+            else:
+                scores = {doc: score + token_scores[doc] for doc, score in scores.items() if doc in token_scores}
+            if not scores:
+                return []
+
+        assert scores is not None
+        ranked = heapq.nlargest(
+            len(scores) if limit is None else limit, scores.items(), key=lambda item: (item[1], -item[0])
+        )
+        return [(self._document(doc), score) for doc, score in ranked]
+
+    def autocomplete(self, prefix: str, limit: int = 10) -> List[str]:
+        """Слова словаря, начинающиеся с prefix, по убыванию числа товаров с ними"""
+        tokens = tokenize(prefix)
+        if not tokens:
+            return []
+        terms = self._expand(tokens[-1])
+        return heapq.nlargest(limit, terms, key=lambda term: len(self._postings[term]))
+
+    def _expand(self, prefix: str) -> List[str]:
+        """Все слова словаря с заданным началом, O(log V + k)"""
+        if self._vocabulary is None:
+            self._vocabulary = sorted(self._postings)
+        vocabulary = self._vocabulary
+        start = bisect_left(vocabulary, prefix)
+        end = start
+        while end < len(vocabulary) and vocabulary[end].startswith(prefix):
+            end += 1
+        return vocabulary[start:end]
+
+    def _document(self, doc: int) -> Product:
+        product = self._documents[doc]
+        assert product is not None
+        return product
+
+    def save(self, file_path: str | Path, categories: Iterable["Category"]) -> None:
+        """
+        Сохраняет индекс рядом с каталогом.
+
+        Документы нумеруются по порядку товаров в categories, поэтому загрузить
+        индекс можно для тех же категорий в том же порядке (например, после
+        JsonLoader.load_categories сохраненного каталога).
+        :param file_path: Путь к файлу индекса
+        :param categories: Категории каталога в порядке сохранения
+        """
+        products = _catalog_products(categories)
+        numbers: Dict[int, int] = {}
+        for number, product in enumerate(products):
+            doc = self._doc_ids.get(id(product))
+            if doc is not None:
+                numbers.setdefault(doc, number)
+        postings = {
+            term: sorted([numbers[doc], weight] for doc, weight in docs.items() if doc in numbers)
+            for term, docs in self._postings.items()
+        }
+        data = {
+            "version": FORMAT_VERSION,
+            "documents": len(products),
+            "fingerprint": _fingerprint(products),
+            "postings": {term: docs for term, docs in postings.items() if docs},
+        }
+
+        with atomic_write(file_path, "w", encoding="utf-8") as file:
+            json.dump(data, file, ensure_ascii=False, separators=(",", ":"))
+
+    @classmethod
+    def load(cls, file_path: str | Path, categories: Iterable["Category"]) -> "SearchIndex":
+        """
+        Загружает сохраненный индекс без повторной токенизации товаров
+        :param file_path: Путь к файлу индекса
+        :param categories: Категории каталога в том же порядке, что и при сохранении
+        :return: Индекс
+        :raises ValueError: Если индекс не соответствует каталогу или имеет другую версию
+        """
+        with open(file_path, "r", encoding="utf-8") as file:
+            data = json.load(file)
+        if data.get("version") != FORMAT_VERSION:
+            raise ValueError(f"Неподдерживаемая версия индекса в файле {file_path}")
+        products = _catalog_products(categories)
+        if data["documents"] != len(products) or data["fingerprint"] != _fingerprint(products):
+            raise ValueError(f"Индекс {file_path} не соответствует каталогу")
+
+        index = cls()
+        index._documents = list(products)
+        index._terms = [Counter() for _ in products]
+        for term, docs in data["postings"].items():
+            postings = index._postings[term] = {}
+            for doc, weight in docs:
+                postings[doc] = weight
+                index._terms[doc][term] = weight
+        index._doc_ids = {id(product): doc for doc, product in enumerate(products) if index._terms[doc]}
+        for doc, terms in enumerate(index._terms):
+            if not terms:
+                index._documents[doc] = None
+                index._terms[doc] = None
+        return index
+
+
+def _catalog_products(categories: Iterable["Category"]) -> List[Product]:
+    return [product for category in categories for product in category.products]
+
+
+def _fingerprint(products: List[Product]) -> str:
+    """
+    Хэш названий и описаний товаров - всего индексируемого текста: индекс,
+    сохраненный до изменения описания, не подходит к каталогу
+    """
+    digest = hashlib.sha256()
+    for product in products:
+        digest.update(product.name.encode("utf-8"))
+        digest.update(b"\0")
+        digest.update(product.description.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
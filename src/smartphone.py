@@ -1,10 +1,24 @@
-from src.product import Product
-from typing import Dict, Any
+import sys
+from operator import attrgetter
+from typing import Any, Callable, Dict, Tuple
+
+from src.product import Product, RowField, interned_str
 
 
 class Smartphone(Product):
     """Класс для смартфонов, наследующий от Product"""
 
+    __slots__ = ("performance", "model", "memory", "color")
+
+    _row_fields: Tuple[RowField, ...] = Product._row_fields + (
+        ("performance", "performance", float, 0),
+        ("model", "model", interned_str, ""),
+        ("memory", "memory", int, 0),
+        ("color", "color", interned_str, ""),
+    )
+
+    _render_key: Callable[[Any], Any] = attrgetter("name", "model", "color", "performance", "memory")
+
     def __init__(
         self,
         name: str,
@@ -33,9 +47,10 @@ class Smartphone(Product):
         """
         super().__init__(name=name, description=description, price=price, quantity=quantity, **kwargs)
         self.performance = performance
-        self.model = model
+        # Модель и цвет повторяются у тысяч товаров - храним одну копию строки
+        self.model = sys.intern(model)
         self.memory = memory
-        self.color = color
+        self.color = sys.intern(color)
 
     @property
     def additional_info(self) -> str:
@@ -45,10 +60,9 @@ class Smartphone(Product):
             f"Производительность: {self.performance} GHz, Память: {self.memory}GB"
         )
 
-    def __str__(self) -> str:
+    def _render(self) -> str:
         """Строковое представление смартфона"""
-        base_info = super().__str__()
-        return f"{base_info}\n{self.additional_info}"
+        return f"{super()._render()}\n{self.additional_info}"
 
     @classmethod
     def create_product(cls, data: Dict[str, Any]) -> "Smartphone":
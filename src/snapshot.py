@@ -0,0 +1,317 @@
+"""Бинарный снимок каталога для быстрой повторной загрузки.
+
+Формат (little-endian):
+    заголовок   MAGIC, версия, число строк, категорий и продуктов, смещения секций
+    строки      (число строк + 1) байтовых смещений uint64, столько же смещений в символах
+                и блок UTF-8 данных
+    категории   на каждую: индекс названия, индекс описания (uint32), первый продукт, число продуктов (uint64)
+    колонки     цены float64, количества int64, индексы названий, описаний и доп. полей uint32
+
+Дополнительные поля продукта (все, кроме названия, описания, цены и количества)
+хранятся одной JSON-строкой в таблице строк.
+"""
+
+import json
+import mmap
+import struct
+from array import array
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from src.atomic_file import atomic_write
+from src.category import Category
+from src.exceptions import SnapshotError
+from src.product import Product
+from src.product_registry import product_to_dict, products_from_dicts
+
+MAGIC = b"PCSN"
+VERSION = 1
+
+_HEADER = struct.Struct("<4sHHIIQQQQ")
+_CATEGORY = struct.Struct("<IIQQ")
+_OFFSET = struct.Struct("<Q")
+_BASE_FIELDS = ("name", "description", "price", "quantity")
+
+
+def _align(offset: int) -> int:
+    """Выравнивает смещение по 8 байт (для колонок float64/int64)"""
+    return (offset + 7) & ~7
+
+
+class _StringTable:
+    """Таблица уникальных строк; индекс 0 - пустая строка"""
+
+    def __init__(self) -> None:
+        self._indexes: Dict[str, int] = {"": 0}
+        self.strings: List[str] = [""]
+
+    def add(self, value: str) -> int:
+        index = self._indexes.get(value)
+        if index is None:
+            index = self._indexes[value] = len(self.strings)
+            self.strings.append(value)
+        return index
+
+    def encode(self) -> bytes:
+        blobs = [value.encode("utf-8") for value in self.strings]
+        offsets = array("Q", [0])
+        char_offsets = array("Q", [0])
+        for value, blob in zip(self.strings, blobs):
+            offsets.append(offsets[-1] + len(blob))
+            char_offsets.append(char_offsets[-1] + len(value))
+        return offsets.tobytes() + char_offsets.tobytes() + b"".join(blobs)
+
+
+def save_snapshot(file_path: str | Path, categories: List[Category]) -> None:
+    """
+    Сохраняет категории в бинарный снимок.
+
+    Снимок пишется во временный файл и атомарно заменяет прежний: процессы,
+    отобразившие старый снимок через mmap, продолжают читать его без ошибок.
+    :param file_path: Путь к файлу снимка
+    :param categories: Список категорий
+    """
+    strings = _StringTable()
+    category_rows = []
+    prices = array("d")
+    quantities = array("q")
+    names = array("I")
+    descriptions = array("I")
+    extras = array("I")
+
+    for category in categories:
+        category_rows.append(
+            (strings.add(category.name), strings.add(category.description), len(prices), len(category.products))
+        )
+        for product in category.products:
+            record = product_to_dict(product)
+            prices.append(record["price"])
+            quantities.append(record["quantity"])
+            names.append(strings.add(record["name"]))
+            descriptions.append(strings.add(record["description"]))
+            extra = {key: value for key, value in record.items() if key not in _BASE_FIELDS}
+            extras.append(strings.add(json.dumps(extra, ensure_ascii=False)) if extra else 0)
+
+    string_blob = strings.encode()
+    strings_offset = _HEADER.size
+    categories_offset = _align(strings_offset + len(string_blob))
+    columns_offset = _align(categories_offset + _CATEGORY.size * len(category_rows))
+
+    with atomic_write(file_path, "wb") as file:
+        file.write(
+            _HEADER.pack(
+                MAGIC,
+                VERSION,
+                0,
+                len(strings.strings),
+                len(category_rows),
+                len(prices),
+                strings_offset,
+                categories_offset,
+                columns_offset,
+            )
+        )
+        file.write(string_blob)
+        file.write(b"\0" * (categories_offset - strings_offset - len(string_blob)))
+        for row in category_rows:
+            file.write(_CATEGORY.pack(*row))
+        file.write(b"\0" * (columns_offset - categories_offset - _CATEGORY.size * len(category_rows)))
+        for column in (prices, quantities, names, descriptions, extras):
+            file.write(column.tobytes())
+
+
+class CatalogSnapshot:
+    """
+    Снимок каталога, открытый через mmap.
+
+    Метаданные категорий, строки и колонки цен/количеств читаются лениво,
+    объекты Product создаются только при вызове load_category/load_categories.
+    """
+
+    def __init__(self, file_path: str | Path) -> None:
+        self.file_path = str(file_path)
+        with open(file_path, "rb") as file:
+            self._mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            self._read_header()
+        except Exception:
+            self._mmap.close()
+            raise
+
+    def _read_header(self) -> None:
+        if len(self._mmap) < _HEADER.size:
+            raise SnapshotError(f"Файл {self.file_path} не является снимком каталога")
+        header = _HEADER.unpack_from(self._mmap, 0)
+        magic, version, _, string_count, category_count, product_count = header[:6]
+        strings_offset, categories_offset, columns_offset = header[6:]
+        if magic != MAGIC:
+            raise SnapshotError(f"Файл {self.file_path} не является снимком каталога")
+        if version != VERSION:
+            raise SnapshotError(f"Неподдерживаемая версия снимка {version} в файле {self.file_path}")
+
+        self.category_count: int = category_count
+        self.product_count: int = product_count
+        self._string_count: int = string_count
+        self._categories_offset = categories_offset
+
+        # Секции должны идти по порядку и целиком помещаться в файл, иначе
+        # срезы memoryview молча окажутся короче, а чтение выйдет за их пределы
+        char_offsets_start = strings_offset + 8 * (string_count + 1)
+        string_data = char_offsets_start + 8 * (string_count + 1)
+        categories_end = categories_offset + _CATEGORY.size * category_count
+        extras_end = columns_offset + 28 * product_count
+        if not (
+            _HEADER.size <= strings_offset
+            and string_data <= categories_offset
+            and categories_end <= columns_offset
+            and extras_end <= len(self._mmap)
+        ):
+            raise SnapshotError(f"Снимок {self.file_path} поврежден: секции выходят за пределы файла")
+        (strings_end,) = _OFFSET.unpack_from(self._mmap, char_offsets_start - _OFFSET.size)
+        if string_data + strings_end > categories_offset:
+            raise SnapshotError(f"Снимок {self.file_path} поврежден: таблица строк выходит за пределы секции")
+
+        view = memoryview(self._mmap)
+        self._string_data = string_data
+        self._string_offsets = view[strings_offset:char_offsets_start].cast("Q")
+        self._char_offsets = view[char_offsets_start:string_data].cast("Q")
+        # Все строки, декодированные одним вызовом (заполняется при первой пакетной загрузке)
+        self._all_strings: Optional[List[str]] = None
+
+        # Колонки: float64, int64 и три колонки uint32
+        prices_end = columns_offset + 8 * product_count
+        quantities_end = prices_end + 8 * product_count
+        names_end = quantities_end + 4 * product_count
+        descriptions_end = names_end + 4 * product_count
+        self._prices = view[columns_offset:prices_end].cast("d")
+        self._quantities = view[prices_end:quantities_end].cast("q")
+        self._names = view[quantities_end:names_end].cast("I")
+        self._descriptions = view[names_end:descriptions_end].cast("I")
+        self._extras = view[descriptions_end:extras_end].cast("I")
+        self._views: List["memoryview[Any]"] = [
+            self._string_offsets,
+            self._char_offsets,
+            self._prices,
+            self._quantities,
+            self._names,
+            self._descriptions,
+            self._extras,
+            view,
+        ]
+
+    def close(self) -> None:
+        """
+        Освобождает отображение файла.
+
+        Срезы, полученные из prices()/quantities(), нужно освободить (release или
+        выход из with memoryview) до вызова close: пока они живы, mmap нельзя
+        закрыть, и close выбрасывает BufferError.
+        """
+        for view in self._views:
+            view.release()
+        self._mmap.close()
+
+    def __enter__(self) -> "CatalogSnapshot":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def string(self, index: int) -> str:
+        """Строка из таблицы строк по индексу"""
+        if not 0 <= index < self._string_count:
+            raise SnapshotError(f"Снимок {self.file_path} поврежден: нет строки с номером {index}")
+        start = self._string_data + self._string_offsets[index]
+        end = self._string_data + self._string_offsets[index + 1]
+        return self._mmap[start:end].decode("utf-8")
+
+    def _strings(self, indexes: "memoryview[int]") -> List[str]:
+        """Строки по колонке индексов; таблица строк декодируется целиком один раз"""
+        try:
+            if self._all_strings is None:
+                data_start = self._string_data
+                data_end = data_start + self._string_offsets[-1]
+                text = self._mmap[data_start:data_end].decode("utf-8")
+                offsets = self._char_offsets.tolist()
+                self._all_strings = [text[start:end] for start, end in zip(offsets, offsets[1:])]
+            if indexes and max(indexes) >= self._string_count:
+                raise SnapshotError(f"Снимок {self.file_path} поврежден: индекс строки вне таблицы")
+            return list(map(self._all_strings.__getitem__, indexes))
+        finally:
+            indexes.release()
+
+    def category_info(self, index: int) -> Tuple[str, str, int]:
+        """Название, описание и число продуктов категории без создания объектов"""
+        name, description, _, count = self._category_row(index)
+        return self.string(name), self.string(description), count
+
+    def prices(self, index: int) -> "memoryview[float]":
+        """Колонка цен категории (float64) без копирования; срез нужно освободить до close()"""
+        _, _, first, count = self._category_row(index)
+        end = first + count
+        return self._prices[first:end]
+
+    def quantities(self, index: int) -> "memoryview[int]":
+        """Колонка количеств категории (int64) без копирования; срез нужно освободить до close()"""
+        _, _, first, count = self._category_row(index)
+        end = first + count
+        return self._quantities[first:end]
+
+    def load_category(self, index: int) -> Category:
+        """Создает категорию со всеми продуктами"""
+        name, description, first, count = self._category_row(index)
+        end = first + count
+        extras = self._extras[first:end]
+        try:
+            if any(extras):
+                rows = [self._product_row(row) for row in range(first, end)]
+                products = products_from_dicts(rows)
+            else:
+                # Продукты без дополнительных полей создаются прямо из колонок
+                columns = [self._strings(self._names[first:end]), self._strings(self._descriptions[first:end])]
+                products = Product.from_columns(self._prices[first:end], columns + [self._quantities[first:end]])
+        finally:
+            extras.release()
+        return Category(self.string(name), self.string(description), products)
+
+    def load_categories(self) -> List[Category]:
+        """Создает все категории снимка"""
+        return [self.load_category(index) for index in range(self.category_count)]
+
+    def iter_categories(self) -> Iterator[Category]:
+        """Создает категории по одной"""
+        for index in range(self.category_count):
+            yield self.load_category(index)
+
+    def _category_row(self, index: int) -> Tuple[int, int, int, int]:
+        if not 0 <= index < self.category_count:
+            raise IndexError(f"Нет категории с номером {index}")
+        row: Tuple[int, int, int, int] = _CATEGORY.unpack_from(
+            self._mmap, self._categories_offset + _CATEGORY.size * index
+        )
+        if row[2] + row[3] > self.product_count:
+            raise SnapshotError(f"Снимок {self.file_path} поврежден: продукты категории {index} вне колонок")
+        return row
+
+    def _product_row(self, row: int) -> Dict[str, Any]:
+        record: Dict[str, Any] = {
+            "name": self.string(self._names[row]),
+            "description": self.string(self._descriptions[row]),
+            "price": self._prices[row],
+            "quantity": self._quantities[row],
+        }
+        extras = self._extras[row]
+        if extras:
+            record.update(json.loads(self.string(extras)))
+        return record
+
+
+def load_snapshot(file_path: str | Path) -> List[Category]:
+    """
+    Загружает все категории из бинарного снимка
+    :param file_path: Путь к файлу снимка
+    :return: Список категорий
+    :raises SnapshotError: Если файл не является снимком поддерживаемой версии или поврежден
+    """
+    with CatalogSnapshot(file_path) as snapshot:
+        return snapshot.load_categories()
@@ -0,0 +1,307 @@
+"""Версионированные неизменяемые снимки каталога для чтения без блокировок.
+
+Читатели берут текущую версию (одно чтение ссылки) и работают с ней сколько
+угодно: версия никогда не меняется. Писатель собирает следующую версию из
+черновика, копируя только измененные категории - остальные объекты
+CategoryVersion переиспользуются, - и публикует ее одним присваиванием.
+Старая версия освобождается сборщиком мусора, когда ее не держит ни один читатель.
+
+Версии разделяют данные с точностью до категории: измененная категория
+копируется целиком, поэтому публикация стоит O(размер измененных категорий),
+а не O(число изменений). Очень большие часто меняемые категории выгоднее
+делить на несколько.
+
+С обычным каталогом версии связывают VersionedCatalog.from_catalog и
+CatalogVersion.to_catalog; изменения изменяемых категорий публикует publish.
+"""
+
+import itertools
+import threading
+import weakref
+from contextlib import contextmanager
+from types import MappingProxyType
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, NamedTuple, Tuple
+
+from src.catalog import Catalog
+from src.category import Category
+from src.product import Product
+from src.product_registry import DEFAULT_TYPE, TYPE_KEY, product_from_dict, product_to_dict
+
+_BASE_FIELDS = ("name", "description", "price", "quantity")
+
+
+class ProductRecord(NamedTuple):
+    """Неизменяемая запись товара"""
+
+    name: str
+    description: str
+    price: float
+    quantity: int
+    type: str = DEFAULT_TYPE
+    # Характеристики подкласса: пары (ключ, значение) в порядке сериализации
+    attributes: Tuple[Tuple[str, Any], ...] = ()
+
+    @classmethod
+    def from_product(cls, product: Product) -> "ProductRecord":
+        data = product_to_dict(product)
+        tag = data.pop(TYPE_KEY, DEFAULT_TYPE)
+        attributes = tuple((key, value) for key, value in data.items() if key not in _BASE_FIELDS)
+        return cls(data["name"], data["description"], data["price"], data["quantity"], tag, attributes)
+
+    def to_dict(self) -> Dict[str, Any]:
+        data: Dict[str, Any] = {
+            "name": self.name,
+            "description": self.description,
+            "price": self.price,
+            "quantity": self.quantity,
+        }
+        data.update(self.attributes)
+        if self.type != DEFAULT_TYPE:
+            data[TYPE_KEY] = self.type
+        return data
+
+    def to_product(self) -> Product:
+        """Создает изменяемый объект товара"""
+        return product_from_dict(self.to_dict())
+
+
+class CategoryVersion:
+    """Неизменяемая версия категории с предрассчитанными агрегатами"""
+
+    __slots__ = ("name", "description", "products", "total_value", "average_price", "_by_name")
+
+    name: str
+    description: str
+    products: Tuple[ProductRecord, ...]
+    total_value: float
+    average_price: float
+    _by_name: Mapping[str, Tuple[ProductRecord, ...]]
+
+    def __init__(self, name: str, description: str, products: Iterable[ProductRecord]) -> None:
+        set_attr = object.__setattr__
+        records = tuple(products)
+        positive = [(record.price * record.quantity, record.quantity) for record in records if record.quantity > 0]
+        positive_quantity = sum(quantity for _, quantity in positive)
+        by_name: Dict[str, List[ProductRecord]] = {}
+        for record in records:
+            by_name.setdefault(record.name, []).append(record)
+        set_attr(self, "name", name)
+        set_attr(self, "description", description)
+        set_attr(self, "products", records)
+        set_attr(self, "total_value", sum(record.price * record.quantity for record in records))
+        set_attr(self, "average_price", sum(value for value, _ in positive) / positive_quantity if positive else 0.0)
+        set_attr(self, "_by_name", MappingProxyType({key: tuple(value) for key, value in by_name.items()}))
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError(f"{type(self).__name__} не изменяется")
+
+    @classmethod
+    def from_category(cls, category: Category) -> "CategoryVersion":
+        return cls(category.name, category.description, map(ProductRecord.from_product, category.products))
+
+    @property
+    def product_count(self) -> int:
+        return len(self.products)
+
+    def find_by_name(self, name: str) -> Tuple[ProductRecord, ...]:
+        """Записи товаров с точным названием, O(1)"""
+        return self._by_name.get(name, ())
+
+    def to_category(self) -> Category:
+        """Создает изменяемую категорию из версии"""
+        return Category(self.name, self.description, [record.to_product() for record in self.products])
+
+
+class CatalogVersion:
+    """Неизменяемая версия каталога"""
+
+    __slots__ = ("number", "categories", "total_value", "__weakref__")
+
+    number: int
+    categories: Mapping[str, CategoryVersion]
+    total_value: float
+
+    def __init__(self, number: int, categories: Dict[str, CategoryVersion]) -> None:
+        set_attr = object.__setattr__
+        set_attr(self, "number", number)
+        set_attr(self, "categories", MappingProxyType(categories))
+        set_attr(self, "total_value", sum(category.total_value for category in categories.values()))
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError(f"{type(self).__name__} не изменяется")
+
+    @property
+    def product_count(self) -> int:
+        return sum(category.product_count for category in self.categories.values())
+
+    def category(self, name: str) -> CategoryVersion:
+        try:
+            return self.categories[name]
+        except KeyError:
+            raise ValueError(f"Категория '{name}' не найдена в каталоге") from None
+
+    def find_by_name(self, name: str) -> List[ProductRecord]:
+        """Записи товаров с точным названием во всех категориях"""
+        return [record for category in self.categories.values() for record in category.find_by_name(name)]
+
+    def to_catalog(self, name: str, description: str = "") -> Catalog:
+        """Создает изменяемый каталог со сводками из версии"""
+        return Catalog(name, description, [category.to_category() for category in self.categories.values()])
+
+
+class _CategoryEdit:
+    """
+    Изменяемая копия товаров категории в черновике: записи по ключам в порядке
+    добавления и ключи по названию - замена и удаление по названию за O(1)
+    """
+
+    __slots__ = ("records", "_by_name", "_keys")
+
+    def __init__(self, products: Iterable[ProductRecord]) -> None:
+        self._keys = itertools.count()
+        self.records: Dict[int, ProductRecord] = {}
+        self._by_name: Dict[str, List[int]] = {}
+        for record in products:
+            self.append(record)
+
+    def append(self, record: ProductRecord) -> None:
+        key = next(self._keys)
+        self.records[key] = record
+        self._by_name.setdefault(record.name, []).append(key)
+
+    def put(self, record: ProductRecord) -> None:
+        """Заменяет первую запись с тем же названием или добавляет новую"""
+        keys = self._by_name.get(record.name)
+        if keys:
+            self.records[keys[0]] = record
+        else:
+            self.append(record)
+
+    def remove(self, name: str) -> bool:
+        """Удаляет первую запись с названием; False, если такой нет"""
+        keys = self._by_name.get(name)
+        if not keys:
+            return False
+        del self.records[keys.pop(0)]
+        if not keys:
+            del self._by_name[name]
+        return True
+
+
+class CatalogDraft:
+    """Черновик следующей версии: изменения копируют только затронутые категории"""
+
+    def __init__(self, base: CatalogVersion) -> None:
+        self._categories: Dict[str, CategoryVersion] = dict(base.categories)
+        # Изменяемые копии товаров измененных категорий
+        self._products: Dict[str, _CategoryEdit] = {}
+
+    def put_category(self, category: CategoryVersion | Category) -> None:
+        """Добавляет или заменяет категорию (изменяемая категория копируется в версию)"""
+        if isinstance(category, Category):
+            category = CategoryVersion.from_category(category)
+        self._categories[category.name] = category
+        self._products.pop(category.name, None)
+
+    def remove_category(self, name: str) -> None:
+        if name not in self._categories:
+            raise ValueError(f"Категория '{name}' не найдена в каталоге")
+        del self._categories[name]
+        self._products.pop(name, None)
+
+    def put_product(self, category_name: str, record: ProductRecord | Product) -> None:
+        """Заменяет товар с тем же названием или добавляет новый"""
+        if isinstance(record, Product):
+            record = ProductRecord.from_product(record)
+        self._editable(category_name).put(record)
+
+    def remove_product(self, category_name: str, product_name: str) -> None:
+        if not self._editable(category_name).remove(product_name):
+            raise ValueError(f"Товар '{product_name}' не найден в категории '{category_name}'")
+
+    def _editable(self, category_name: str) -> _CategoryEdit:
+        products = self._products.get(category_name)
+        if products is None:
+            if category_name not in self._categories:
+                raise ValueError(f"Категория '{category_name}' не найдена в каталоге")
+            products = self._products[category_name] = _CategoryEdit(self._categories[category_name].products)
+        return products
+
+    def build(self, number: int) -> CatalogVersion:
+        categories = dict(self._categories)
+        for name, products in self._products.items():
+            base = categories[name]
+            categories[name] = CategoryVersion(base.name, base.description, products.records.values())
+        return CatalogVersion(number, categories)
+
+
+class VersionedCatalog:
+    """
+    Каталог с копированием при записи.
+
+    current - текущая версия; читатели берут ее без блокировок. Писатели
+    сериализуются одной блокировкой, собирают следующую версию в черновике
+    (edit) и публикуют ее атомарным присваиванием ссылки.
+    """
+
+    def __init__(self, categories: Iterable[CategoryVersion | Category] = ()) -> None:
+        self._numbers = itertools.count()
+        self._write_lock = threading.Lock()
+        # Версии, которые еще удерживает хотя бы один читатель (для наблюдения)
+        self._live: "weakref.WeakSet[CatalogVersion]" = weakref.WeakSet()
+        draft = CatalogDraft(CatalogVersion(-1, {}))
+        for category in categories:
+            draft.put_category(category)
+        self._current = self._track(draft.build(next(self._numbers)))
+
+    @classmethod
+    def from_catalog(cls, catalog: Catalog) -> "VersionedCatalog":
+        """Первая версия из категорий обычного каталога; дальнейшие изменения категорий публикует publish"""
+        return cls(catalog.categories)
+
+    @property
+    def current(self) -> CatalogVersion:
+        """Текущая версия каталога (чтение без блокировок)"""
+        return self._current
+
+    @contextmanager
+    def edit(self) -> Iterator[CatalogDraft]:
+        """
+        Изменение каталога: версия публикуется при выходе из блока без ошибок
+
+            with catalog.edit() as draft:
+                draft.put_product("Смартфоны", product)
+        """
+        with self._write_lock:
+            draft = CatalogDraft(self._current)
+            yield draft
+            self._commit(draft)
+
+    def publish(self, categories: Iterable[Category], removed: Iterable[str] = ()) -> CatalogVersion:
+        """
+        Публикует новую версию с обновленными изменяемыми категориями
+        :param categories: Категории, измененные с прошлой публикации (например, после add_product)
+        :param removed: Названия удаленных категорий
+        :return: Опубликованная версия
+        """
+        with self._write_lock:
+            draft = CatalogDraft(self._current)
+            for name in removed:
+                draft.remove_category(name)
+            for category in categories:
+                draft.put_category(category)
+            # Версия возвращается из-под блокировки: после выхода current мог опубликовать другой писатель
+            return self._commit(draft)
+
+    def _commit(self, draft: CatalogDraft) -> CatalogVersion:
+        """Собирает и публикует версию из черновика; вызывается под _write_lock"""
+        version = self._current = self._track(draft.build(next(self._numbers)))
+        return version
+
+    def live_versions(self) -> int:
+        """Число версий, которые еще не освобождены (текущая и удерживаемые читателями)"""
+        return len(self._live)
+
+    def _track(self, version: CatalogVersion) -> CatalogVersion:
+        self._live.add(version)
+        return version
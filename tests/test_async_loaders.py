@@ -0,0 +1,72 @@
+import asyncio
+import json
+import os
+import time
+from tempfile import TemporaryDirectory
+from typing import List, Tuple
+from unittest import IsolatedAsyncioTestCase, mock
+
+from src.async_loaders import load_categories_async, load_many_async, save_categories_async
+from src.category import Category
+from src.exceptions import CatalogLoadError
+from src.product import Product
+
+
+class TestAsyncLoaders(IsolatedAsyncioTestCase):
+    def setUp(self) -> None:
+        self.directory = TemporaryDirectory()
+        self.paths = []
+        for index in range(3):
+            path = os.path.join(self.directory.name, f"feed{index}.json")
+            data = [{"name": f"Cat{index}", "description": "D", "products": []}]
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(data, f)
+            self.paths.append(path)
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    async def test_save_and_load_with_timing_hook(self) -> None:
+        """Сохранение и загрузка вне event loop с замером времени"""
+        timings: List[Tuple[str, str, float, float]] = []
+        path = os.path.join(self.directory.name, "out.json")
+        category = Category("Тест", "Категория", [Product("Товар", "Описание", 100.0, 2)])
+
+        await save_categories_async(path, [category], timing_hook=lambda *args: timings.append(args))
+        loaded = await load_categories_async(path, timing_hook=lambda *args: timings.append(args))
+
+        self.assertEqual(loaded[0].products[0].name, "Товар")
+        self.assertEqual([(t[0], t[1]) for t in timings], [("save", path), ("load", path)])
+        self.assertTrue(all(t[2] >= 0 and t[3] >= 0 for t in timings))
+
+    async def test_timing_hook_reports_loop_lag(self) -> None:
+        """Хук получает задержку event loop, а не время постановки задачи в исполнитель"""
+        timings: List[Tuple[str, str, float, float]] = []
+
+        def slow_load(file_path: str) -> List[Category]:
+            time.sleep(0.15)
+            return []
+
+        async def stall_loop() -> None:
+            await asyncio.sleep(0.02)
+            time.sleep(0.08)
+
+        with mock.patch("src.async_loaders.JsonLoader.load_categories", slow_load):
+            await asyncio.gather(
+                load_categories_async(self.paths[0], timing_hook=lambda *args: timings.append(args)), stall_loop()
+            )
+        ((_, _, lag, executor_time),) = timings
+        self.assertGreaterEqual(lag, 0.05)
+        self.assertGreaterEqual(executor_time, 0.15)
+
+    async def test_load_many_with_limit(self) -> None:
+        """Загрузка нескольких файлов с ограничением параллелизма"""
+        categories = await load_many_async(self.paths, limit=2)
+        self.assertEqual([c.name for c in categories], ["Cat0", "Cat1", "Cat2"])
+
+    async def test_load_many_collects_errors(self) -> None:
+        """Ошибки отдельных файлов собираются в один отчет"""
+        with self.assertRaises(CatalogLoadError) as context:
+            await load_many_async(self.paths + ["missing.json"])
+        self.assertEqual(list(context.exception.errors), ["missing.json"])
+        self.assertEqual(len(context.exception.categories), 3)
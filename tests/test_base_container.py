@@ -0,0 +1,33 @@
+import unittest
+from typing import List
+
+from src.base_container import BaseContainer
+from src.product import Product
+
+
+class Shelf(BaseContainer[Product]):
+    def __init__(self, name: str, products: List[Product]) -> None:
+        super().__init__(name)
+        self._items.extend(products)
+
+    @property
+    def items(self) -> List[Product]:
+        return self._items
+
+
+class TestBaseContainer(unittest.TestCase):
+    def setUp(self) -> None:
+        self.product = Product("A", "D", 100.0, 2)
+        self.shelf = Shelf("Полка", [self.product, Product("B", "D", 50.0, 1)])
+
+    def test_str_reflects_items(self) -> None:
+        """Строка и общая стоимость отражают текущие элементы"""
+        self.assertEqual(str(self.shelf), "Полка, количество элементов: 2, общая стоимость: 250.00 руб.")
+        self.product.quantity = 1
+        self.assertEqual(self.shelf.total_value, 150.0)
+        self.shelf.items.remove(self.product)
+        self.assertEqual(str(self.shelf), "Полка, количество элементов: 1, общая стоимость: 50.00 руб.")
+
+
+if __name__ == "__main__":
+    unittest.main()
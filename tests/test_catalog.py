@@ -0,0 +1,106 @@
+import unittest
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from src.catalog import Catalog
+from src.category import Category
+from src.lazy_category import LazyCategory
+from src.product import Product
+from src.smartphone import Smartphone
+
+
+def _product_count(category: Category) -> int:
+    return category.product_count
+
+
+class TestCatalog(unittest.TestCase):
+    def setUp(self) -> None:
+        self.phone = Smartphone("Phone", "D", 1000.0, 2, 2.5, "X", 128, "Black")
+        self.cable = Product("Cable", "D", 100.0, 5)
+        self.phones = Category("Телефоны", "D", [self.phone, self.cable])
+        self.lazy = LazyCategory.from_dict(
+            {
+                "name": "Аксессуары",
+                "description": "D",
+                "products": [
+                    {"name": "Cable", "description": "D", "price": 50.0, "quantity": 1},
+                    {"name": "Mini", "description": "D", "price": 300.0, "quantity": 0, "type": "smartphone"},
+                ],
+            }
+        )
+        self.catalog = Catalog("Магазин", categories=[self.phones, self.lazy])
+
+    def test_rollups(self) -> None:
+        """Сводки по каталогу, категориям и типам"""
+        self.assertEqual(self.catalog.product_count, 4)
+        self.assertAlmostEqual(self.catalog.total_value, 2000.0 + 500.0 + 50.0)
+        self.assertAlmostEqual(self.catalog.rollup().average_price, 2550.0 / 8)
+        rollups = self.catalog.category_rollups()
+        self.assertEqual(rollups["Телефоны"].product_count, 2)
+        self.assertAlmostEqual(rollups["Аксессуары"].total_value, 50.0)
+        types = self.catalog.type_rollups()
+        self.assertEqual(types["smartphone"].product_count, 2)
+        self.assertAlmostEqual(types["smartphone"].average_price, 1000.0)
+        self.assertAlmostEqual(types["product"].total_value, 550.0)
+        self.assertFalse(self.lazy.materialized)
+        self.assertEqual(str(self.catalog), "Магазин, категорий: 2, товаров: 4, общая стоимость: 2550.00 руб.")
+
+    def test_rollups_follow_category_changes(self) -> None:
+        """Добавление, удаление и изменение товаров в категориях обновляют сводки"""
+        text = str(self.catalog)
+        self.phone.price = 500.0
+        self.phones.add_product(Product("Charger", "D", 10.0, 3))
+        self.phones.remove_product(self.cable)
+        self.lazy.apply_discount(0.5)
+        self.assertNotEqual(str(self.catalog), text)
+        self.assertAlmostEqual(self.catalog.total_value, 1000.0 + 30.0 + 25.0)
+        self.assertEqual(self.catalog.type_rollups()["product"].product_count, 2)
+
+        before = self.catalog.type_rollups()
+        self.catalog.rebuild_rollups(ThreadPoolExecutor(max_workers=2))
+        self.assertEqual(self.catalog.type_rollups(), before)
+
+        self.catalog.remove_category("Аксессуары")
+        self.lazy.add_product(Product("Free", "D", 1.0, 1))
+        self.assertAlmostEqual(self.catalog.total_value, 1030.0)
+
+    def test_rebuild_rollups_in_processes(self) -> None:
+        """Пересчет в процессах получает колонки категорий, а не сами категории с подписчиками"""
+        self.phone.quantity = 7
+        before = self.catalog.type_rollups()
+        with ProcessPoolExecutor(max_workers=1) as executor:
+            self.catalog.rebuild_rollups(executor)
+        self.assertEqual(self.catalog.type_rollups(), before)
+        self.assertFalse(self.lazy.materialized)
+
+    def test_unregistered_subclass_counted_under_ancestor(self) -> None:
+        """Товар незарегистрированного подкласса учитывается под тегом предка, сводки остаются согласованными"""
+
+        class Foldable(Smartphone):
+            pass
+
+        fold = Foldable("Fold", "D", 2000.0, 1, 3.0, "Z", 512, "Gray")
+        self.phones.add_product(fold)
+        fold.price = 1500.0
+        self.assertEqual(self.catalog.type_rollups()["smartphone"].product_count, 3)
+        self.assertAlmostEqual(self.catalog.total_value, 2550.0 + 1500.0)
+
+    def test_cross_category_lookups(self) -> None:
+        """Поиск товаров по всем категориям"""
+        self.assertEqual([p.price for p in self.catalog.find_by_name("Cable")], [100.0, 50.0])
+        self.assertEqual([p.name for p in self.catalog.products_of_type(Smartphone)], ["Phone", "Mini"])
+        self.assertEqual([p.price for p in self.catalog.products_in_price_range(60.0, 500.0)], [100.0, 300.0])
+        self.assertEqual([p.price for p in self.catalog.cheapest(2)], [50.0, 100.0])
+
+    def test_categories_and_parallel_aggregate(self) -> None:
+        """Категории уникальны по названию, агрегаты считаются параллельно"""
+        with self.assertRaisesRegex(ValueError, "уже есть"):
+            self.catalog.add_category(Category("Телефоны", "D"))
+        with self.assertRaisesRegex(ValueError, "не найдена"):
+            self.catalog.get_category("Нет")
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            counts = self.catalog.aggregate(_product_count, executor)
+        self.assertEqual(counts, {"Телефоны": 2, "Аксессуары": 2})
+
+
+if __name__ == "__main__":
+    unittest.main()
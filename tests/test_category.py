@@ -1,9 +1,14 @@
+import logging
+import queue
 import unittest
-from src.category import Category
+from unittest import mock
+
+from src.category import Category, _LazyQueueHandler
 from src.product import Product
 from src.smartphone import Smartphone
 from src.lawn_grass import LawnGrass
-from src.exceptions import ZeroQuantityError
+from src.exceptions import AggregateMismatchError, ZeroQuantityError
+from src.search import SearchIndex
 
 
 class TestCategoryAddProduct(unittest.TestCase):
@@ -50,11 +55,269 @@ class TestCategory(unittest.TestCase):
         with self.assertLogs("Category", level="INFO"):
             self.assertAlmostEqual(self.category.get_average_price(), 160.0)
 
+    def test_render_cached_and_invalidated(self) -> None:
+        """render() кэширует текст категории и пересобирает его после изменений"""
+        self.category.add_product(self.product)
+        self.category.add_product(self.grass)
+        text = self.category.render()
+        self.assertEqual(text.splitlines()[0], "Тест, количество продуктов: 2 шт.")
+        self.assertIs(self.category.render(), text)
+
+        self.product.price = 150.0
+        self.assertIn("Product, 150.0 руб.", self.category.render())
+        self.category.remove_product(self.grass)
+        self.assertEqual(
+            self.category.render(), "Тест, количество продуктов: 1 шт.\nProduct, 150.0 руб. Остаток: 1 шт."
+        )
+
+        self.product.name = "Renamed"
+        self.product.notify_changed()
+        self.assertIn("Renamed", self.category.render())
+        self.category.name = "Новое"
+        self.assertTrue(self.category.render().startswith("Новое, количество продуктов: 1 шт."))
+
     def test_average_price_empty_category(self) -> None:
         """Тест пустой категории"""
         with self.assertLogs("Category", level="INFO"):
             self.assertEqual(self.category.get_average_price(), 0.0)
 
 
+class TestColumnarCategory(unittest.TestCase):
+    def setUp(self) -> None:
+        self.phone = Smartphone("Phone", "Desc", 1000, 2, 2.5, "X", 128, "Black")
+        self.grass = LawnGrass("Grass", "Desc", 500, 4, "Russia", 14, "Green")
+        self.product = Product("Product", "Desc", 100, 0)
+        self.category = Category("Тест", "Категория", [self.phone, self.grass, self.product], columnar=True)
+
+    def test_aggregates_match_row_scan(self) -> None:
+        """Агрегаты колоночного хранилища совпадают с обычным подсчетом"""
+        plain = Category("Тест", "Категория", list(self.category.products))
+        self.assertTrue(self.category.columnar)
+        self.assertAlmostEqual(self.category.total_value, plain.total_value)
+        self.assertAlmostEqual(self.category.get_average_price(), plain.get_average_price())
+
+    def test_add_product_and_discount_keep_columns_in_sync(self) -> None:
+        """add_product и apply_discount обновляют колонки"""
+        self.category.add_product(Product("Новый", "Desc", 300, 1))
+        self.category.apply_discount(0.5)
+        self.assertAlmostEqual(self.category.total_value, 500 * 2 + 250 * 4 + 150)
+        self.assertAlmostEqual(self.category.get_average_price(), (1000 + 1000 + 150) / 7)
+
+    def test_non_integer_quantity(self) -> None:
+        """Не целое количество отклоняется понятной ошибкой до изменения категории"""
+        with self.assertRaisesRegex(ValueError, "Количество товара 'Дробное' должно быть целым числом: 1.5"):
+            self.category.add_product(Product("Дробное", "Desc", 10, 1.5))  # type: ignore[arg-type]
+        batch = [Product("Пачка", "Desc", 10, 1), Product("Целое", "Desc", 10, 2.0)]  # type: ignore[arg-type]
+        with self.assertRaisesRegex(ValueError, "целым числом: 2.0"):
+            self.category.add_products(batch)
+        self.assertEqual(self.category.product_count, 3)
+        self.assertEqual(len(self.category._columns or ()), 3)
+        self.category.check_aggregates()
+
+    def test_filter_products(self) -> None:
+        """Фильтрация по цене и типу"""
+        self.assertEqual(self.category.filter_products(min_price=400), [self.phone, self.grass])
+        self.assertEqual(self.category.filter_products(max_price=600, product_type=LawnGrass), [self.grass])
+        self.assertEqual(self.category.filter_products(product_type=Product), [self.product])
+
+    def test_filter_by_type_is_exact_in_both_paths(self) -> None:
+        """Колоночный и обычный фильтры по типу одинаково не включают подклассы"""
+
+        class Refurbished(Smartphone):
+            __slots__ = ()
+
+        refurbished = Refurbished("Old", "Desc", 300, 1, 2.0, "Y", 64, "White")
+        self.category.add_product(refurbished)
+        plain = Category("Тест", "Категория", list(self.category.products))
+        for product_type in (Smartphone, Refurbished, Product):
+            self.assertEqual(
+                self.category.filter_products(product_type=product_type),
+                plain.filter_products(product_type=product_type),
+            )
+        self.assertEqual(self.category.filter_products(product_type=Refurbished), [refurbished])
+
+    def test_remove_then_add_keeps_rows(self) -> None:
+        """Строки колонок привязаны к объектам товаров, а не к их id"""
+        self.category.remove_product(self.grass)
+        self.category.add_product(LawnGrass("Grass 2", "Desc", 50, 1, "Russia", 14, "Green"))
+        self.assertEqual([p.name for p in self.category.filter_products(max_price=60)], ["Grass 2"])
+
+
+class TestRunningAggregates(unittest.TestCase):
+    def setUp(self) -> None:
+        self.first = Product("Товар1", "Описание", 100, 2)
+        self.second = Product("Товар2", "Описание", 200, 3)
+        self.category = Category("Тест", "Категория", [self.first, self.second])
+        self.category.verify_aggregates = True
+
+    def test_quantity_and_price_changes_update_totals(self) -> None:
+        """Изменения количества, цены и скидки отражаются в агрегатах"""
+        self.first.quantity = 0
+        self.assertAlmostEqual(self.category.get_average_price(), 200.0)
+        self.second.price = 300
+        self.second.apply_discount(0.5)
+        self.assertAlmostEqual(self.category.total_value, 450.0)
+
+    def test_remove_product(self) -> None:
+        """Удаление товара вычитает его вклад"""
+        self.category.remove_product(self.second)
+        self.assertAlmostEqual(self.category.total_value, 200.0)
+        self.second.quantity = 10
+        self.assertAlmostEqual(self.category.get_average_price(), 100.0)
+
+    def test_verify_detects_untracked_mutation(self) -> None:
+        """Режим отладки замечает изменения в обход категории"""
+        self.category.products[0]._quantity = 7
+        with self.assertRaises(AggregateMismatchError):
+            self.category.get_average_price()
+
+    def test_products_returns_copy(self) -> None:
+        """Изменение списка вызывающего или возвращенного products не меняет состав и агрегаты категории"""
+        products = [Product("Первый", "Описание", 10, 1)]
+        category = Category("Копия", "Описание", products)
+        products.append(Product("Мимо", "Описание", 50, 1))
+        category.products.append(Product("Мимо", "Описание", 50, 1))
+        category.products.clear()
+        self.assertEqual(category.product_count, 1)
+        self.assertAlmostEqual(category.total_value, 10.0)
+        category.check_aggregates()
+
+
+class TestCategoryIndexes(unittest.TestCase):
+    def setUp(self) -> None:
+        self.phone = Smartphone("Phone", "Desc", 1000, 2, 2.5, "X", 128, "Black")
+        self.grass = LawnGrass("Grass", "Desc", 500, 4, "Russia", 14, "Green")
+        self.product = Product("Product", "Desc", 100, 1)
+        self.category = Category("Тест", "Категория", [self.phone, self.grass])
+        self.category.find_by_name("Phone")  # строим индексы до add_product
+        self.category.add_product(self.product)
+
+    def test_lookups(self) -> None:
+        """Поиск по названию, типу и диапазону цен"""
+        self.assertEqual(self.category.find_by_name("Grass"), [self.grass])
+        self.assertEqual(self.category.find_by_name("Нет"), [])
+        self.assertEqual(self.category.products_of_type(Product), [self.product])
+        self.assertEqual(self.category.products_in_price_range(100, 500), [self.product, self.grass])
+        self.assertEqual(self.category.cheapest(2), [self.product, self.grass])
+        self.assertEqual(self.category.most_expensive(1), [self.phone])
+
+    def test_indexes_follow_price_changes_and_removal(self) -> None:
+        """Индексы обновляются при изменении цены и удалении"""
+        self.phone.apply_discount(0.95)
+        self.assertEqual(self.category.cheapest(1), [self.phone])
+        self.category.remove_product(self.phone)
+        self.assertEqual(self.category.find_by_name("Phone"), [])
+        self.assertEqual(self.category.products_in_price_range(), [self.product, self.grass])
+
+    def test_bulk_repricing_resorts_once(self) -> None:
+        """Пакетная переоценка помечает индекс цен устаревшим, порядок восстанавливается при запросе"""
+        products = [Product(f"P{i}", "D", 1000.0 - i, 1) for i in range(100)]
+        self.category.add_products(products)
+        self.category.apply_discount(0.5)
+        self.assertTrue(self.category.index._dirty)
+        ranked = self.category.products_in_price_range()
+        self.assertEqual([p.price for p in ranked], sorted(p.price for p in self.category.products))
+        self.assertFalse(self.category.index._dirty)
+        self.category.remove_product(ranked[0])
+        self.assertEqual(self.category.cheapest(1), [ranked[1]])
+
+    def test_single_changes_keep_order_without_resort(self) -> None:
+        """Одиночные добавления и изменения цен вставляются на место, индекс не требует пересортировки"""
+        twins = [Product(f"T{i}", "D", 500.0, 1) for i in range(3)]
+        for product in twins:
+            self.category.add_product(product)
+        self.category.add_product(Product("Дешевый", "D", 1.0, 1))
+        self.assertFalse(self.category.index._dirty)
+        twins[1].price = 10000.0
+        twins[0].price = 2.0
+        self.phone.price = 50.0
+        self.assertFalse(self.category.index._dirty)
+        ranked = self.category.products_in_price_range()
+        self.assertEqual([p.price for p in ranked], sorted(p.price for p in self.category.products))
+        self.assertEqual(self.category.most_expensive(1), [twins[1]])
+        self.assertEqual(self.category.products_in_price_range(500, 500), [self.grass, twins[2]])
+
+    def test_remove_products_in_bulk(self) -> None:
+        """Пачка удаляется одним проходом: индексы, колонки и агрегаты согласованы, неизвестный товар - ошибка"""
+        columnar = Category("Колонки", "D", [self.phone, self.grass, self.product], columnar=True)
+        columnar.find_by_name("Phone")
+        with self.assertRaisesRegex(ValueError, "не найден"):
+            columnar.remove_products([self.phone, Product("Чужой", "D", 1.0, 1)])
+        self.assertEqual(columnar.product_count, 3)
+
+        columnar.remove_products([self.product, self.phone])
+        self.assertEqual(columnar.products, [self.grass])
+        self.assertEqual(columnar.find_by_name("Phone"), [])
+        self.assertEqual(columnar.cheapest(3), [self.grass])
+        self.assertEqual(columnar.filter_products(max_price=600), [self.grass])
+        self.assertAlmostEqual(columnar.total_value, 2000.0)
+        columnar.check_aggregates()
+        self.phone.price = 10.0
+        self.assertAlmostEqual(columnar.total_value, 2000.0)
+
+    def test_invalidate_index_after_rename(self) -> None:
+        """После переименования товара индекс названий перестраивается через invalidate_index"""
+        self.grass.name = "Lawn"
+        self.category.invalidate_index()
+        self.assertEqual(self.category.find_by_name("Lawn"), [self.grass])
+        self.assertEqual(self.category.find_by_name("Grass"), [])
+
+    def test_notify_changed_updates_indexes(self) -> None:
+        """Переименование с notify_changed обновляет индекс названий и поиск, не перестраивая индексы"""
+        index = self.category.index
+        search = SearchIndex()
+        self.category.set_search_index(search)
+        self.grass.name = "Lawn"
+        self.grass.notify_changed()
+        self.assertIs(self.category.index, index)
+        self.assertEqual(self.category.find_by_name("Lawn"), [self.grass])
+        self.assertEqual(self.category.find_by_name("Grass"), [])
+        self.assertEqual(search.search("lawn"), [self.grass])
+
+
+class TestCategoryBulkAdd(unittest.TestCase):
+    def setUp(self) -> None:
+        self.category = Category("Тест", "Категория")
+        self.products = [Product(f"Товар{i}", "Описание", 100.0 + i, 1) for i in range(5)]
+
+    def test_add_products_single_summary_record(self) -> None:
+        """Пакетное добавление пишет одну итоговую запись"""
+        with self.assertLogs("Category", level="INFO") as cm:
+            self.assertEqual(self.category.add_products(self.products), 5)
+        self.assertEqual(len(cm.output), 1)
+        self.assertIn("Добавлено товаров в категорию 'Тест': 5", cm.output[0])
+        self.assertAlmostEqual(self.category.total_value, 510.0)
+
+    def test_add_products_is_atomic(self) -> None:
+        """Ошибка в пачке не добавляет ни одного товара"""
+        batch = self.products + [Product("Нулевой", "Описание", 100.0, 0)]
+        with self.assertLogs("Category", level="ERROR"):
+            with self.assertRaisesRegex(ZeroQuantityError, "Товар #5"):
+                self.category.add_products(batch)
+        self.assertEqual(self.category.products, [])
+
+    def test_log_sampling(self) -> None:
+        """При log_sample_rate=0.5 INFO-сообщения пишутся для каждого второго товара"""
+        self.category.log_sample_rate = 0.5
+        with self.assertLogs("Category", level="INFO") as cm:
+            for product in self.products[:4]:
+                self.category.add_product(product)
+        self.assertEqual(len(cm.output), 6)
+
+
+class TestCategoryLogger(unittest.TestCase):
+    def test_listener_starts_on_first_record(self) -> None:
+        """Поток записи логов запускается при первой записи, а не при импорте"""
+        target = logging.Handler()
+        target.emit = mock.Mock()  # type: ignore[method-assign]
+        handler = _LazyQueueHandler(queue.SimpleQueue(), target)
+        self.assertIsNone(handler.listener)
+        handler.handle(logging.LogRecord("Category", logging.INFO, __file__, 1, "Сообщение", None, None))
+        self.assertIsNotNone(handler.listener)
+        handler.stop_listener()
+        self.assertIsNone(handler.listener)
+        target.emit.assert_called_once()
+
+
 if __name__ == "__main__":
     unittest.main()
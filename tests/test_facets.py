@@ -0,0 +1,107 @@
+import unittest
+
+from src.category import Category
+from src.facets import FacetIndex, Range
+from src.lawn_grass import LawnGrass
+from src.product import Product
+from src.smartphone import Smartphone
+
+
+class TestFacetIndex(unittest.TestCase):
+    def setUp(self) -> None:
+        self.gray = Smartphone("Galaxy", "D", 90000.0, 5, 3.2, "S23", 256, "Серый")
+        self.black = Smartphone("iPhone", "D", 150000.0, 3, 3.5, "15", 512, "Черный")
+        self.cheap = Smartphone("Redmi", "D", 20000.0, 10, 2.0, "Note", 128, "Серый")
+        self.grass = LawnGrass("Трава", "D", 500.0, 20, "Россия", 7, "Зеленый")
+        self.plain = Product("Кабель", "D", 300.0, 50)
+        self.category = Category("Все", "D", [self.gray, self.black, self.cheap, self.grass, self.plain])
+        self.index = FacetIndex(self.category.products)
+
+    def test_query_combines_predicates(self) -> None:
+        """Условия по типу, числовым диапазонам и значениям объединяются"""
+        self.assertEqual(
+            self.index.query(type="smartphone", memory=Range(min=256), price=Range(max=100000)), [self.gray]
+        )
+        self.assertEqual(self.index.query(color=["Серый", "Зеленый"]), [self.gray, self.cheap, self.grass])
+        self.assertEqual(self.index.query(memory=[128, 512]), [self.black, self.cheap])
+        self.assertEqual(self.index.count(price=Range(min=300, max=500)), 2)
+        self.assertEqual(self.index.query(country="Франция"), [])
+
+    def test_facet_counts_exclude_own_predicate(self) -> None:
+        """Счетчики фасета учитывают все условия, кроме условия на сам фасет"""
+        facets = self.index.facets(["color", "memory"], type="smartphone", color="Серый")
+        self.assertEqual(facets["color"], {"Серый": 2, "Черный": 1})
+        self.assertEqual(facets["memory"], {256: 1, 128: 1})
+        self.assertEqual(self.index.facets(["type"])["type"], {"smartphone": 3, "lawn_grass": 1, "product": 1})
+
+    def test_tracks_price_and_quantity_changes(self) -> None:
+        """Изменения цены и количества отражаются в индексе"""
+        self.black.price = 95000.0
+        self.category.apply_discount(0.5)
+        self.gray.quantity = 0
+        self.assertEqual(
+            self.index.query(price=Range(max=50000), type="smartphone"), [self.gray, self.black, self.cheap]
+        )
+        self.assertEqual(self.index.query(quantity=0), [self.gray])
+
+    def test_attribute_change_notification(self) -> None:
+        """Изменение характеристик с notify_changed переносит товар между значениями фасета"""
+        self.cheap.color = "Черный"
+        self.cheap.notify_changed()
+        self.assertEqual(self.index.query(color="Черный"), [self.black, self.cheap])
+        self.assertEqual(self.index.query(color="Серый"), [self.gray])
+
+    def test_remove(self) -> None:
+        """Удаленный товар не попадает в результаты и счетчики"""
+        self.index.remove(self.cheap)
+        self.assertEqual(self.index.query(color="Серый"), [self.gray])
+        self.assertEqual(self.index.facets(["memory"])["memory"], {256: 1, 512: 1})
+        self.cheap.price = 1.0
+        self.assertEqual(len(self.index), 4)
+
+    def test_bulk_build_matches_incremental(self) -> None:
+        """Пакетное построение дает тот же индекс, что и добавление по одному"""
+        incremental = FacetIndex()
+        for product in self.category.products:
+            incremental.add(product)
+        self.assertEqual(incremental._bitmaps, self.index._bitmaps)
+        self.assertEqual(incremental._sorted, self.index._sorted)
+        extra = Smartphone("Pixel", "D", 60000.0, 2, 3.0, "8", 256, "Серый")
+        self.index.add_many([extra, self.gray])
+        self.assertEqual(self.index.query(color="Серый", memory=256), [self.gray, extra])
+        extra.price = 1.0
+        self.assertEqual(self.index.query(price=Range(max=1)), [extra])
+
+    def test_removed_documents_compacted(self) -> None:
+        """Номера удаленных товаров освобождаются, результаты и подписки сохраняются"""
+        extra = [Product(f"P{i}", "D", float(i + 1), 1) for i in range(200)]
+        self.index.add_many(extra)
+        for product in extra[:150]:
+            self.index.remove(product)
+        self.assertLess(len(self.index._documents), 150)
+        self.assertEqual(self.index.query(color="Серый"), [self.gray, self.cheap])
+        self.assertEqual(self.index.count(type="product"), 51)
+        extra[150].price = 0.5
+        self.assertEqual(self.index.query(price=Range(max=0.5)), [extra[150]])
+        self.assertEqual((extra[150]._watchers or []).count(self.index), 1)
+
+    def test_unregistered_subclass_uses_ancestor_tag(self) -> None:
+        """Незарегистрированный подкласс индексируется под тегом ближайшего зарегистрированного предка"""
+
+        class Foldable(Smartphone):
+            pass
+
+        fold = Foldable("Fold", "D", 200000.0, 1, 3.0, "Z", 512, "Черный")
+        self.index.add(fold)
+        self.assertEqual(self.index.query(type="smartphone", color="Черный"), [self.black, fold])
+
+    def test_unknown_attribute(self) -> None:
+        """Неизвестный атрибут - ошибка, а не пустой результат"""
+        with self.assertRaisesRegex(ValueError, "Неизвестный атрибут"):
+            self.index.query(weight=1)
+        with self.assertRaisesRegex(ValueError, "не числовой"):
+            self.index.query(color=Range(min=1))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,100 @@
+import sys
+import threading
+import unittest
+from typing import Any, Dict
+
+from src.category import Category
+from src.lazy_category import LazyCategory
+from src.product import Product
+from src.smartphone import Smartphone
+
+
+class TestLazyCategory(unittest.TestCase):
+    def setUp(self) -> None:
+        self.data: Dict[str, Any] = {
+            "name": "Смартфоны",
+            "description": "Телефоны",
+            "products": [
+                {"name": "A", "description": "D", "price": 100.0, "quantity": 2},
+                {"name": "B", "description": "D", "price": 200.0, "quantity": 3, "type": "smartphone", "memory": 256},
+                {"name": "C", "description": "D", "price": 300.0, "quantity": 0},
+            ],
+        }
+        self.category = LazyCategory.from_dict(self.data)
+
+    def test_aggregates_without_materializing(self) -> None:
+        """Количество и агрегаты считаются по сырым записям"""
+        eager = Category.from_dict(self.data)
+        self.assertEqual(self.category.product_count, 3)
+        self.assertAlmostEqual(self.category.total_value, eager.total_value)
+        with self.assertLogs("Category", level="INFO"):
+            self.assertAlmostEqual(self.category.get_average_price(), eager.get_average_price())
+        self.assertFalse(self.category.materialized)
+
+    def test_products_materialize_on_access(self) -> None:
+        """Товары создаются при обращении и дальше работают как у обычной категории"""
+        products = self.category.products
+        self.assertTrue(self.category.materialized)
+        self.assertIsInstance(products[1], Smartphone)
+        self.category.add_product(Product("D", "D", 50.0, 1))
+        self.assertEqual(self.category.product_count, 4)
+        self.assertAlmostEqual(self.category.total_value, 850.0)
+
+    def test_lookup_materializes(self) -> None:
+        """Поиск по индексу материализует товары"""
+        self.assertEqual([p.name for p in self.category.find_by_name("B")], ["B"])
+
+    def test_invalid_totals_fields_fail_on_creation(self) -> None:
+        """Цена, количество и тег типа проверяются сразу, с номером строки"""
+        for row in (
+            {"name": "E", "description": "D", "price": -1, "quantity": 1},
+            {"name": "E", "description": "D", "price": 10, "quantity": "много"},
+            {"name": "E", "description": "D", "price": 10},
+            {"name": "E", "description": "D", "price": 10, "quantity": 1, "_type": "tv"},
+        ):
+            with self.subTest(row=row), self.assertRaisesRegex(ValueError, "строке 3"):
+                LazyCategory.from_dict(dict(self.data, products=self.data["products"] + [row]))
+
+    def test_invalid_rows_fail_on_materialization(self) -> None:
+        """Ошибки в остальных полях записей выявляются при материализации"""
+        self.data["products"][1]["memory"] = "много"
+        category = LazyCategory.from_dict(self.data)
+        self.assertAlmostEqual(category.total_value, 800.0)
+        with self.assertRaisesRegex(ValueError, "Ошибка создания продукта"):
+            category.products
+
+    def test_materialization_releases_rows(self) -> None:
+        """После материализации сырые записи не хранятся"""
+        self.category.materialize()
+        self.assertIsNone(self.category.raw_columns())
+        self.assertEqual(self.category.product_count, 3)
+
+    def test_concurrent_materialization(self) -> None:
+        """Одновременное обращение к товарам из нескольких потоков создает их один раз"""
+        rows = [{"name": f"P{i}", "description": "D", "price": 10.0, "quantity": 1} for i in range(5000)]
+        category = LazyCategory("Много", "D", rows)
+        barrier = threading.Barrier(4)
+
+        def reader() -> None:
+            barrier.wait()
+            category.products
+
+        # Частое переключение потоков, чтобы они гарантированно встретились внутри материализации
+        interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)
+        try:
+            threads = [threading.Thread(target=reader) for _ in range(4)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        finally:
+            sys.setswitchinterval(interval)
+        self.assertEqual(len(category.products), 5000)
+        self.assertEqual(category.product_count, 5000)
+        self.assertAlmostEqual(category.total_value, 50000.0)
+        category.check_aggregates()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,10 +1,16 @@
 import json
 import os
-from tempfile import NamedTemporaryFile
-from typing import List, Dict, Any
+from tempfile import NamedTemporaryFile, TemporaryDirectory
+from typing import Any, Dict, Iterator, List
 from unittest import TestCase, mock
-from src.loaders import JsonLoader
+from src import atomic_file
+from src.loaders import JsonLoader, _JsonStream, clear_encoding_cache, detect_encoding, save_categories
 from src.category import Category
+from src.exceptions import CatalogLoadError
+from src.lawn_grass import LawnGrass
+from src.lazy_category import LazyCategory
+from src.product_registry import product_to_dict
+from src.smartphone import Smartphone
 
 
 class TestJsonLoader(TestCase):
@@ -53,3 +59,309 @@ class TestJsonLoader(TestCase):
         categories: List[Category] = JsonLoader.load_categories(self.temp_file.name)
         self.assertEqual(len(categories), 1)
         self.assertEqual(categories[0].name, "Smartphones")
+
+    def test_iter_categories_streams_small_chunks(self) -> None:
+        """Тест потоковой загрузки с маленьким размером блока"""
+        categories = list(JsonLoader.iter_categories(self.temp_file.name, chunk_size=7))
+        self.assertEqual(len(categories), 1)
+        self.assertEqual(categories[0].name, "Smartphones")
+        self.assertEqual(categories[0].products[0].price, 999.99)
+
+    def test_iter_products(self) -> None:
+        """Тест потоковой выдачи пар (категория, продукт)"""
+        pairs = list(JsonLoader.iter_products(self.temp_file.name, chunk_size=5))
+        self.assertEqual([(c.name, p.name) for c, p in pairs], [("Smartphones", "iPhone 15")])
+
+    def test_iter_products_fields_after_products(self) -> None:
+        """Товары разбираются по одному и при любом порядке полей категории"""
+        products = [{"name": f"P{i}", "description": "D", "price": 10.0 + i, "quantity": 1} for i in range(50)]
+        with open(self.temp_file.name, "w", encoding="utf-8") as f:
+            json.dump([{"products": products, "name": "A", "description": "D"}, {"name": "B", "description": "D"}], f)
+
+        pairs = list(JsonLoader.iter_products(self.temp_file.name, chunk_size=9))
+        self.assertEqual([p.name for _, p in pairs], [row["name"] for row in products])
+        self.assertEqual({c.name for c, _ in pairs}, {"A"})
+        self.assertEqual(pairs[0][0].products, [])
+        categories = list(JsonLoader.iter_categories(self.temp_file.name, chunk_size=9))
+        self.assertEqual([c.product_count for c in categories], [50, 0])
+
+    def test_iter_products_invalid_rows(self) -> None:
+        """Ошибки в строках товаров содержат путь к файлу и номер строки"""
+        with open(self.temp_file.name, "w", encoding="utf-8") as f:
+            json.dump([{"name": "A", "description": "D", "products": [{"name": "P", "price": 1}]}], f)
+        with self.assertRaisesRegex(ValueError, "строке 0"):
+            list(JsonLoader.iter_products(self.temp_file.name))
+
+        with open(self.temp_file.name, "w", encoding="utf-8") as f:
+            json.dump([{"name": "A", "description": "D", "products": 5}], f)
+        with self.assertRaisesRegex(ValueError, "'products' должно быть списком"):
+            list(JsonLoader.iter_categories(self.temp_file.name))
+
+    def test_iter_categories_cp1251(self) -> None:
+        """Тест потоковой загрузки файла в кодировке cp1251"""
+        data = self.test_data + [{"name": "Телефоны", "description": "Мобильные", "products": []}]
+        with open(self.temp_file.name, "w", encoding="cp1251") as f:
+            json.dump(data, f, ensure_ascii=False)
+
+        names = [c.name for c in JsonLoader.iter_categories(self.temp_file.name, chunk_size=16)]
+        self.assertEqual(names, ["Smartphones", "Телефоны"])
+
+    def test_stream_error_positions_match_full_load(self) -> None:
+        """Позиция ошибки потоковой загрузки - от начала файла, как у полной; остаток файла не читается"""
+        rows = [{"name": f"P{i}", "description": "D", "price": 1.0, "quantity": 1} for i in range(300)]
+        text = json.dumps([{"name": "C", "description": "D", "products": rows}], indent=2)
+        position = text.index('"P250"')
+        with open(self.temp_file.name, "w", encoding="utf-8") as f:
+            f.write(text[:position] + '"P250" x' + text[position:][6:])
+        with self.assertRaises(ValueError) as context:
+            JsonLoader.load_categories(self.temp_file.name)
+        expected = str(context.exception).split(": ", 1)[1]
+
+        for chunk_size in (7, 1000):
+            with mock.patch("src.loaders._JsonStream._fill", autospec=True, side_effect=_JsonStream._fill) as fill:
+                with self.assertRaises(ValueError) as context:
+                    list(JsonLoader.iter_products(self.temp_file.name, chunk_size=chunk_size))
+            self.assertEqual(str(context.exception).split(": ", 1)[1], expected)
+            self.assertLessEqual(fill.call_count * chunk_size, position + 2 * chunk_size + 16)
+
+    def test_iter_categories_errors_contain_path(self) -> None:
+        """Тест сообщений об ошибках потоковой загрузки"""
+        with open(self.temp_file.name, "w", encoding="utf-8") as f:
+            f.write('{"name": "x"}')
+        with self.assertRaises(ValueError) as context:
+            list(JsonLoader.iter_categories(self.temp_file.name))
+        self.assertIn("должен содержать список категорий", str(context.exception))
+
+        with open(self.temp_file.name, "w", encoding="utf-8") as f:
+            f.write('[{"name": "x", "description": "y"}, {"name": ')
+        with self.assertRaises(ValueError) as context:
+            list(JsonLoader.iter_categories(self.temp_file.name, chunk_size=8))
+        self.assertIn(f"Ошибка JSON в файле {self.temp_file.name}", str(context.exception))
+
+    def test_load_many_parallel_keeps_path_order(self) -> None:
+        """Параллельная загрузка нескольких файлов по glob-шаблону"""
+        with TemporaryDirectory() as directory:
+            for index in range(3):
+                data = [{"name": f"Cat{index}", "description": "D", "products": self.test_data[0]["products"]}]
+                with open(os.path.join(directory, f"feed{index}.json"), "w", encoding="utf-8") as f:
+                    json.dump(data, f)
+
+            categories = JsonLoader.load_many(os.path.join(directory, "*.json"), max_workers=2)
+
+        self.assertEqual([c.name for c in categories], ["Cat0", "Cat1", "Cat2"])
+        self.assertAlmostEqual(categories[2].get_average_price(), 999.99)
+
+    def test_load_many_collects_errors(self) -> None:
+        """Ошибки всех файлов собираются в один отчет"""
+        with self.assertRaises(CatalogLoadError) as context:
+            JsonLoader.load_many([self.temp_file.name, "missing1.json", "missing2.json"], max_workers=1)
+        self.assertEqual(set(context.exception.errors), {"missing1.json", "missing2.json"})
+        self.assertEqual([c.name for c in context.exception.categories], ["Smartphones"])
+
+    def test_load_many_reports_malformed_files(self) -> None:
+        """Неверные типы значений в файле попадают в отчет по этому файлу и не прерывают загрузку"""
+        with TemporaryDirectory() as directory:
+            broken = {
+                "count.json": [{"name": "A", "description": "D", "products": 5}],
+                "null.json": [
+                    {
+                        "name": "B",
+                        "description": "D",
+                        "products": [{**self.test_data[0]["products"][0], "price": None}],
+                    }
+                ],
+                "item.json": [5],
+            }
+            for name, data in broken.items():
+                with open(os.path.join(directory, name), "w", encoding="utf-8") as f:
+                    json.dump(data, f)
+            paths = [self.temp_file.name] + [os.path.join(directory, name) for name in broken]
+
+            with self.assertRaises(CatalogLoadError) as context:
+                JsonLoader.load_many(paths, max_workers=1)
+        self.assertEqual(set(context.exception.errors), set(paths[1:]))
+        self.assertIn("строке 0", context.exception.errors[paths[2]])
+        self.assertEqual([c.name for c in context.exception.categories], ["Smartphones"])
+
+    def test_load_many_options_and_single_core(self) -> None:
+        """lazy и encoding передаются в загрузку файла; на одном ядре пул процессов не создается"""
+        with mock.patch("src.loaders.os.cpu_count", return_value=1):
+            with mock.patch("src.loaders.ProcessPoolExecutor") as pool:
+                categories = JsonLoader.load_many(
+                    [self.temp_file.name] * 2, max_workers=4, lazy=True, encoding="utf-8"
+                )
+        pool.assert_not_called()
+        category = categories[0]
+        assert isinstance(category, LazyCategory)
+        self.assertFalse(category.materialized)
+
+    def test_load_many_empty_glob(self) -> None:
+        """Шаблон без совпадений - ошибка, а не пустой каталог"""
+        with TemporaryDirectory() as directory:
+            with self.assertRaisesRegex(FileNotFoundError, "Нет файлов по шаблону"):
+                JsonLoader.load_many(os.path.join(directory, "*.json"))
+
+    def test_save_categories_streaming_formats(self) -> None:
+        """Потоковое сохранение: формат с отступами совпадает с json.dump, compact - без пробелов"""
+        categories = JsonLoader.load_categories(self.temp_file.name)
+        save_categories(self.temp_file.name, categories)
+        with open(self.temp_file.name, encoding="utf-8") as f:
+            self.assertEqual(f.read(), json.dumps(self.test_data, ensure_ascii=False, indent=2))
+
+        save_categories(self.temp_file.name, categories, compact=True)
+        with open(self.temp_file.name, encoding="utf-8") as f:
+            self.assertEqual(f.read(), json.dumps(self.test_data, ensure_ascii=False, separators=(",", ":")))
+
+    def test_save_categories_indented_subclasses(self) -> None:
+        """Формат с отступами совпадает с json.dump и для продуктов-наследников"""
+        products = [
+            Smartphone('Phone "X"', "Описание\nв две строки", 1000.5, 1, 2.5, "X", 128, "Black"),
+            LawnGrass("Grass", "Desc", 5.0, 2, "Россия", 14, "Green"),
+        ]
+        categories = [Category("Смешанная", "Типы", products), Category("Пустая", "Без товаров")]
+        save_categories(self.temp_file.name, categories)
+        expected = [
+            {"name": c.name, "description": c.description, "products": [product_to_dict(p) for p in c.products]}
+            for c in categories
+        ]
+        with open(self.temp_file.name, encoding="utf-8") as f:
+            self.assertEqual(f.read(), json.dumps(expected, ensure_ascii=False, indent=2))
+
+    def test_save_categories_is_atomic(self) -> None:
+        """При ошибке во время записи исходный файл не меняется и временный файл удаляется"""
+
+        def broken() -> Iterator[Category]:
+            yield Category("Новая", "Категория")
+            raise RuntimeError("сбой")
+
+        with self.assertRaises(RuntimeError):
+            save_categories(self.temp_file.name, broken())
+        with open(self.temp_file.name, encoding="utf-8") as f:
+            self.assertEqual(json.load(f), self.test_data)
+        directory = os.path.dirname(self.temp_file.name)
+        base = os.path.basename(self.temp_file.name)
+        self.assertFalse([name for name in os.listdir(directory) if name.startswith(f".{base}.")])
+
+    def test_save_categories_mode_and_fsync(self) -> None:
+        """Новый файл получает права с учетом umask, существующий сохраняет свои; данные сбрасываются на диск"""
+        categories = JsonLoader.load_categories(self.temp_file.name)
+        with TemporaryDirectory() as directory:
+            path = os.path.join(directory, "out.json")
+            old_umask = os.umask(0o027)
+            try:
+                with mock.patch("src.atomic_file.os.fsync", wraps=os.fsync) as fsync, mock.patch(
+                    "src.atomic_file.os.umask", wraps=os.umask
+                ) as umask:
+                    save_categories(path, categories)
+            finally:
+                os.umask(old_umask)
+            self.assertEqual(os.stat(path).st_mode & 0o777, 0o640)
+            self.assertEqual(fsync.call_count, 2)
+            umask.assert_not_called()
+
+            os.chmod(path, 0o604)
+            save_categories(path, categories)
+            self.assertEqual(os.stat(path).st_mode & 0o777, 0o604)
+
+    def test_new_file_mode_without_proc(self) -> None:
+        """Без /proc права нового файла считаются по umask, прочитанному при импорте"""
+        with mock.patch("src.atomic_file._read_umask", return_value=None), mock.patch(
+            "src.atomic_file._IMPORT_UMASK", 0o077
+        ):
+            self.assertEqual(atomic_file._new_file_mode(), 0o600)
+
+    def test_load_lazy(self) -> None:
+        """Ленивая загрузка не создает товары до обращения"""
+        categories = JsonLoader.load_categories(self.temp_file.name, lazy=True)
+        self.assertEqual(categories[0].product_count, 1)
+        self.assertFalse(getattr(categories[0], "materialized"))
+        self.assertEqual(categories[0].products[0].name, "iPhone 15")
+
+    def test_load_lazy_invalid_price_reports_file_and_row(self) -> None:
+        """Ошибка в цене ленивой категории сообщается сразу, с путем к файлу и номером строки"""
+        self.test_data[0]["products"][0]["price"] = "дорого"
+        with open(self.temp_file.name, "w", encoding="utf-8") as f:
+            json.dump(self.test_data, f)
+        with self.assertRaisesRegex(ValueError, f"{self.temp_file.name}: Ошибка в строке 0"):
+            JsonLoader.load_categories(self.temp_file.name, lazy=True)
+
+
+class TestEncodingDetection(TestCase):
+    def setUp(self) -> None:
+        self.temp_dir = TemporaryDirectory()
+        self.path = os.path.join(self.temp_dir.name, "feed.json")
+        self.data = [{"name": "Телефоны", "description": "Мобильные", "products": []}]
+        clear_encoding_cache()
+
+    def tearDown(self) -> None:
+        self.temp_dir.cleanup()
+        clear_encoding_cache()
+
+    def write(self, content: bytes) -> None:
+        with open(self.path, "wb") as f:
+            f.write(content)
+
+    def test_detect_encoding(self) -> None:
+        """Кодировка определяется по BOM или проверкой начала файла на UTF-8"""
+        text = json.dumps(self.data, ensure_ascii=False)
+        self.assertEqual(detect_encoding(text.encode("utf-8")), "utf-8")
+        self.assertEqual(detect_encoding(text.encode("utf-8")[:2]), "utf-8")
+        self.assertEqual(detect_encoding(text.encode("cp1251")), "cp1251")
+        self.assertEqual(detect_encoding(text.encode("utf-8-sig")), "utf-8-sig")
+        self.assertEqual(detect_encoding(text.encode("utf-16")), "utf-16")
+        self.assertEqual(detect_encoding(text.encode("utf-32")), "utf-32")
+
+    def test_load_detected_encodings(self) -> None:
+        """Файлы в cp1251, с BOM и в UTF-16 загружаются за одно чтение"""
+        text = json.dumps(self.data, ensure_ascii=False)
+        for encoding in ("cp1251", "utf-8-sig", "utf-16"):
+            clear_encoding_cache()
+            self.write(text.encode(encoding))
+            with mock.patch("builtins.open", wraps=open) as opened:
+                categories = JsonLoader.load_categories(self.path)
+            self.assertEqual(opened.call_count, 1)
+            self.assertEqual(categories[0].name, "Телефоны")
+            self.assertEqual([c.name for c in JsonLoader.iter_categories(self.path, chunk_size=8)], ["Телефоны"])
+
+    def test_utf8_prefix_with_cp1251_tail(self) -> None:
+        """Если не-UTF-8 байты встретились после проверенного начала, файл читается как cp1251"""
+        padding = [{"name": "x" * 70000, "description": "", "products": []}]
+        self.write(json.dumps(padding + self.data, ensure_ascii=False).encode("cp1251"))
+        self.assertEqual(JsonLoader.load_categories(self.path)[1].name, "Телефоны")
+        clear_encoding_cache()
+        names = [c.name for c in JsonLoader.iter_categories(self.path, chunk_size=4096)]
+        self.assertEqual(names[1], "Телефоны")
+
+    def test_declared_encoding_and_cache(self) -> None:
+        """Заданная кодировка используется без определения и запоминается для пути"""
+        self.write(json.dumps(self.data, ensure_ascii=False).encode("cp1251"))
+        with self.assertRaisesRegex(ValueError, "не в кодировке utf-8"):
+            JsonLoader.load_categories(self.path, encoding="utf-8")
+        with mock.patch("src.loaders.detect_encoding") as detect:
+            self.assertEqual(JsonLoader.load_categories(self.path, encoding="cp1251")[0].name, "Телефоны")
+            self.assertEqual(JsonLoader.load_categories(self.path)[0].name, "Телефоны")
+        detect.assert_not_called()
+
+    def test_declared_encoding_never_falls_back(self) -> None:
+        """Заданная кодировка не заменяется ни кэшем, ни определением - и при потоковом чтении"""
+        self.write(json.dumps(self.data, ensure_ascii=False).encode("cp1251"))
+        self.assertEqual(JsonLoader.load_categories(self.path)[0].name, "Телефоны")
+        with self.assertRaisesRegex(ValueError, "не в кодировке utf-8"):
+            list(JsonLoader.iter_categories(self.path, encoding="utf-8"))
+        with self.assertRaisesRegex(ValueError, "не в кодировке utf-8"):
+            JsonLoader.load_categories(self.path, encoding="utf-8")
+
+    def test_changed_file_is_detected_again(self) -> None:
+        """Кэш кодировки действует для той же версии файла: перезаписанный файл определяется заново"""
+        self.write(json.dumps(self.data, ensure_ascii=False).encode("cp1251"))
+        self.assertEqual(JsonLoader.load_categories(self.path)[0].name, "Телефоны")
+        self.write(json.dumps(self.data, ensure_ascii=False).encode("utf-8"))
+        self.assertEqual(JsonLoader.load_categories(self.path)[0].name, "Телефоны")
+        self.write(json.dumps(self.data, ensure_ascii=False).encode("cp1251"))
+        self.assertEqual([c.name for c in JsonLoader.iter_categories(self.path)], ["Телефоны"])
+
+    def test_empty_file(self) -> None:
+        """Пустой файл не отображается в память и дает ошибку JSON"""
+        self.write(b"")
+        with self.assertRaisesRegex(ValueError, "Ошибка JSON"):
+            JsonLoader.load_categories(self.path)
@@ -0,0 +1,39 @@
+import logging
+import unittest
+
+from src.logging_mixin import LoggingMixin
+from src.product import Product
+
+
+class LoggedProduct(LoggingMixin, Product):
+    __slots__ = ()
+
+
+class TestLoggingMixin(unittest.TestCase):
+    def tearDown(self) -> None:
+        LoggedProduct.aggregate_creation = False
+        LoggingMixin.flush_creation_counts()
+
+    def test_logs_creation_without_keeping_arguments(self) -> None:
+        """Создание объекта логируется, аргументы не сохраняются в объекте"""
+        with self.assertLogs("LoggedProduct", level="INFO") as cm:
+            product = LoggedProduct("Товар", "Описание", 100.0, quantity=2)
+        self.assertIn("Created LoggedProduct with args: 'Товар', 'Описание', 100.0, quantity=2", cm.output[0])
+        self.assertFalse(hasattr(product, "__dict__"))
+
+    def test_aggregated_counters(self) -> None:
+        """В режиме агрегации считаются только количества"""
+        LoggedProduct.aggregate_creation = True
+        logger = logging.getLogger("LoggedProduct")
+        with self.assertNoLogs(logger, level="INFO"):
+            for _ in range(3):
+                LoggedProduct("Товар", "Описание", 100.0, 1)
+        self.assertEqual(LoggingMixin.creation_counts(), {"LoggedProduct": 3})
+        with self.assertLogs("LoggingMixin", level="INFO") as cm:
+            LoggingMixin.flush_creation_counts()
+        self.assertIn("Created 3 LoggedProduct objects", cm.output[0])
+        self.assertEqual(LoggingMixin.creation_counts(), {})
+
+
+if __name__ == "__main__":
+    unittest.main()
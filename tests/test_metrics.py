@@ -0,0 +1,88 @@
+import json
+import os
+import unittest
+from tempfile import TemporaryDirectory
+from typing import Any, Dict, List
+
+from src import metrics
+from src.category import Category
+from src.loaders import JsonLoader
+from src.product import Product
+
+
+class RecordingExporter(metrics.MetricsExporter):
+    def __init__(self) -> None:
+        self.snapshots: List[Dict[str, Any]] = []
+
+    def export(self, snapshot: Dict[str, Any]) -> None:
+        self.snapshots.append(snapshot)
+
+
+class TestMetrics(unittest.TestCase):
+    def setUp(self) -> None:
+        metrics.reset()
+        self.category = Category("Категория", "D", [Product("A", "D", 100.0, 2)])
+
+    def tearDown(self) -> None:
+        metrics.disable()
+        metrics.reset()
+
+    def test_disabled_records_nothing(self) -> None:
+        """Выключенные метрики ничего не записывают и не создают таймеров"""
+        self.assertIs(metrics.timed("a"), metrics.timed("b"))
+        self.category.add_product(Product("B", "D", 50.0, 1))
+        metrics.increment("counter")
+        self.assertEqual(metrics.snapshot(), {"counters": {}, "histograms": {}})
+
+    def test_category_operations(self) -> None:
+        """Замеры add_product, get_average_price и apply_discount, счетчик ошибок"""
+        metrics.enable()
+        self.category.add_product(Product("B", "D", 50.0, 1))
+        with self.assertRaises(ValueError):
+            self.category.add_product(Product("C", "D", 50.0, 0))
+        self.category.get_average_price()
+        self.category.apply_discount(0.1)
+
+        snapshot = metrics.snapshot()
+        self.assertEqual(snapshot["counters"], {"category.add_product.errors": 1})
+        histograms = snapshot["histograms"]
+        self.assertEqual(histograms["category.add_product"]["count"], 2)
+        self.assertEqual(histograms["category.get_average_price"]["count"], 1)
+        self.assertEqual(histograms["category.apply_discount"]["count"], 1)
+        self.assertGreaterEqual(
+            histograms["category.apply_discount"]["p99"], histograms["category.apply_discount"]["min"]
+        )
+
+    def test_loader_phases_and_export(self) -> None:
+        """Фазы загрузки пишутся в отдельные гистограммы, экспортер получает снимок"""
+        with TemporaryDirectory() as directory:
+            path = os.path.join(directory, "catalog.json")
+            with open(path, "w", encoding="utf-8") as file:
+                json.dump([{"name": "К", "description": "D", "products": []}], file)
+            metrics.enable()
+            JsonLoader.load_categories(path)
+            size = os.path.getsize(path)
+
+        exporter = RecordingExporter()
+        metrics.add_exporter(exporter)
+        try:
+            snapshot = metrics.export()
+        finally:
+            metrics.remove_exporter(exporter)
+        self.assertEqual(exporter.snapshots, [snapshot])
+        self.assertEqual(snapshot["counters"], {"loader.files": 1, "loader.bytes": size})
+        for phase in ("read", "decode", "parse", "construct"):
+            self.assertEqual(snapshot["histograms"][f"loader.{phase}"]["count"], 1)
+
+    def test_profiler_hook(self) -> None:
+        """Хук профилировщика собирает статистику по выборке замеров"""
+        hook = metrics.CProfileHook()
+        metrics.enable(profiler=hook, profile_sample_rate=1.0)
+        self.category.apply_discount(0.1)
+        metrics.disable()
+        self.assertIn("category.apply_discount", hook.profiles)
+        self.assertGreater(hook.stats("category.apply_discount").total_calls, 0)  # type: ignore[attr-defined]
+
+
+if __name__ == "__main__":
+    unittest.main()
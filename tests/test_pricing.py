@@ -0,0 +1,87 @@
+import unittest
+
+from src.catalog import Catalog
+from src.category import Category
+from src.facets import FacetIndex, Range
+from src.lawn_grass import LawnGrass
+from src.pricing import CategoryDiscount, PriceBandDiscount, PricingEngine, TypeDiscount
+from src.product import Product
+from src.smartphone import Smartphone
+
+
+class TestPricingEngine(unittest.TestCase):
+    def setUp(self) -> None:
+        self.phone = Smartphone("Phone", "Desc", 1000.0, 2, 2.5, "X", 128, "Black")
+        self.grass = LawnGrass("Grass", "Desc", 500.0, 4, "Russia", 14, "Green")
+        self.product = Product("Product", "Desc", 100.0, 1)
+        self.phones = Category("Смартфоны", "Телефоны", [self.phone])
+        self.garden = Category("Сад", "Товары для сада", [self.grass, self.product])
+
+    def test_preview_does_not_change_prices(self) -> None:
+        """Dry-run рассчитывает изменения, но не применяет их"""
+        engine = PricingEngine([TypeDiscount(Smartphone, 0.1), PriceBandDiscount(0.5, max_price=200)])
+        changes = engine.preview([self.phones, self.garden])
+        expected = [(self.phone, 900.0), (self.product, 50.0)]
+        self.assertEqual([(c.product, float(c.new_price)) for c in changes], expected)
+        self.assertEqual(self.phone.price, 1000.0)
+
+    def test_apply_first_rule_wins_and_rollback(self) -> None:
+        """Для товара действует первое подходящее правило; изменения откатываются"""
+        engine = PricingEngine([CategoryDiscount("Сад", 0.2), PriceBandDiscount(0.5)])
+        transaction = engine.apply([self.phones, self.garden])
+        self.assertEqual([self.phone.price, self.grass.price, self.product.price], [500.0, 400.0, 80.0])
+        self.assertAlmostEqual(self.garden.total_value, 400.0 * 4 + 80.0)
+
+        transaction.rollback()
+        self.assertEqual([self.phone.price, self.grass.price, self.product.price], [1000.0, 500.0, 100.0])
+        self.assertAlmostEqual(self.garden.total_value, 2100.0)
+
+    def test_rule_order_is_global_for_shared_products(self) -> None:
+        """Товар из нескольких категорий получает первое правило, подходящее хотя бы в одной из них"""
+        self.phones.add_product(self.grass)
+        engine = PricingEngine([CategoryDiscount("Сад", 0.2), TypeDiscount(LawnGrass, 0.5)])
+        changes = engine.preview([self.phones, self.garden])
+        self.assertEqual(
+            [(c.product, c.category) for c in changes], [(self.grass, self.garden), (self.product, self.garden)]
+        )
+        self.assertEqual(float(changes[0].new_price), 400.0)
+
+    def test_bulk_apply_keeps_containers_consistent(self) -> None:
+        """Пакетная запись цен согласует агрегаты, колонки, индекс, каталог и фасеты, в том числе у общих товаров"""
+        columnar = Category("Колонки", "D", [self.phone, self.grass, self.product], columnar=True)
+        columnar.cheapest(1)
+        catalog = Catalog("Каталог", "D", [self.phones, self.garden])
+        facets = FacetIndex(columnar.products)
+        engine = PricingEngine([TypeDiscount(Product, 0.95), CategoryDiscount("Смартфоны", 0.6)])
+
+        transaction = engine.apply([columnar, self.phones])
+        self.assertEqual([self.phone.price, self.grass.price, self.product.price], [400.0, 500.0, 5.0])
+        for category in (columnar, self.phones, self.garden):
+            category.check_aggregates()
+        self.assertEqual(columnar.cheapest(3), [self.product, self.phone, self.grass])
+        self.assertEqual(columnar.filter_products(max_price=500), [self.phone, self.grass, self.product])
+        self.assertAlmostEqual(catalog.total_value, 400.0 * 2 + 500.0 * 4 + 5.0)
+        self.assertEqual(facets.query(price=Range(max=10)), [self.product])
+
+        transaction.rollback()
+        self.assertEqual(columnar.cheapest(1), [self.product])
+        self.assertEqual(columnar.most_expensive(1), [self.phone])
+        self.assertAlmostEqual(catalog.total_value, 1000.0 * 2 + 500.0 * 4 + 100.0)
+        self.assertEqual(facets.query(price=Range(min=1000)), [self.phone])
+
+    def test_select_uses_existing_index_only(self) -> None:
+        """Без построенного индекса правила выбирают товары линейным проходом и индекс не строят"""
+        rule = PriceBandDiscount(0.5, min_price=200)
+        self.assertEqual(list(rule.select(self.garden)), [self.grass])
+        self.assertFalse(self.garden.has_index)
+        self.assertEqual(self.garden.cheapest(1), [self.product])
+        self.assertEqual(list(TypeDiscount(Product, 0.5).select(self.garden)), [self.product])
+
+    def test_invalid_discount(self) -> None:
+        """Скидка вне интервала (0, 1) отклоняется"""
+        with self.assertRaises(ValueError):
+            CategoryDiscount("Сад", 1.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,6 +1,7 @@
 import unittest
 from src.product import Product
 from src.base_product import BaseProduct
+from src.smartphone import Smartphone
 
 
 class MockProduct(BaseProduct):
@@ -55,3 +56,55 @@ class TestProduct(unittest.TestCase):
     def test_str_representation(self) -> None:
         """Тест строкового представления"""
         self.assertEqual(str(self.product), "Test Product, 100.0 руб. Остаток: 10 шт.")
+
+    def test_str_cache_invalidation(self) -> None:
+        """Строка кэшируется и пересобирается после изменения цены, количества или атрибутов"""
+        first = str(self.product)
+        self.assertIs(str(self.product), first)
+        self.product.price = 50.0
+        self.product.quantity = 3
+        self.assertEqual(str(self.product), "Test Product, 50.0 руб. Остаток: 3 шт.")
+        self.product.apply_discount(0.5)
+        self.product.name = "Renamed"
+        self.assertEqual(str(self.product), "Renamed, 25.0 руб. Остаток: 3 шт.")
+
+        phone = Smartphone("P", "D", 10.0, 1, 2.0, "M", 128, "Серый")
+        self.assertIn("Цвет: Серый", str(phone))
+        phone.color = "Черный"
+        phone.memory = 256
+        self.assertIn("Цвет: Черный", str(phone))
+        self.assertIn("Память: 256GB", str(phone))
+
+    def test_compact_representation(self) -> None:
+        """Продукты не хранят __dict__, одинаковые цены разделяют Decimal"""
+        other = Product("Other", "Desc", 100.0, 1)
+        self.assertFalse(hasattr(self.product, "__dict__"))
+        self.assertIs(self.product._price, other._price)
+        other.price = 250.0
+        self.assertEqual(self.product.price, 100.0)
+
+    def test_create_many(self) -> None:
+        """Пакетное создание продуктов"""
+        rows = [
+            {"name": "A", "description": "D", "price": 10, "quantity": "2"},
+            {"name": "B", "description": "D", "price": 20.5, "quantity": 0},
+        ]
+        products = Product.create_many(rows)
+        self.assertEqual([str(p) for p in products], ["A, 10.0 руб. Остаток: 2 шт.", "B, 20.5 руб. Остаток: 0 шт."])
+
+    def test_create_many_subclass_defaults(self) -> None:
+        """Пакетное создание подклассов заполняет поля по умолчанию"""
+        row = {"name": "P", "description": "D", "price": 1, "quantity": 1, "memory": 256}
+        phone = Smartphone.create_many([row])[0]
+        self.assertIsInstance(phone, Smartphone)
+        self.assertEqual((phone.memory, phone.model, phone.performance), (256, "", 0.0))
+
+    def test_create_many_reports_row_index(self) -> None:
+        """Ошибки пакетного создания содержат номер строки"""
+        valid = {"name": "A", "description": "D", "price": 10, "quantity": 1}
+        with self.assertRaisesRegex(ValueError, "строке 1: Цена должна быть положительной"):
+            Product.create_many([valid, dict(valid, price=0)])
+        with self.assertRaisesRegex(ValueError, "строке 2: 'quantity'"):
+            Product.create_many([valid, valid, {"name": "B", "description": "D", "price": 1}])
+        with self.assertRaisesRegex(ValueError, "строке 0"):
+            Product.create_many([dict(valid, price="abc")])
@@ -0,0 +1,76 @@
+import unittest
+
+from src.lawn_grass import LawnGrass
+from src.product import Product
+from src.product_registry import get_type_tag, product_from_dict, product_to_dict, products_from_dicts
+from src.smartphone import Smartphone
+
+
+class TestProductRegistry(unittest.TestCase):
+    def setUp(self) -> None:
+        self.phone = Smartphone("Phone", "Desc", 1000.0, 1, 2.5, "X", 128, "Black")
+        self.grass = LawnGrass("Grass", "Desc", 500.0, 2, "Russia", 14, "Green")
+        self.product = Product("Product", "Desc", 100.0, 3)
+
+    def test_serialization_keeps_subclass_fields(self) -> None:
+        """Сериализация сохраняет поля подклассов и тег типа"""
+        self.assertEqual(
+            product_to_dict(self.phone),
+            {
+                "name": "Phone",
+                "description": "Desc",
+                "price": 1000.0,
+                "quantity": 1,
+                "performance": 2.5,
+                "model": "X",
+                "memory": 128,
+                "color": "Black",
+                "_type": "smartphone",
+            },
+        )
+        self.assertEqual(
+            product_to_dict(self.product), {"name": "Product", "description": "Desc", "price": 100.0, "quantity": 3}
+        )
+
+    def test_round_trip_mixed_types(self) -> None:
+        """Продукты разных типов переживают цикл сохранение/загрузка"""
+        rows = [product_to_dict(p) for p in (self.phone, self.product, self.grass)]
+        restored = products_from_dicts(rows)
+        self.assertEqual([type(p) for p in restored], [Smartphone, Product, LawnGrass])
+        self.assertEqual([product_to_dict(p) for p in restored], rows)
+        self.assertEqual(str(product_from_dict(rows[2])), str(self.grass))
+
+    def test_errors(self) -> None:
+        """Неизвестный тип и ошибка с исходным номером строки"""
+        with self.assertRaisesRegex(ValueError, "Неизвестный тип продукта: tv"):
+            product_from_dict({"_type": "tv"})
+        rows = [product_to_dict(self.phone), product_to_dict(self.product), dict(product_to_dict(self.phone), price=0)]
+        with self.assertRaisesRegex(ValueError, "строке 2: Цена должна быть положительной"):
+            products_from_dicts(rows)
+
+        rows[2]["price"] = 10.0
+        rows[1]["quantity"] = "много"
+        with self.assertRaisesRegex(ValueError, "строке 1: invalid literal"):
+            products_from_dicts(rows)
+
+    def test_feed_type_field(self) -> None:
+        """Поле "type" фида поставщика не мешает загрузке, прежний тег типа по-прежнему читается"""
+        row = {"name": "Товар", "description": "D", "price": 10.0, "quantity": 1, "type": "розничный"}
+        self.assertEqual(type(product_from_dict(row)), Product)
+        self.assertEqual(
+            [type(p) for p in products_from_dicts([row, dict(row, type="smartphone")])], [Product, Smartphone]
+        )
+
+    def test_unregistered_subclass_uses_ancestor_tag(self) -> None:
+        """Незарегистрированный подкласс получает тег ближайшего зарегистрированного предка"""
+
+        class ProPhone(Smartphone):
+            pass
+
+        self.assertEqual(get_type_tag(ProPhone), "smartphone")
+        phone = ProPhone("Pro", "Desc", 2000.0, 1, 3.0, "Y", 256, "White")
+        self.assertEqual(product_to_dict(phone)["_type"], "smartphone")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,153 @@
+import json
+import os
+import unittest
+from tempfile import TemporaryDirectory
+from typing import Any, Dict, List
+from unittest import mock
+
+from src.exceptions import CatalogLoadError
+from src.reloader import CatalogReloader
+from src.smartphone import Smartphone
+
+
+class TestCatalogReloader(unittest.TestCase):
+    def setUp(self) -> None:
+        self.temp_dir = TemporaryDirectory()
+        self.path = os.path.join(self.temp_dir.name, "catalog.json")
+        self.data: List[Dict[str, Any]] = [
+            {
+                "name": "Телефоны",
+                "description": "Смартфоны",
+                "products": [
+                    {"name": "A", "description": "D", "price": 100.0, "quantity": 2},
+                    {"name": "B", "description": "D", "price": 200.0, "quantity": 3},
+                    {"name": "C", "description": "D", "price": 300.0, "quantity": 1},
+                ],
+            },
+            {"name": "Аксессуары", "description": "Разное", "products": []},
+        ]
+        self.write()
+        self.reloader = CatalogReloader([self.path])
+        self.categories = self.reloader.load()
+
+    def tearDown(self) -> None:
+        self.temp_dir.cleanup()
+
+    def write(self) -> None:
+        with open(self.path, "w", encoding="utf-8") as file:
+            json.dump(self.data, file, ensure_ascii=False)
+        # Гарантируем новое время изменения даже при грубом разрешении часов файловой системы
+        stat = os.stat(self.path)
+        os.utime(self.path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+    def test_unchanged_file_is_not_read(self) -> None:
+        """Файл с прежними временем и размером не читается"""
+        with mock.patch("builtins.open", side_effect=AssertionError("file was read")):
+            report = self.reloader.reload()
+        self.assertEqual(report.unchanged_files, [self.path])
+        self.assertTrue(report.empty)
+
+    def test_touched_file_is_not_parsed(self) -> None:
+        """При совпадении хэша содержимое не разбирается"""
+        stat = os.stat(self.path)
+        os.utime(self.path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+        with mock.patch("src.reloader.json.loads", side_effect=AssertionError("file was parsed")):
+            report = self.reloader.reload()
+        self.assertTrue(report.empty)
+
+    def test_changes_applied_in_place(self) -> None:
+        """Вставки, обновления и удаления применяются к существующим объектам"""
+        phones = self.categories[0]
+        product_a = phones.products[0]
+        product_c = phones.products[2]
+        index = phones.index
+        products = self.data[0]["products"]
+        products[0]["price"] = 150.0
+        del products[1]
+        products.append({"name": "D", "description": "D", "price": 50.0, "quantity": 4})
+        self.write()
+
+        report = self.reloader.reload()
+
+        changes = report.categories["Телефоны"]
+        self.assertEqual((changes.inserted, changes.updated, changes.deleted), (["D"], ["A"], ["B"]))
+        self.assertEqual(list(report.categories), ["Телефоны"])
+        self.assertIs(self.reloader.categories[0], phones)
+        self.assertIs(phones.products[0], product_a)
+        self.assertIs(phones.products[1], product_c)
+        self.assertEqual(product_a.price, 150.0)
+        self.assertEqual([p.name for p in phones.products], ["A", "C", "D"])
+        self.assertAlmostEqual(phones.total_value, 150.0 * 2 + 300.0 + 50.0 * 4)
+        self.assertIs(phones.index, index)
+        self.assertEqual([p.name for p in phones.cheapest(2)], ["D", "A"])
+        phones.check_aggregates()
+
+    def test_type_change_replaces_product(self) -> None:
+        """При смене типа товара объект заменяется"""
+        self.data[0]["products"][1].update({"type": "smartphone", "model": "X"})
+        self.write()
+        report = self.reloader.reload()
+        self.assertEqual(report.categories["Телефоны"].updated, ["B"])
+        self.assertIsInstance(self.reloader.categories[0].find_by_name("B")[0], Smartphone)
+
+    def test_categories_added_and_removed(self) -> None:
+        """Новые и исчезнувшие категории попадают в отчет"""
+        self.data[1] = {"name": "Дом", "description": "Товары для дома", "products": []}
+        self.write()
+        report = self.reloader.reload()
+        self.assertEqual(report.added_categories, ["Дом"])
+        self.assertEqual(report.removed_categories, ["Аксессуары"])
+        self.assertEqual([c.name for c in self.reloader.categories], ["Телефоны", "Дом"])
+
+    def test_invalid_data_leaves_categories_untouched(self) -> None:
+        """При ошибке в данных категории не изменяются, а ошибка попадает в отчет"""
+        products = self.data[0]["products"]
+        products[0]["price"] = 1.0
+        products.append({"name": "E", "description": "D", "price": -1, "quantity": 1})
+        self.write()
+        report = self.reloader.reload()
+        self.assertRegex(report.errors[self.path], "Ошибка в данных из")
+        self.assertEqual(report.changed_files, [])
+        self.assertEqual(self.categories[0].products[0].price, 100.0)
+        self.assertEqual(self.categories[0].product_count, 3)
+
+    def test_failed_file_is_retried(self) -> None:
+        """Подпись файла с ошибкой не запоминается: исправленный файл перечитывается"""
+        with open(self.path, "w", encoding="utf-8") as file:
+            file.write("[{")
+        self.assertIn(self.path, self.reloader.reload().errors)
+        self.assertIn(self.path, self.reloader.reload().errors)
+
+        self.data[0]["products"][0]["price"] = 150.0
+        self.write()
+        report = self.reloader.reload()
+        self.assertEqual((report.errors, report.changed_files), ({}, [self.path]))
+        self.assertEqual(self.categories[0].products[0].price, 150.0)
+
+    def test_errors_collected_per_file(self) -> None:
+        """Ошибка в одном файле не мешает перезагрузке остальных"""
+        broken = os.path.join(self.temp_dir.name, "broken.json")
+        with open(broken, "w", encoding="utf-8") as file:
+            file.write("не JSON")
+        reloader = CatalogReloader([broken, self.path, os.path.join(self.temp_dir.name, "missing.json")])
+        with self.assertRaises(CatalogLoadError) as context:
+            reloader.load()
+        self.assertEqual(len(context.exception.errors), 2)
+        self.assertEqual([c.name for c in context.exception.categories], ["Телефоны", "Аксессуары"])
+
+    def test_duplicate_category_names_rejected(self) -> None:
+        """Две категории с одним названием в одном файле - ошибка данных"""
+        self.data.append({"name": "Телефоны", "description": "Еще раз", "products": []})
+        self.write()
+        report = self.reloader.reload()
+        self.assertRegex(report.errors[self.path], "Категория 'Телефоны' встречается в файле дважды")
+        self.assertEqual(len(self.reloader.categories), 2)
+
+    def test_rows_are_not_retained(self) -> None:
+        """Для сравнения хранятся хэши записей, а не сами записи"""
+        tracked = self.reloader._files[self.path]["Телефоны"]
+        self.assertTrue(all(isinstance(digest, int) for digest, _ in tracked.rows.values()))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,128 @@
+import threading
+import unittest
+from typing import List
+
+from src.category import Category
+from src.exceptions import ReservationError
+from src.product import Product
+from src.reservations import COMMITTED, EXPIRED, RELEASED, ReservationEngine
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestReservationEngine(unittest.TestCase):
+    def setUp(self) -> None:
+        self.clock = FakeClock()
+        self.engine = ReservationEngine(stripes=8, ttl=60.0, clock=self.clock)
+        self.phone = Product("Телефон", "D", 100.0, 5)
+        self.case = Product("Чехол", "D", 10.0, 2)
+        self.category = Category("Телефоны", "D", [self.phone, self.case])
+
+    def test_reserve_and_commit(self) -> None:
+        """Резерв уменьшает доступное количество, подтверждение - остаток товара"""
+        reservation = self.engine.reserve(self.phone, 3)
+        self.assertEqual(self.engine.available(self.phone), 2)
+        self.assertEqual(self.phone.quantity, 5)
+        self.engine.commit(reservation)
+        self.assertEqual(reservation.state, COMMITTED)
+        self.assertEqual(self.phone.quantity, 2)
+        self.assertEqual(self.engine.reserved(self.phone), 0)
+        self.assertAlmostEqual(self.category.total_value, 100.0 * 2 + 10.0 * 2)
+
+    def test_release_returns_quantity(self) -> None:
+        """Отмена возвращает количество, повторная отмена запрещена"""
+        reservation = self.engine.reserve(self.phone, 5)
+        with self.assertRaises(ReservationError):
+            self.engine.reserve(self.phone, 1)
+        self.engine.release(reservation)
+        self.assertEqual(reservation.state, RELEASED)
+        self.assertEqual(self.engine.available(self.phone), 5)
+        with self.assertRaises(ReservationError):
+            self.engine.commit(reservation)
+
+    def test_reserve_many_is_atomic(self) -> None:
+        """Корзина резервируется целиком или не резервируется вовсе"""
+        with self.assertRaisesRegex(ReservationError, "Чехол"):
+            self.engine.reserve_many([(self.phone, 1), (self.case, 3)])
+        self.assertEqual(self.engine.available(self.phone), 5)
+
+        reservation = self.engine.reserve_many([(self.phone, 1), (self.case, 1), (self.case, 1)])
+        self.assertEqual(self.engine.available(self.case), 0)
+        self.engine.commit(reservation)
+        self.assertEqual((self.phone.quantity, self.case.quantity), (4, 0))
+
+    def test_expire_stale_reservations(self) -> None:
+        """Истекшие резервы освобождаются и не могут быть подтверждены"""
+        stale = self.engine.reserve(self.phone, 2)
+        fresh = self.engine.reserve(self.phone, 1, ttl=120.0)
+        self.clock.now = 90.0
+        with self.assertRaisesRegex(ReservationError, "истек"):
+            self.engine.commit(stale)
+        self.assertEqual(self.engine.expire(), 1)
+        self.assertEqual(stale.state, EXPIRED)
+        self.assertEqual(self.engine.available(self.phone), 4)
+        self.engine.commit(fresh)
+
+    def test_finished_reservations_leave_expiry_queue(self) -> None:
+        """Подтвержденные и отмененные резервы не копятся в очереди сроков"""
+        for _ in range(500):
+            self.engine.release(self.engine.reserve(self.phone, 1))
+            self.engine.commit(self.engine.reserve(self.case, 1))
+            self.case.quantity = 2
+        self.assertLessEqual(len(self.engine._expiry), 2 * len(self.engine._live) + 65)
+        self.clock.now = 120.0
+        self.assertEqual(self.engine.expire(), 0)
+
+    def test_zero_ttl_expires_immediately(self) -> None:
+        """Явный ttl=0 не заменяется ttl движка"""
+        reservation = self.engine.reserve(self.phone, 1, ttl=0)
+        with self.assertRaisesRegex(ReservationError, "истек"):
+            self.engine.commit(reservation)
+        with self.assertRaises(ValueError):
+            self.engine.reserve(self.phone, 1, ttl=-1)
+
+    def test_invalid_quantity(self) -> None:
+        """Количество резерва должно быть положительным"""
+        with self.assertRaises(ValueError):
+            self.engine.reserve(self.phone, 0)
+
+    def test_concurrent_workers(self) -> None:
+        """Параллельные резервы не продают больше остатка и сохраняют агрегаты категории"""
+        products = [Product(f"P{i}", "D", 10.0, 200) for i in range(4)]
+        category = Category("Много", "D", list(products))
+        committed: List[int] = []
+        lock = threading.Lock()
+
+        def worker(offset: int) -> None:
+            done = 0
+            for step in range(300):
+                first = products[(offset + step) % 4]
+                second = products[(offset + step + 1) % 4]
+                try:
+                    reservation = self.engine.reserve_many([(first, 1), (second, 1)])
+                except ReservationError:
+                    continue
+                self.engine.commit(reservation)
+                done += 2
+            with lock:
+                committed.append(done)
+
+        threads = [threading.Thread(target=worker, args=(i,)) for i in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(sum(committed), 800)
+        self.assertTrue(all(product.quantity == 0 for product in products))
+        category.check_aggregates()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,94 @@
+import os
+import unittest
+from tempfile import TemporaryDirectory
+
+from src.category import Category
+from src.loaders import JsonLoader, save_categories
+from src.product import Product
+from src.search import SearchIndex, tokenize
+
+
+class TestSearchIndex(unittest.TestCase):
+    def setUp(self) -> None:
+        self.galaxy = Product("Samsung Galaxy S23", "256GB, Серый цвет, 200MP камера", 180000.0, 5)
+        self.iphone = Product("iPhone 15", "512GB, Серый цвет, камера 48MP", 210000.0, 8)
+        self.grass = Product("Газонная трава", "Ёмкость 5 кг, зелёный цвет", 500.0, 20)
+        self.category = Category("Товары", "Разное", [self.galaxy, self.iphone, self.grass])
+        self.index = SearchIndex()
+        self.category.set_search_index(self.index)
+
+    def test_tokenize_casefolds_cyrillic(self) -> None:
+        """Токенизация учитывает Unicode, регистр и букву ё"""
+        self.assertEqual(tokenize("СЕРЫЙ Цвет, 200MP; Ёмкость"), ["серый", "цвет", "200mp", "емкость"])
+
+    def test_search_all_terms_ranked(self) -> None:
+        """Находятся товары со всеми словами запроса, совпадение в названии весит больше"""
+        self.assertEqual(self.index.search("серый цвет", prefix=False), [self.galaxy, self.iphone])
+        self.assertEqual(self.index.search("камера galaxy"), [self.galaxy])
+        self.assertEqual(self.index.search("цвет", prefix=False, limit=None)[-1], self.grass)
+        self.assertEqual(self.index.search("трава"), [self.grass])
+        self.assertEqual(self.index.search("нет такого"), [])
+        self.assertEqual(self.index.search("цвет", prefix=False, limit=0), [])
+        self.assertEqual(self.index.search_scored("цвет", prefix=False, limit=0), [])
+        self.assertEqual(len(self.index.search("цвет", prefix=False, limit=1)), 1)
+
+    def test_prefix_and_autocomplete(self) -> None:
+        """Последнее слово запроса ищется по префиксу"""
+        self.assertEqual(self.index.search("зеле"), [self.grass])
+        self.assertEqual(self.index.search("зеле", prefix=False), [])
+        self.assertEqual(self.index.autocomplete("Ка"), ["камера"])
+        self.assertEqual(sorted(self.index.autocomplete("2")), ["200mp", "256gb"])
+
+    def test_category_updates_index(self) -> None:
+        """Добавление и удаление товаров в категории обновляет индекс"""
+        phone = Product("Xiaomi Redmi", "Серый цвет", 20000.0, 3)
+        self.category.add_product(phone)
+        self.assertEqual(self.index.search("redmi"), [phone])
+        self.category.remove_product(self.galaxy)
+        self.assertEqual(self.index.search("galaxy"), [])
+        self.assertEqual(self.index.autocomplete("gal"), [])
+        self.assertEqual(len(self.index), 3)
+
+    def test_save_and_load(self) -> None:
+        """Индекс сохраняется рядом с каталогом и загружается без переиндексации"""
+        with TemporaryDirectory() as directory:
+            catalog_path = os.path.join(directory, "catalog.json")
+            index_path = os.path.join(directory, "catalog.index.json")
+            save_categories(catalog_path, [self.category])
+            self.index.save(index_path, [self.category])
+
+            categories = JsonLoader.load_categories(catalog_path)
+            loaded = SearchIndex.load(index_path, categories)
+            products = categories[0].products
+            self.assertEqual(loaded.search("серый цвет"), [products[0], products[1]])
+            self.assertEqual(loaded.autocomplete("зел"), ["зеленый"])
+            categories[0].set_search_index(loaded)
+            categories[0].remove_product(products[2])
+            self.assertEqual(loaded.search("трава"), [])
+
+            categories[0].products[0].name = "Другое"
+            with self.assertRaisesRegex(ValueError, "не соответствует"):
+                SearchIndex.load(index_path, categories)
+
+            categories = JsonLoader.load_categories(catalog_path)
+            categories[0].products[1].description = "Другое описание"
+            with self.assertRaisesRegex(ValueError, "не соответствует"):
+                SearchIndex.load(index_path, categories)
+
+    def test_removed_documents_compacted(self) -> None:
+        """Места удаленных товаров освобождаются, поиск и ранжирование не меняются"""
+        extra = [Product(f"Чехол {i}", "Серый цвет", 100.0, 1) for i in range(200)]
+        for product in extra:
+            self.category.add_product(product)
+        for product in extra[:150]:
+            self.category.remove_product(product)
+        self.assertLess(len(self.index._documents), 150)
+        self.assertEqual(len(self.index), 53)
+        self.assertEqual(self.index.search("серый цвет", prefix=False, limit=2), [self.galaxy, self.iphone])
+        self.assertEqual(self.index.search("чехол", limit=None)[0], extra[150])
+        self.category.remove_product(self.galaxy)
+        self.assertEqual(self.index.search("galaxy"), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,97 @@
+import json
+import os
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+
+from src.category import Category
+from src.exceptions import SnapshotError
+from src.loaders import JsonLoader, save_categories
+from src.smartphone import Smartphone
+from src import snapshot as snapshot_module
+from src.snapshot import CatalogSnapshot, load_snapshot, save_snapshot
+
+
+class TestSnapshot(TestCase):
+    def setUp(self) -> None:
+        self.directory = TemporaryDirectory()
+        self.snapshot_path = os.path.join(self.directory.name, "catalog.snap")
+        self.categories = JsonLoader.load_categories("data/products.json")
+        self.categories[0].products[0].apply_discount(0.13)
+        save_snapshot(self.snapshot_path, self.categories)
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def _as_json(self, categories: list) -> list:
+        path = os.path.join(self.directory.name, "out.json")
+        save_categories(path, categories)
+        with open(path, encoding="utf-8") as f:
+            data: list = json.load(f)
+        return data
+
+    def test_round_trip_matches_json(self) -> None:
+        """Снимок без потерь воспроизводит JSON представление"""
+        self.assertEqual(self._as_json(load_snapshot(self.snapshot_path)), self._as_json(self.categories))
+
+    def test_lazy_metadata_and_columns(self) -> None:
+        """Метаданные и колонки читаются без создания продуктов"""
+        with CatalogSnapshot(self.snapshot_path) as snapshot:
+            self.assertEqual(snapshot.category_count, 2)
+            self.assertEqual(snapshot.product_count, 4)
+            self.assertEqual(snapshot.category_info(1)[0], "Телевизоры")
+            quantities = snapshot.quantities(0)
+            self.assertEqual(quantities.tolist(), [5, 8, 14])
+            quantities.release()
+            self.assertEqual(snapshot.load_category(1).products[0].price, 123000.0)
+
+    def test_round_trip_keeps_product_types(self) -> None:
+        """Подклассы продуктов сохраняются вместе с характеристиками"""
+        phone = Smartphone("Phone", "Desc", 1000.0, 1, 2.5, "X", 128, "Black")
+        self.categories.append(Category("Смешанная", "Типы", [phone]))
+        save_snapshot(self.snapshot_path, self.categories)
+        restored = load_snapshot(self.snapshot_path)
+        self.assertIsInstance(restored[2].products[0], Smartphone)
+        self.assertEqual(self._as_json(restored), self._as_json(self.categories))
+
+    def test_rejects_foreign_file(self) -> None:
+        """Файл другого формата не принимается"""
+        with self.assertRaises(SnapshotError):
+            load_snapshot("data/products.json")
+
+    def test_rejects_truncated_file(self) -> None:
+        """Обрезанный снимок дает SnapshotError, а не ошибку чтения за пределами файла"""
+        with open(self.snapshot_path, "rb") as f:
+            data = f.read()
+        with open(self.snapshot_path, "wb") as f:
+            f.write(data[:-8])
+        with self.assertRaises(SnapshotError):
+            load_snapshot(self.snapshot_path)
+
+    def test_rejects_out_of_range_category(self) -> None:
+        """Категория, ссылающаяся на продукты за пределами колонок, считается повреждением"""
+        with open(self.snapshot_path, "r+b") as f:
+            header = f.read(snapshot_module._HEADER.size)
+            categories_offset = snapshot_module._HEADER.unpack(header)[7]
+            f.seek(categories_offset)
+            row = snapshot_module._CATEGORY.unpack(f.read(snapshot_module._CATEGORY.size))
+            f.seek(categories_offset)
+            f.write(snapshot_module._CATEGORY.pack(row[0], row[1], row[2], 1000))
+        with self.assertRaises(SnapshotError):
+            load_snapshot(self.snapshot_path)
+
+    def test_resave_keeps_open_snapshot_readable(self) -> None:
+        """Повторное сохранение заменяет файл, не затрагивая уже открытый снимок"""
+        with CatalogSnapshot(self.snapshot_path) as snapshot:
+            save_snapshot(self.snapshot_path, self.categories[:1])
+            self.assertEqual(snapshot.load_category(1).name, "Телевизоры")
+        self.assertEqual(len(load_snapshot(self.snapshot_path)), 1)
+        self.assertEqual(os.listdir(self.directory.name), ["catalog.snap"])
+
+    def test_close_with_live_column_view(self) -> None:
+        """Закрытие при неосвобожденном срезе колонки сообщает об этом через BufferError"""
+        snapshot = CatalogSnapshot(self.snapshot_path)
+        prices = snapshot.prices(0)
+        with self.assertRaises(BufferError):
+            snapshot.close()
+        prices.release()
+        snapshot.close()
@@ -0,0 +1,172 @@
+import gc
+import threading
+import unittest
+import weakref
+from typing import Any, Callable, Optional
+
+from src.catalog import Catalog
+from src.category import Category
+from src.product import Product
+from src.smartphone import Smartphone
+from src.versioned_catalog import CategoryVersion, ProductRecord, VersionedCatalog
+
+
+class InterleavingLock:
+    """Блокировка, которая сразу после освобождения один раз вызывает on_release (второй писатель)"""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.on_release: Optional[Callable[[], Any]] = None
+
+    def __enter__(self) -> None:
+        self._lock.acquire()
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self._lock.release()
+        hook, self.on_release = self.on_release, None
+        if hook is not None:
+            hook()
+
+
+class TestVersionedCatalog(unittest.TestCase):
+    def setUp(self) -> None:
+        self.phone = Smartphone("Phone", "D", 1000.0, 2, 2.5, "X", 128, "Black")
+        self.phones = Category("Телефоны", "D", [self.phone, Product("Cable", "D", 100.0, 5)])
+        self.other = Category("Прочее", "D", [Product("Bag", "D", 10.0, 0)])
+        self.catalog = VersionedCatalog([self.phones, self.other])
+
+    def test_snapshot_aggregates(self) -> None:
+        version = self.catalog.current
+        self.assertEqual(version.product_count, 3)
+        self.assertEqual(version.total_value, 2500.0)
+        phones = version.category("Телефоны")
+        self.assertAlmostEqual(phones.average_price, self.phones.get_average_price())
+        self.assertEqual(phones.find_by_name("Cable")[0].quantity, 5)
+        with self.assertRaises(ValueError):
+            version.category("Нет")
+
+    def test_versions_are_immutable(self) -> None:
+        version = self.catalog.current
+        with self.assertRaises(AttributeError):
+            version.total_value = 0  # type: ignore[misc]
+        with self.assertRaises(AttributeError):
+            version.category("Прочее").products = ()  # type: ignore[misc]
+        with self.assertRaises(TypeError):
+            version.categories["Новая"] = version.category("Прочее")  # type: ignore[index]
+
+    def test_edit_publishes_new_version_and_keeps_old(self) -> None:
+        old = self.catalog.current
+        with self.catalog.edit() as draft:
+            draft.put_product("Телефоны", Product("Case", "D", 20.0, 1))
+            draft.put_product("Телефоны", ProductRecord("Cable", "D", 90.0, 5))
+            draft.remove_product("Прочее", "Bag")
+        new = self.catalog.current
+        self.assertEqual(new.number, old.number + 1)
+        self.assertEqual(old.total_value, 2500.0)
+        self.assertEqual(new.total_value, 2470.0)
+        self.assertEqual([record.name for record in new.category("Телефоны").products], ["Phone", "Cable", "Case"])
+        self.assertEqual(new.category("Прочее").product_count, 0)
+
+    def test_unchanged_categories_are_shared(self) -> None:
+        old = self.catalog.current
+        with self.catalog.edit() as draft:
+            draft.put_product("Телефоны", Product("Case", "D", 20.0, 1))
+        self.assertIs(self.catalog.current.category("Прочее"), old.category("Прочее"))
+        self.assertIsNot(self.catalog.current.category("Телефоны"), old.category("Телефоны"))
+
+    def test_failed_edit_does_not_publish(self) -> None:
+        old = self.catalog.current
+        with self.assertRaises(ValueError):
+            with self.catalog.edit() as draft:
+                draft.put_product("Телефоны", Product("Case", "D", 20.0, 1))
+                draft.remove_product("Телефоны", "Нет")
+        self.assertIs(self.catalog.current, old)
+
+    def test_publish_mutable_categories(self) -> None:
+        self.phones.add_product(Product("Case", "D", 20.0, 1))
+        version = self.catalog.publish([self.phones], removed=["Прочее"])
+        self.assertEqual(list(version.categories), ["Телефоны"])
+        self.assertEqual(version.category("Телефоны").total_value, self.phones.total_value)
+
+    def test_publish_returns_own_version(self) -> None:
+        """publish возвращает свою версию, даже если сразу после снятия блокировки публикует другой писатель"""
+        lock = InterleavingLock()
+        self.catalog._write_lock = lock  # type: ignore[assignment]
+        other = Category("Другая", "D", [Product("Other", "D", 1.0, 1)])
+        lock.on_release = lambda: self.catalog.publish([other])
+        version = self.catalog.publish([self.phones])
+        self.assertNotIn("Другая", version.categories)
+        self.assertIn("Другая", self.catalog.current.categories)
+        self.assertEqual(self.catalog.current.number, version.number + 1)
+
+    def test_record_round_trip(self) -> None:
+        record = ProductRecord.from_product(self.phone)
+        self.assertEqual(record.type, "smartphone")
+        restored = record.to_product()
+        self.assertIsInstance(restored, Smartphone)
+        self.assertEqual(str(restored), str(self.phone))
+        category = CategoryVersion.from_category(self.phones).to_category()
+        self.assertEqual(category.total_value, self.phones.total_value)
+
+    def test_duplicate_names_edited_in_order(self) -> None:
+        """Замена и удаление по названию затрагивают первую запись с ним, порядок сохраняется"""
+        with self.catalog.edit() as draft:
+            draft.put_category(CategoryVersion("Дубли", "D", [ProductRecord("A", "D", 1.0, 1)] * 2))
+            draft.put_product("Дубли", ProductRecord("A", "D", 5.0, 1))
+            draft.put_product("Дубли", ProductRecord("B", "D", 2.0, 1))
+            draft.remove_product("Дубли", "A")
+            draft.put_product("Дубли", ProductRecord("A", "D", 3.0, 1))
+        records = self.catalog.current.category("Дубли").products
+        self.assertEqual([(record.name, record.price) for record in records], [("A", 3.0), ("B", 2.0)])
+
+    def test_catalog_round_trip(self) -> None:
+        """Версии строятся из обычного каталога и превращаются обратно в каталог со сводками"""
+        catalog = Catalog("Магазин", categories=[self.phones, self.other])
+        versioned = VersionedCatalog.from_catalog(catalog)
+        self.assertEqual(versioned.current.total_value, catalog.total_value)
+        self.phones.add_product(Product("Case", "D", 20.0, 1))
+        restored = versioned.publish([self.phones]).to_catalog("Копия")
+        self.assertEqual(restored.total_value, catalog.total_value)
+        self.assertEqual(restored.type_rollups(), catalog.type_rollups())
+        self.assertEqual([category.name for category in restored.categories], ["Телефоны", "Прочее"])
+
+    def test_old_versions_are_released(self) -> None:
+        held = self.catalog.current
+        reference = weakref.ref(held)
+        for price in (1.0, 2.0, 3.0):
+            with self.catalog.edit() as draft:
+                draft.put_product("Прочее", ProductRecord("Bag", "D", price, 1))
+        gc.collect()
+        self.assertIsNotNone(reference())
+        self.assertEqual(self.catalog.live_versions(), 2)
+        del held
+        gc.collect()
+        self.assertIsNone(reference())
+        self.assertEqual(self.catalog.live_versions(), 1)
+
+    def test_readers_see_consistent_versions(self) -> None:
+        stop = threading.Event()
+        errors = []
+
+        def reader() -> None:
+            while not stop.is_set():
+                version = self.catalog.current
+                expected = sum(category.total_value for category in version.categories.values())
+                if version.total_value != expected:
+                    errors.append(version.number)
+
+        readers = [threading.Thread(target=reader) for _ in range(4)]
+        for thread in readers:
+            thread.start()
+        for index in range(200):
+            with self.catalog.edit() as draft:
+                draft.put_product("Прочее", ProductRecord(f"Item {index}", "D", 1.0, 1))
+        stop.set()
+        for thread in readers:
+            thread.join()
+        self.assertEqual(errors, [])
+        self.assertEqual(self.catalog.current.category("Прочее").product_count, 201)
+
+
+if __name__ == "__main__":
+    unittest.main()